@@ -0,0 +1,50 @@
+from functions import *
+import argparse
+import time
+
+# The streets benchmarked, each with the hero's card indices and the house card indices
+SPOTS = [('preflop', (48, 49), ()),
+         ('flop', (48, 49), (0, 21, 38)),
+         ('turn', (48, 49), (0, 21, 38, 13)),
+         ('river', (48, 49), (0, 21, 38, 13, 30))]
+
+
+def run_out_rate(hero, house, villains, batch_size, seconds):
+    """
+    Measure how many run outs a second `equity_tally` simulates and tallies in one process.
+
+    Every villain holds any two cards, and the batches are simulated one after another from independent seeds after
+    one batch to warm up.
+
+    Args:
+        hero (tuple): The card indices of the hero's hand.
+        house (tuple): The card indices of the house cards that are already dealt.
+        villains (int): The number of villains.
+        batch_size (int): The number of run outs simulated per batch.
+        seconds (float): How long to keep simulating batches for.
+
+    Returns:
+        float: The number of run outs tallied per second.
+    """
+    dead = sum(1 << index for index in hero + house)
+    ranges = [tuple(combo for combo in range(1326) if not COMBO_MASKS[combo] & dead)] * villains
+    seeds = np.random.SeedSequence(0)
+    equity_tally(hero, house, ranges, dead, batch_size, seeds.spawn(1)[0])
+
+    runs = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        runs += int(equity_tally(hero, house, ranges, dead, batch_size, seeds.spawn(1)[0])[0, 0].sum())
+    return runs / (time.perf_counter() - started)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the simulated run outs per second on one core')
+    parser.add_argument('--villains', type=int, default=1, help='number of villains (default: 1)')
+    parser.add_argument('--batch-size', type=int, default=10000, help='run outs per batch (default: 10000)')
+    parser.add_argument('--seconds', type=float, default=3, help='seconds to benchmark each street (default: 3)')
+    arguments = parser.parse_args()
+
+    for street, hero, house in SPOTS:
+        rate = run_out_rate(hero, house, arguments.villains, arguments.batch_size, arguments.seconds)
+        print(f'{street:<8}{rate / 1e6:6.2f}M run outs/s')
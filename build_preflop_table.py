@@ -0,0 +1,108 @@
+from functions import *
+import argparse
+import time
+
+
+def starting_hand_classes():
+    """
+    Find the 169 starting hand classes and their canonical combos.
+
+    Two combos are in the same class when one can be turned into the other by relabelling suits, so each class is
+    represented by the canonical form of its combos.
+
+    Returns:
+        tuple: A list of the canonical combo index of each class, a list of the class of every combo and a list of
+        the index of the suit relabelling that turns every combo into its class's canonical combo.
+    """
+    canonical = [canonicalise(combo) for combo in range(1326)]
+    representatives = sorted({spot[0] for spot, _ in canonical})
+    classes = [representatives.index(spot[0]) for spot, _ in canonical]
+    return representatives, classes, [permutation for _, permutation in canonical]
+
+
+def tally_boards(first, second):
+    """
+    Tally the results of every representative hand against every combo on the boards with two given lowest cards.
+
+    Every combo is evaluated once per board. Each representative hand then scores two points for every combo it beats
+    and one for every combo it ties with, and nothing against combos that share a card with the board.
+
+    Args:
+        first (int): The lowest card index of the boards.
+        second (int): The second lowest card index of the boards.
+
+    Returns:
+        np.ndarray: An array of shape (169, 1326) holding the points of each representative hand against each combo.
+    """
+    representatives = np.array(starting_hand_classes()[0], dtype=np.int64)
+    points = np.zeros((len(representatives), 1326), dtype=np.int32)
+    rest = np.array(list(combinations(range(second + 1, 52), 3)), dtype=np.int64).reshape(-1, 3)
+
+    for start in range(0, len(rest), 64):
+        boards = np.concatenate([np.full((len(rest[start:start + 64]), 2), (first, second)), rest[start:start + 64]],
+                                axis=1)
+        size = len(boards)
+        board_masks = (np.uint64(1) << boards.astype(np.uint64)).sum(axis=1, dtype=np.uint64)
+        clash = (COMBO_MASK_ARRAY[None, :] & board_masks[:, None]) != 0
+
+        # Evaluate every combo that does not share a card with the board
+        cards = np.concatenate([np.broadcast_to(COMBO_CARD_ARRAY, (size, 1326, 2)),
+                                np.broadcast_to(boards[:, None, :], (size, 1326, 5))], axis=2).reshape(-1, 7)
+        live = ~clash.reshape(-1)
+        strengths = np.zeros(size * 1326, dtype=np.int32)
+        strengths[live] = batch_strength(cards[live])
+        strengths = strengths.reshape(size, 1326)
+
+        # Dead villain combos lose to nothing and dead hero hands beat nothing
+        villains = np.where(clash, np.int32(1 << 30), strengths)
+        heroes = np.where(clash[:, representatives], np.int32(-1), strengths[:, representatives])
+        points += (heroes[:, :, None] > villains[:, None, :]).sum(axis=0, dtype=np.int32)
+        points += (heroes[:, :, None] >= villains[:, None, :]).sum(axis=0, dtype=np.int32)
+    return points
+
+
+def build_table(workers=None):
+    """
+    Build the exact preflop heads up equity of every combo against every other combo.
+
+    The boards are shared between a pool of worker processes by their two lowest cards. Only the 169 representative
+    hands are tallied, and every other row is filled in by relabelling the suits of its representative's row.
+
+    Args:
+        workers (int, optional): The number of worker processes, defaulting to the number of CPUs.
+
+    Returns:
+        np.ndarray: An array of shape (1326, 1326) holding the hero's equity scaled to `PREFLOP_SCALE`, with zero
+        for combos that share a card.
+    """
+    representatives, classes, relabellings = starting_hand_classes()
+    points = np.zeros((len(representatives), 1326), dtype=np.int64)
+    shards = [(first, second) for first in range(48) for second in range(first + 1, 49)]
+
+    with ProcessPoolExecutor(workers or os.cpu_count() or 1) as pool:
+        started = time.time()
+        futures = [pool.submit(tally_boards, first, second) for first, second in shards]
+        for done, future in enumerate(futures, 1):
+            points += future.result()
+            print(f'\r{done}/{len(shards)} shards in {int(time.time() - started)}s', end='', flush=True)
+    print()
+
+    # Any two combos that do not share a card leave 48 cards to deal the five board cards from
+    rows = points / (2 * comb(48, 5))
+    table = np.zeros((1326, 1326), dtype=np.uint16)
+    for hero in range(1326):
+        relabel = COMBO_PERMUTATION_ARRAY[relabellings[hero]]
+        equities = np.rint(rows[classes[hero], relabel] * PREFLOP_SCALE).astype(np.uint16)
+        table[hero] = np.where(COMBO_MASK_ARRAY & np.uint64(COMBO_MASKS[hero]), 0, equities)
+    return table
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the preflop heads up equity table')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='number of worker processes to build the table with (default: number of CPUs)')
+    parser.add_argument('--output', default=PREFLOP_TABLE_PATH, help=f'file to save (default: {PREFLOP_TABLE_PATH})')
+    arguments = parser.parse_args()
+
+    os.makedirs(os.path.dirname(arguments.output) or '.', exist_ok=True)
+    np.save(arguments.output, build_table(arguments.workers))
@@ -42,8 +42,7 @@ class CardButton(ttk.Button):
         Note that this method is typically invoked when the user clicks the card button.
         """
         if self.manager.game_data['deck'].cards[self.card]:
-            for calculation in self.manager.calculating:
-                self.manager.calculating[calculation] = False
+            self.manager.stop_calculating()
             for display in self.tab.displayed_cards:
                 if not display.card:
                     self.manager.game_data['deck'].deal_card(self.card)
@@ -82,8 +81,7 @@ class DisplayCardButton(ttk.Button):
         """
         if self.card:
             # Reset ongoing calculations
-            for calculation in self.manager.calculating:
-                self.manager.calculating[calculation] = False
+            self.manager.stop_calculating()
 
             # Add the displayed card back to the deck
             self.manager.game_data['deck'].add_cards(self.card)
@@ -96,7 +94,33 @@ class DisplayCardButton(ttk.Button):
             self.manager.tabs['update_house'].refresh()
 
 
-class HandButton(ttk.Button):
+class RangeHandButton(ttk.Button):
+    """
+    Base class for buttons representing hands of a range, which can be coloured by the hero's equity against them.
+
+    Attributes:
+        hands (list): The hands the button represents.
+        base_style (str): The style the button's heat styles are derived from, keeping e.g. its suit colour.
+        default_style (str): The style of the button while it is not highlighted.
+    """
+    def colour(self, equities):
+        """
+        Colour the button by the hero's average equity against its hands, keeping any highlight.
+
+        Args:
+            equities (dict): The hero's equity percentage against each combo index, as returned by `range_equities`.
+        """
+        values = [equities[hand.index] for hand in self.hands if hand.index in equities]
+        if not values:
+            return
+        level = min(int(sum(values) / len(values) * len(heat_colours) / 100), len(heat_colours) - 1)
+        style = f'Heat{level}.{self.base_style}'
+        if self.cget('style') == self.default_style:
+            self.configure(style=style)
+        self.default_style = style
+
+
+class HandButton(RangeHandButton):
     """
     Button widget representing a group of hands with the same name.
 
@@ -114,7 +138,8 @@ class HandButton(ttk.Button):
         self.hands = [hand for hand in self.villain_range.hands
                       if self.villain_range.hands[hand] and hand.name == self.hand_name]
         self.selected = False
-        self.default_style = 'Hand.TButton'
+        self.base_style = 'Hand.TButton'
+        self.default_style = self.base_style
 
     def highlight(self, widget):
         """
@@ -143,7 +168,7 @@ class HandButton(ttk.Button):
         widget.selected_hands_count.set(f'{len(widget.selected_hands)} selected')
 
 
-class SuitedHandButton(ttk.Button):
+class SuitedHandButton(RangeHandButton):
     """
     Button widget representing a suited hand.
 
@@ -160,6 +185,7 @@ class SuitedHandButton(ttk.Button):
         self.villain_range = villain_range
         self.hands = [hand]
         self.selected = False
+        self.base_style = style
         self.default_style = style
 
     def highlight(self, widget):
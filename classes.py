@@ -1,6 +1,52 @@
 from itertools import combinations
+import os
+import sqlite3
+import threading
+import time
 from data import *
 from PIL import Image
+import numpy as np
+
+
+def card_index(value, suit):
+    """
+    Get the canonical index (0-51) of a card.
+
+    Cards are ordered by value and then by suit, so the index of a card divided by four gives its value minus two and
+    the remainder gives the position of its suit in `suits`.
+
+    Args:
+        value (int): The numeric value of the card (2-14).
+        suit (str): The suit of the card (e.g., 'Hearts').
+
+    Returns:
+        int: The card index.
+    """
+    return (value - 2) * 4 + suits.index(suit)
+
+
+def combo_index(index_1, index_2):
+    """
+    Get the canonical index (0-1325) of the two-card combo made from two card indices.
+
+    Args:
+        index_1 (int): The index of the first card.
+        index_2 (int): The index of the second card.
+
+    Returns:
+        int: The combo index.
+    """
+    if index_1 > index_2:
+        index_1, index_2 = index_2, index_1
+    return index_2 * (index_2 - 1) // 2 + index_1
+
+
+# The card indices and 52-bit card masks of every combo, in combo index order
+COMBO_CARDS = tuple((low, high) for high in range(52) for low in range(high))
+COMBO_MASKS = tuple(1 << low | 1 << high for low, high in COMBO_CARDS)
+
+# The combo indices of the 51 combos that contain each card index
+CARD_COMBOS = tuple(tuple(combo_index(index, other) for other in range(52) if other != index) for index in range(52))
 
 
 class Card:
@@ -12,6 +58,8 @@ class Card:
         value (int): The numeric value associated with the card.
         suit (str): The suit of the card (e.g., 'Hearts', 'Spades').
         id (str): A unique identifier for the card based on its name and suit.
+        index (int): The canonical index of the card (0-51).
+        mask (int): A 52-bit mask with only the bit of the card's index set.
         image_path (str): The file path to the card's image.
 
     Methods:
@@ -36,6 +84,9 @@ class Card:
         self.name = name.upper()
         # Construct a unique ID for the card based on name and suit
         self.id = name.upper() + suit_symbols[self.suit]
+        # Integer encoding used by the simulation engine
+        self.index = card_index(self.value, self.suit)
+        self.mask = 1 << self.index
         # Define the image path for the card
         self.image_path = f'images/cards/{self.name}_of_{self.suit.lower()}.png'
         self.raw_image = Image.open(self.image_path)
@@ -50,17 +101,16 @@ class Card:
         Returns:
             bool: True if the cards have the same value and suit, False otherwise.
         """
-        return self.value == other.value and self.suit == other.suit
+        return self.index == other.index
 
     def __hash__(self):
         """
         Compute a custom hash value for the Card object.
 
         Returns:
-            int: A custom hash value based on the card's value and suit.
+            int: The card's index, which is unique to its value and suit.
         """
-        # Define a custom hash function for the Card class
-        return hash((self.value, self.suit))
+        return self.index
 
 
 class Hand:
@@ -75,6 +125,9 @@ class Hand:
         tuple (tuple): A tuple containing the two cards in the hand.
         long_name (str): A long name representing the hand (e.g., 'Ace of Hearts, King of Spades').
         set (set): A set containing the two cards in the hand.
+        indices (tuple): The card indices of the two cards in the hand.
+        index (int): The canonical combo index of the hand (0-1325).
+        mask (int): A 52-bit mask of the two cards in the hand.
 
     Methods:
         __eq__(other): Check if two hands are equal based on their cards.
@@ -107,6 +160,9 @@ class Hand:
         self.tuple = (self.card_1, self.card_2)
         self.long_name = self.card_1.id + ", " + self.card_2.id
         self.set = {self.card_1, self.card_2}
+        self.indices = (self.card_1.index, self.card_2.index)
+        self.index = combo_index(self.card_1.index, self.card_2.index)
+        self.mask = self.card_1.mask | self.card_2.mask
 
     def __eq__(self, other):
         """
@@ -118,16 +174,16 @@ class Hand:
         Returns:
             bool: True if the hands have the same cards, False otherwise.
         """
-        return self.card_1 == other.card_1 and self.card_2 == other.card_2
+        return self.index == other.index
 
     def __hash__(self):
         """
         Compute a custom hash value for the Hand object.
 
         Returns:
-            int: A custom hash value based on the hand's cards.
+            int: The hand's combo index, which is unique to its two cards.
         """
-        return hash((self.card_1, self.card_2))
+        return self.index
 
 
 class Range:
@@ -142,12 +198,15 @@ class Range:
         hand_names (set): A set of hand names in the range.
         removed_hands (set): A set of hands that have been removed from the range.
         range_density (dict): A dictionary of hand name to density mapping within the range.
+        compiled (CompiledRange): The cached compiled range, or None if it needs rebuilding.
 
     Methods:
         refresh(): Refresh the range by updating the included hands and range density.
         remove(hand): Remove a specific hand from the range.
         revise(**kwargs): Revise the range based on specified criteria (ranks, two_ranks, one_suit, two_suits).
         get_hands(): Get a list of hands in the range.
+        get_combos(): Get a list of the combo indices of the hands in the range.
+        compile(): Get a compiled, read-only view of the live combos in the range for sampling.
 
     Example:
         deck = Deck(...)
@@ -160,12 +219,9 @@ class Range:
         self.high = high.get() / 100    # Convert to a decimal percentage.
         self.low = low.get() / 100  # Convert to a decimal percentage.
         self.deck = deck
-        self.hands = {hand: True for hand in self.deck.possible_hands
-                      if self.high <= starting_hand_ranks[hand.name] <= self.low and self.deck.possible_hands[hand]}
-        self.hand_names = {hand.name for hand in self.hands}
         self.removed_hands = set()
-        self.range_density = {hand_name: sum(1 if hand.name == hand_name and self.hands[hand]
-                                             else 0 for hand in self.hands) for hand_name in self.hand_names}
+        self.compiled = None
+        self.refresh()
 
     def refresh(self):
         """
@@ -175,18 +231,37 @@ class Range:
                       if self.high <= starting_hand_ranks[hand.name] <= self.low and self.deck.possible_hands[hand]
                       and hand not in self.removed_hands}
         self.hand_names = {hand.name for hand in self.hands}
-        self.range_density = {hand_name: sum(1 if hand.name == hand_name and self.hands[hand]
-                                             else 0 for hand in self.hands) for hand_name in self.hand_names}
+        self.range_density = {}
+        for hand in self.hands:
+            self.range_density[hand.name] = self.range_density.get(hand.name, 0) + 1
+        self.compiled = None
+
+    def compile(self):
+        """
+        Get a compiled, read-only view of the live combos in the range for sampling.
+
+        The compiled range is cached and only rebuilt when the range is refreshed, a hand is removed or more cards
+        have been dealt from the deck since it was built.
+
+        Returns:
+            CompiledRange: The compiled range.
+        """
+        if self.compiled is None or self.compiled.dealt != self.deck.dealt:
+            self.refresh()
+            self.compiled = CompiledRange(self.get_combos(), self.deck.dealt)
+        return self.compiled
 
     def remove(self, hand):
         """
         Remove a specific hand from the range.
 
         Args:
-            hand (Hand): The hand to remove from the range.
+            hand (Hand or int): The hand, or its combo index, to remove from the range.
         """
+        hand = self.deck.get_hand(hand)
         self.hands[hand] = False
         self.removed_hands.add(hand)
+        self.compiled = None
 
     def get_hands(self):
         """
@@ -197,6 +272,34 @@ class Range:
         """
         return [hand for hand in self.hands if self.hands[hand]]
 
+    def get_combos(self):
+        """
+        Get a list of the combo indices of the hands in the range.
+
+        Returns:
+            list: A list of combo indices (0-1325).
+        """
+        return [hand.index for hand in self.hands if self.hands[hand]]
+
+
+class CompiledRange:
+    """
+    Represents a read-only snapshot of the live combos in a range, used to sample villain hands without refreshing
+    the range on every iteration.
+
+    Attributes:
+        combos (tuple): The combo indices (0-1325) in the range.
+        combo_set (frozenset): The same combo indices for constant time membership tests.
+        dealt (int): The dealt card mask of the deck when the range was compiled.
+    """
+    def __init__(self, combos, dealt):
+        self.combos = tuple(combos)
+        self.combo_set = frozenset(self.combos)
+        self.dealt = dealt
+
+    def __len__(self):
+        return len(self.combos)
+
 
 class Deck:
     """
@@ -205,8 +308,17 @@ class Deck:
     Attributes:
         cards (dict): A dictionary of cards in the deck and their availability.
         possible_hands (dict): A dictionary of possible poker hands that can be formed from the deck.
+        card_list (list): The cards in the deck ordered by card index.
+        hand_list (list): The possible poker hands ordered by combo index.
+        dealt (int): A 52-bit mask of the cards that have been dealt.
+        blocked (list): The number of dealt cards in each combo, by combo index.
 
     Methods:
+        get_card(card): Get the deck's Card for a card or card index.
+        get_hand(hand): Get the deck's Hand for a hand or combo index.
+        is_available(card): Check whether a card or card index has not been dealt.
+        is_live(hand): Check whether neither card of a hand or combo index has been dealt.
+        live_combos(): Iterate over the combo indices of the hands that can still be dealt.
         deal_card(card): Marks a specific card as dealt and updates possible poker hands.
         add_cards(*args): Marks multiple cards as available and updates possible poker hands.
         deal_specific_card(name, suit): Marks a specific card as dealt by name and suit, updating possible poker hands.
@@ -231,18 +343,97 @@ class Deck:
         self.possible_hands = possible_hands
         self.possible_hand_names = {hand.long_name for hand in self.possible_hands}
 
+        # Integer encoding of the deck used by the simulation engine
+        self.card_list = sorted(self.cards, key=lambda card: card.index)
+        self.hand_list = sorted(self.possible_hands, key=lambda hand: hand.index)
+        self.dealt = 0
+        self.blocked = [0] * len(COMBO_CARDS)
+
+    def get_card(self, card):
+        """
+        Get the deck's Card for a card or card index.
+
+        Args:
+            card (Card or int): A card or its card index (0-51).
+
+        Returns:
+            Card: The matching card.
+        """
+        if isinstance(card, int):
+            return self.card_list[card]
+        return card
+
+    def get_hand(self, hand):
+        """
+        Get the deck's Hand for a hand or combo index.
+
+        Args:
+            hand (Hand or int): A hand or its combo index (0-1325).
+
+        Returns:
+            Hand: The matching hand.
+        """
+        if isinstance(hand, int):
+            return self.hand_list[hand]
+        return hand
+
+    def is_available(self, card):
+        """
+        Check whether a card has not been dealt.
+
+        Args:
+            card (Card or int): A card or its card index.
+
+        Returns:
+            bool: True if the card is still in the deck, False otherwise.
+        """
+        mask = 1 << card if isinstance(card, int) else card.mask
+        return not self.dealt & mask
+
+    def is_live(self, hand):
+        """
+        Check whether neither card of a hand has been dealt.
+
+        Args:
+            hand (Hand or int): A hand or its combo index.
+
+        Returns:
+            bool: True if the hand can still be dealt, False otherwise.
+        """
+        combo = hand if isinstance(hand, int) else hand.index
+        return not self.blocked[combo]
+
+    def live_combos(self):
+        """
+        Iterate over the combo indices of the hands that can still be dealt.
+
+        Yields:
+            int: The combo index of each live hand.
+        """
+        for combo, blocked in enumerate(self.blocked):
+            if not blocked:
+                yield combo
+
     def deal_card(self, card):
         """
         Marks a specific card as dealt and updates possible poker hands.
 
         Args:
-            card (Card): The card to be marked as dealt.
+            card (Card or int): The card, or its card index, to be marked as dealt.
 
         Returns:
             Card: The card that has been dealt.
         """
-        self.cards[card] = False
-        self.check_possible_hands()
+        card = self.get_card(card)
+        if not self.dealt & card.mask:
+            self.cards[card] = False
+            self.dealt |= card.mask
+
+            # Only the combos containing this card change availability
+            for combo in CARD_COMBOS[card.index]:
+                self.blocked[combo] += 1
+                if self.blocked[combo] == 1:
+                    self.possible_hands[self.hand_list[combo]] = False
         return card
 
     def add_cards(self, *args):
@@ -250,11 +441,19 @@ class Deck:
         Marks multiple cards as available and updates possible poker hands.
 
         Args:
-            *args (Card): One or more cards to be marked as available.
+            *args (Card or int): One or more cards, or card indices, to be marked as available.
         """
         for card in args:
-            self.cards[card] = True
-        self.check_possible_hands()
+            card = self.get_card(card)
+            if self.dealt & card.mask:
+                self.cards[card] = True
+                self.dealt &= ~card.mask
+
+                # Only the combos containing this card change availability
+                for combo in CARD_COMBOS[card.index]:
+                    self.blocked[combo] -= 1
+                    if not self.blocked[combo]:
+                        self.possible_hands[self.hand_list[combo]] = True
 
     def deal_specific_card(self, name, suit):
         """
@@ -268,10 +467,7 @@ class Deck:
             Card: The card that has been dealt.
         """
         new_card = [card for card in self.cards if card.name == name.upper() and card.suit == suit.title()]
-        deal = new_card[0]
-        self.cards[deal] = False
-        self.check_possible_hands()
-        return deal
+        return self.deal_card(new_card[0])
 
     def check_possible_hands(self):
         """
@@ -281,22 +477,527 @@ class Deck:
             dict: A dictionary of possible poker hands and their availability.
         """
         for hand in self.possible_hands:
-            card_1 = hand.card_1
-            card_2 = hand.card_2
-            if self.cards[card_1] and self.cards[card_2]:
-                self.possible_hands[hand] = True
-            else:
-                self.possible_hands[hand] = False
+            self.blocked[hand.index] = bin(self.dealt & hand.mask).count('1')
+            self.possible_hands[hand] = not self.blocked[hand.index]
         return self.possible_hands
 
 
+# Where calculated tallies are kept between sessions, and how many spots are kept before the oldest are evicted
+EQUITY_CACHE_PATH = 'cache/equity.sqlite'
+EQUITY_CACHE_SIZE = 10000
+
+
+class EquityCache:
+    """
+    A persistent cache of simulation tallies, kept in an SQLite database.
+
+    Tallies are stored raw rather than as percentages, so a cached result can be resumed and extended by further
+    simulation. When the cache grows past its size the least recently used spots are evicted.
+
+    Attributes:
+        path (str): The database file.
+        size (int): The maximum number of spots kept.
+        hits (int): The number of lookups that found a cached tally.
+        misses (int): The number of lookups that did not.
+
+    Methods:
+        get(key): Get the cached tally of a spot.
+        put(key, tally, exact=False): Store the tally of a spot.
+        describe(): Get a short description of the cache's use.
+    """
+    def __init__(self, path=EQUITY_CACHE_PATH, size=EQUITY_CACHE_SIZE):
+        self.path = path
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.connection:
+            self.connection.execute('CREATE TABLE IF NOT EXISTS tallies (key TEXT PRIMARY KEY, shape TEXT, tally BLOB, '
+                                    'exact INTEGER, used REAL)')
+            self.connection.execute('CREATE INDEX IF NOT EXISTS tallies_used ON tallies (used)')
+
+    def __len__(self):
+        with self.lock:
+            return self.connection.execute('SELECT COUNT(*) FROM tallies').fetchone()[0]
+
+    def get(self, key):
+        """
+        Get the cached tally of a spot, marking it as recently used.
+
+        Args:
+            key (str): The key of the spot.
+
+        Returns:
+            tuple: The tally as an integer array and whether it is exact, or None if the spot is not cached.
+        """
+        with self.lock:
+            row = self.connection.execute('SELECT shape, tally, exact FROM tallies WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            with self.connection:
+                self.connection.execute('UPDATE tallies SET used = ? WHERE key = ?', (time.time(), key))
+        shape = tuple(int(size) for size in row[0].split(','))
+        return np.frombuffer(row[1], dtype=np.int64).reshape(shape).copy(), bool(row[2])
+
+    def put(self, key, tally, exact=False):
+        """
+        Store the tally of a spot, replacing any tally already cached for it, and evict the oldest spots if needed.
+
+        Args:
+            key (str): The key of the spot.
+            tally (np.ndarray): The integer tally.
+            exact (bool, optional): Whether the tally is exact and needs no further simulation.
+        """
+        tally = np.ascontiguousarray(tally, dtype=np.int64)
+        shape = ','.join(str(size) for size in tally.shape)
+        with self.lock, self.connection:
+            self.connection.execute('INSERT OR REPLACE INTO tallies VALUES (?, ?, ?, ?, ?)',
+                                    (key, shape, tally.tobytes(), int(exact), time.time()))
+            self.connection.execute('DELETE FROM tallies WHERE key IN (SELECT key FROM tallies ORDER BY used DESC '
+                                    'LIMIT -1 OFFSET ?)', (self.size,))
+
+    def describe(self):
+        """
+        Get a short description of the cache's use.
+
+        Returns:
+            str: The number of hits, misses and cached spots.
+        """
+        return f'Cache: {self.hits} hits, {self.misses} misses, {len(self)} spots'
+
+
+class LatestValue:
+    """
+    A thread-safe slot holding only the latest value published to it.
+
+    A background calculation publishes snapshots of its results without ever waiting for the interface, and the
+    interface takes the latest one whenever it is ready to draw, so snapshots it has not drawn in time are dropped.
+
+    Attributes:
+        value: The latest value not yet taken, or None.
+        done (bool): Whether the publisher has finished.
+
+    Methods:
+        put(value): Publish a value, replacing any value not yet taken.
+        take(): Take the latest value.
+        finish(): Mark the publisher as finished.
+    """
+    def __init__(self):
+        self.value = None
+        self.done = False
+        self.lock = threading.Lock()
+
+    def put(self, value):
+        """
+        Publish a value, replacing any value not yet taken.
+
+        Args:
+            value: The value to publish.
+        """
+        with self.lock:
+            self.value = value
+
+    def take(self):
+        """
+        Take the latest value.
+
+        Returns:
+            The latest value published since the last take, or None if there is none.
+        """
+        with self.lock:
+            value, self.value = self.value, None
+        return value
+
+    def finish(self):
+        """
+        Mark the publisher as finished, once its last value has been put.
+        """
+        self.done = True
+
+
+# How many seconds a reset waits for cancelled calculations to stop
+JOB_TIMEOUT = 5
+
+# The kind of calculation each tab runs, which is given the CPU while the tab is visible
+TAB_JOBS = {
+    'overview': 'equity',
+    'bet_for_value': 'value',
+    'shove_calculator': 'shove'
+}
+
+
+class Job:
+    """
+    A calculation running in a background thread in slices, checking between slices whether to pause or stop.
+
+    Attributes:
+        name (str): The kind of calculation, e.g. 'equity'.
+        token (threading.Event): Set when the job is cancelled.
+        resumed (threading.Event): Cleared while the job is paused.
+        finished (bool): Whether the job's function has returned.
+        thread (threading.Thread): The thread the job runs in.
+        started (float): When the job was started.
+        futures (set): The job's runs queued in the process pool that have not finished.
+
+    Methods:
+        checkpoint(): Wait while the job is paused and check whether it should carry on.
+        track(future): Keep track of a run the job queued in the process pool.
+        pause(): Pause the job at its next checkpoint, cancelling its queued runs.
+        resume(): Resume the job.
+        cancel(): Ask the job to stop.
+        join(timeout=None): Wait for the job to stop.
+    """
+    def __init__(self, name, function, *args, **kwargs):
+        self.name = name
+        self.token = threading.Event()
+        self.resumed = threading.Event()
+        self.resumed.set()
+        self.finished = False
+        self.thread = threading.Thread(target=function, args=(self,) + args, kwargs=kwargs, daemon=True)
+        self.started = time.time()
+        self.paused_at = None
+        self.paused_for = 0
+        self.futures = set()
+        self.lock = threading.Lock()
+
+    def __repr__(self):
+        if self.cancelled:
+            state = 'cancelled'
+        elif self.finished:
+            state = 'finished'
+        else:
+            state = 'paused' if self.paused else 'running'
+        return f'Job({self.name!r}, {state}, {self.elapsed:.1f}s)'
+
+    @property
+    def cancelled(self):
+        """bool: Whether the job has been asked to stop."""
+        return self.token.is_set()
+
+    @property
+    def paused(self):
+        """bool: Whether the job has been paused."""
+        return not self.resumed.is_set()
+
+    @property
+    def running(self):
+        """bool: Whether the job's thread is still running."""
+        return self.thread.is_alive()
+
+    @property
+    def elapsed(self):
+        """float: The number of seconds the job has run for, not counting the time it was paused."""
+        paused_for = self.paused_for + (time.time() - self.paused_at if self.paused_at is not None else 0)
+        return time.time() - self.started - paused_for
+
+    def checkpoint(self):
+        """
+        Wait while the job is paused, to be called by the job between slices of its calculation.
+
+        Returns:
+            bool: Whether the job should carry on, which it should not once it has been cancelled.
+        """
+        self.resumed.wait()
+        return not self.cancelled
+
+    def track(self, future):
+        """
+        Keep track of a run the job queued in the process pool, so that it is cancelled if the job is paused before
+        the run starts. The run is cancelled straight away if the job is already paused.
+
+        Args:
+            future (concurrent.futures.Future): The queued run.
+        """
+        with self.lock:
+            if self.paused:
+                future.cancel()
+                return
+            self.futures.add(future)
+        future.add_done_callback(self.untrack)
+
+    def untrack(self, future):
+        """
+        Stop keeping track of a run once it has finished or been cancelled.
+
+        Args:
+            future (concurrent.futures.Future): The run.
+        """
+        with self.lock:
+            self.futures.discard(future)
+
+    def pause(self):
+        """
+        Pause the job at its next checkpoint, unless it has been cancelled. Its runs still queued in the process pool
+        are cancelled, so that they do not hold up the jobs that carry on, and runs already started are left to
+        finish.
+        """
+        if not self.cancelled and not self.paused:
+            with self.lock:
+                self.paused_at = time.time()
+                self.resumed.clear()
+                futures = list(self.futures)
+            for future in futures:
+                future.cancel()
+
+    def resume(self):
+        """
+        Resume the job if it is paused.
+        """
+        if self.paused:
+            self.paused_for += time.time() - self.paused_at
+            self.paused_at = None
+            self.resumed.set()
+
+    def cancel(self):
+        """
+        Ask the job to stop, waking it if it is paused. The job stops at its next checkpoint.
+        """
+        self.token.set()
+        self.resume()
+
+    def join(self, timeout=None):
+        """
+        Wait for the job to stop.
+
+        Args:
+            timeout (float, optional): The most seconds to wait, waiting indefinitely if None.
+
+        Returns:
+            bool: Whether the job has stopped.
+        """
+        self.thread.join(timeout)
+        return not self.running
+
+
+class JobManager:
+    """
+    Starts, schedules and cancels the background calculations, keeping at most one current job of each kind.
+
+    Starting a job supersedes the current job of the same kind, which is cancelled. Cancelled jobs are kept track of
+    until their threads stop, so that no calculation is left running unnoticed.
+
+    The job of the visible tab is given the whole CPU: while it is unfinished every other job is paused at its next
+    checkpoint, keeping its progress, and the other jobs are resumed once it finishes or another tab is shown.
+
+    Attributes:
+        current (dict): The current job of each kind, which stays current after it finishes until it is cancelled.
+        jobs (list): Every job started whose thread may still be running.
+        visible (str): The name of the visible tab, or None.
+
+    Methods:
+        start(name, function, *args, **kwargs): Start a job, cancelling the current job of the same kind.
+        active(name): Check if a job of a kind is current.
+        cancel(*names): Cancel the current jobs of some or all kinds.
+        show(tab): Give the job of a newly visible tab the CPU.
+        schedule(): Pause or resume each job according to the visible tab.
+        running(): Get the jobs still running.
+        join(timeout=None): Wait for all jobs to stop.
+    """
+    def __init__(self):
+        self.current = {}
+        self.jobs = []
+        self.visible = None
+        self.lock = threading.Lock()
+
+    def start(self, name, function, *args, **kwargs):
+        """
+        Start a job, cancelling the current job of the same kind.
+
+        Args:
+            name (str): The kind of calculation.
+            function: The function to run, called with the job followed by the other arguments. It should call the
+                job's `checkpoint` between slices of its calculation and return once that returns False.
+            *args, **kwargs: Arguments for the function.
+
+        Returns:
+            Job: The started job.
+        """
+        job = Job(name, self.run, function, args, kwargs)
+        with self.lock:
+            if name in self.current:
+                self.current[name].cancel()
+            self.current[name] = job
+            self.jobs = [other for other in self.jobs if other.running] + [job]
+        self.schedule()
+        job.thread.start()
+        return job
+
+    def run(self, job, function, args, kwargs):
+        """
+        Run a job's function in its thread, then let the paused jobs carry on.
+
+        Args:
+            job (Job): The job.
+            function: The job's function.
+            args (tuple): The function's positional arguments after the job.
+            kwargs (dict): The function's keyword arguments.
+        """
+        try:
+            function(job, *args, **kwargs)
+        finally:
+            job.finished = True
+            self.schedule()
+
+    def active(self, name):
+        """
+        Check if a job of a kind has been started and not cancelled since.
+
+        Args:
+            name (str): The kind of calculation.
+
+        Returns:
+            bool: Whether there is a current job of the kind.
+        """
+        with self.lock:
+            return name in self.current
+
+    def cancel(self, *names):
+        """
+        Cancel the current jobs of some or all kinds.
+
+        Args:
+            *names (str): The kinds of calculation to cancel, cancelling all of them if none are given.
+        """
+        with self.lock:
+            for name in names or list(self.current):
+                if name in self.current:
+                    self.current.pop(name).cancel()
+        self.schedule()
+
+    def show(self, tab):
+        """
+        Record which tab is visible and give its job the CPU.
+
+        Args:
+            tab (str): The name the tab is registered under in `Manager.tabs`.
+        """
+        self.visible = tab
+        self.schedule()
+
+    def schedule(self):
+        """
+        Pause every job except the visible tab's while that job is unfinished, and otherwise resume them all.
+        """
+        with self.lock:
+            foreground = self.current.get(TAB_JOBS.get(self.visible))
+            if foreground is not None and foreground.finished:
+                foreground = None
+            for job in self.jobs:
+                if foreground is None or job is foreground:
+                    job.resume()
+                else:
+                    job.pause()
+
+    def running(self):
+        """
+        Get the jobs whose threads are still running, including paused jobs and cancelled jobs that have not stopped.
+
+        Returns:
+            list: The running jobs.
+        """
+        with self.lock:
+            self.jobs = [job for job in self.jobs if job.running]
+            return list(self.jobs)
+
+    def join(self, timeout=None):
+        """
+        Wait for all running jobs to stop.
+
+        Args:
+            timeout (float, optional): The most seconds to wait in total, waiting indefinitely if None.
+
+        Returns:
+            list: The jobs still running when the wait ended.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        for job in self.running():
+            job.join(None if deadline is None else max(deadline - time.time(), 0))
+        return self.running()
+
+
+# The fields of the game data that describe the game, and so are versioned
+GAME_FIELDS = ('deck', 'hand', 'house', 'ranges')
+
+
+class GameState(dict):
+    """
+    The game data, with a revision counter for each field that describes the game.
+
+    Most changes to the game happen in place, such as dealing a card from the deck or filtering a range, so instead
+    of watching assignments each field is given a cheap fingerprint, and a field's revision only moves on when its
+    fingerprint differs from the one seen when the version was last checked.
+
+    Attributes:
+        revision (int): The revision of the game as a whole, which moves on whenever any field's does.
+        revisions (dict): The revision of each field.
+        fingerprints (dict): The fingerprint of each field when the version was last checked.
+
+    Methods:
+        fingerprint(field): Get the fingerprint of a field.
+        version(): Get the revision of the game, checking each field for changes.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.revision = 0
+        self.revisions = {field: 0 for field in GAME_FIELDS}
+        self.fingerprints = {field: self.fingerprint(field) for field in GAME_FIELDS}
+
+    def fingerprint(self, field):
+        """
+        Get a fingerprint of a field, which changes whenever the field really changes.
+
+        Args:
+            field (str): One of `GAME_FIELDS`.
+
+        Returns:
+            The fingerprint: the dealt card mask of the deck, the combo index of the hand, the card indices of the
+            house or a hash of the live combos in each range.
+        """
+        value = self[field]
+        if field == 'deck':
+            return value.dealt
+        if field == 'hand':
+            return None if value is None else value.index
+        if field == 'house':
+            return tuple(card.index for card in value)
+        return tuple(hash(villain.compile().combos) for villain in value)
+
+    def version(self):
+        """
+        Get the revision of the game, moving on the revision of every field that has changed since the last check.
+
+        Returns:
+            int: The revision of the game.
+        """
+        for field in GAME_FIELDS:
+            fingerprint = self.fingerprint(field)
+            if fingerprint != self.fingerprints[field]:
+                self.fingerprints[field] = fingerprint
+                self.revisions[field] += 1
+                self.revision += 1
+        return self.revision
+
+
 class Manager:
     """
     Manages game data and calculations for the poker application.
 
     Attributes:
-        game_data (dict): A dictionary containing game-related data, such as the deck, hand, house cards, and more.
-        calculating (dict): A dictionary of flags to track various calculations (e.g., equity, shove).
+        game_data (GameState): A versioned dictionary of game-related data, such as the deck, hand, house cards, and
+            more.
+        jobs (JobManager): The background calculations (e.g., equity, shove).
+        workers (int): The number of worker processes simulations are shared between.
+        cache (EquityCache): The cache of simulation tallies.
+        precision (dict): The 95% confidence interval half widths at which each calculation stops, in percentage
+            points of equity, or percent of the pot for the shove EV.
+        max_time (float): The number of seconds after which calculations stop regardless of precision, not counting
+            the time they are paused for.
         summary: Reference to the summary object (not explicitly defined here).
         notebook: Reference to the notebook object (not explicitly defined here).
         tabs (dict): A dictionary to store references to different tabs in the notebook.
@@ -311,32 +1012,39 @@ class Manager:
 
     Methods:
         refresh(): Refresh the summary (if available).
-        stop_calculating(): Set all calculation flags to False.
+        stop_calculating(): Cancel all background calculations.
     Example:
         manager = Manager(1.0)
         manager.refresh()
         manager.stop_calculating()
     """
-    def __init__(self, resize_ratio):
+    def __init__(self, resize_ratio, workers=None, cache=None):
         """
         Initialize the Manager with the given resize ratio.
 
         Args:
             resize_ratio (float): The ratio used for resizing elements.
+            workers (int, optional): The number of worker processes, defaulting to the number of CPUs.
+            cache (EquityCache, optional): The cache of simulation tallies, opened here if not given.
         """
-        # Initialize game data and calculation flags
-        self.game_data = {
+        # Initialize game data and background calculations
+        self.game_data = GameState({
             'deck': Deck(),
             'hand': None,
             'house': [],
             'ranges': [],
             'equity': {},
-            'hand_breakdown': {}
-        }
-        self.calculating = {
-            'equity': False,
-            'shove': False
+            'snapshot': None
+        })
+        self.jobs = JobManager()
+        self.workers = workers or os.cpu_count() or 1
+        self.cache = cache if cache is not None else EquityCache()
+        self.precision = {
+            'equity': 0.1,
+            'value': 0.5,
+            'shove': 1
         }
+        self.max_time = 60
 
         # Store references to summary, notebook, and other properties
         self.summary = None
@@ -363,7 +1071,6 @@ class Manager:
 
     def stop_calculating(self):
         """
-        Set all calculation flags to False.
+        Cancel all background calculations.
         """
-        for calculation in self.calculating:
-            self.calculating[calculation] = False
+        self.jobs.cancel()
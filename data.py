@@ -75,6 +75,10 @@ suit_colours = {"Clubs": "green",
                 }
 
 
+# Hand button colours from hands far ahead of the hero, through a coin flip, to hands the hero is far ahead of
+heat_colours = ["#8B0000", "#B22222", "#CD5C5C", "#D2906E", "#808080", "#8FBC8F", "#3CB371", "#228B22", "#006400"]
+
+
 suit_symbols = {"Clubs": "♣",
                 "Diamonds": "♦",
                 "Hearts": "♥",
@@ -1,24 +1,17 @@
-from random import choice, random
+from math import ceil, comb, sqrt
+from functools import lru_cache
+from itertools import permutations
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 from classes import *
+import multiprocessing
 import threading
+import time
+import os
+import numpy as np
 from PIL import ImageTk
 
 
-def threaded(function):
-    """
-    A decorator to run a function in a separate thread.
-
-    Args:
-        function: The function to be executed in a separate thread.
-
-    """
-    def wrapper(*args, **kwargs):
-        thread = threading.Thread(target=function, args=args, kwargs=kwargs, daemon=True)
-        thread.start()
-        return thread
-    return wrapper
-
-
 def rescale(im: Image, max_width) -> Image:
     """
     Rescale an image to fit within a maximum width while preserving the aspect ratio.
@@ -85,43 +78,6 @@ def get_blank_card(max_width: int) -> ImageTk.PhotoImage:
     return ImageTk.PhotoImage(rgb)
 
 
-def compare(hero_hand, villain_hand) -> float:
-    """
-    Compare two poker hands and determine the winner.
-
-    This function takes two poker hands and compares them to determine the winner or if it's a tie.
-    The function follows typical hand ranking rules in poker.
-
-    Args:
-        hero_hand (list): The poker hand of the hero.
-        villain_hand (list): The poker hand of the villain.
-
-    Returns:
-        float: 1.0 if the hero wins, 0.0 if the villain wins, or 0.5 in case of a tie.
-    """
-    # Evaluate the strength of each hand
-    my_hand = read_them_and_weep(hero_hand)
-    your_hand = read_them_and_weep(villain_hand)
-
-    # Compare the primary hand ranks
-    if my_hand[1] > your_hand[1]:
-        return 1
-    elif my_hand[1] < your_hand[1]:
-        return 0
-    else:
-        # Compare in case of a tie
-        for i in range(2, len(my_hand)):
-            tie_break_hero = my_hand[i]
-            tie_break_villain = your_hand[i]
-            for j in range(len(my_hand[i])):
-                if tie_break_hero[j] > tie_break_villain[j]:
-                    return 1
-                elif tie_break_hero[j] < tie_break_villain[j]:
-                    return 0
-    # It's a tie
-    return 0.5
-
-
 def check_flush_draw(list_of_cards):
     """
     Check for a flush draw and return the number of cards in the strongest suit.
@@ -231,42 +187,6 @@ def check_gutshot_straight_draw(list_of_cards):
     return n, max_value   # Return the number of gutshot straight draws and the maximum completing card value
 
 
-def check_multiples(list_of_cards):
-    """
-    Check for multiples (cards with the same value) in a list of cards and return relevant information.
-
-    This function identifies multiples (cards with the same value) and returns the number of multiples,
-    the card value with the most multiples, and a list of cards that don't belong to the multiples.
-
-    Args:
-        list_of_cards (list): A list of Card objects to check for multiples.
-
-    Returns:
-        tuple: A tuple containing three elements - the number of multiples, the card value with the most multiples,
-        and a list of cards that are not part of the multiples.
-    """
-    card_values = [card.value for card in list_of_cards]
-
-    # Sort the card values for easier analysis
-    card_values.sort()
-
-    value = 0    # Card value with the most multiples
-    n = 1   # Number of multiples
-    r = 1   # Consecutive values count
-    for i in range(len(card_values) - 1):
-        if card_values[i] == card_values[i + 1]:
-            r += 1  # Increment the consecutive values count
-            if r > n or (r == n and card_values[i] > value):
-                n = r   # Update the number of multiples
-                value = card_values[i]  # Update the card value with the most multiples
-        else:
-            r = 1   # Reset the consecutive values count
-
-    # Create a list of cards that don't belong to the multiples
-    leftover_cards = [card for card in list_of_cards if card.value != value]
-    return n, value, leftover_cards
-
-
 def high_cards(list_of_cards):
     """
     Determine the highest card values from a list of cards.
@@ -290,474 +210,2511 @@ def high_cards(list_of_cards):
     return top_five
 
 
-def read_them_and_weep(list_of_cards):
+# Bits 0-12 of a rank mask stand for the values 2 to ace, strengths pack the made hand category above five
+# four-bit tie-break values so that any two strengths compare correctly as plain integers
+STRENGTH_SHIFT = 20
+RANK_KEYS = {value: 1 << 4 * (value - 2) for value in range(2, 15)}
+RANK_BITS = {value: 1 << (value - 2) for value in range(2, 15)}
+RANK_KEY_MASK = (1 << 52) - 1
+
+# Per card index: the rank key with the suit's count key stored above it, and the card's bit in its suit's rank mask
+CARD_KEYS = tuple(RANK_KEYS[index // 4 + 2] | 1 << 52 + 4 * (index % 4) for index in range(52))
+CARD_BITS = tuple(RANK_BITS[index // 4 + 2] for index in range(52))
+FLUSH_SUITS = {8 << 4 * count: count for count in range(4)}
+
+
+def pack_strength(category, tie_breaks=()):
+    """
+    Pack a made hand category and its tie-break values into a single comparable integer.
+
+    Args:
+        category (int): The made hand category (2 for high card up to 10 for a straight flush).
+        tie_breaks (tuple): Up to five card values in order of importance.
+
+    Returns:
+        int: The hand strength.
     """
-    Evaluate a list of cards and determine the best poker hand.
+    strength = category
+    for i in range(5):
+        strength = strength << 4 | (tie_breaks[i] if i < len(tie_breaks) else 0)
+    return strength
 
-    This function takes a list of cards and evaluates them to determine the best possible poker hand.
-    It returns the name of the hand, its rank, and relevant card values to represent its strength.
+
+def unpack_strength(strength):
+    """
+    Split a hand strength back into its made hand category and tie-break values.
 
     Args:
-        list_of_cards (list): A list of Card objects to evaluate.
+        strength (int): A hand strength produced by the evaluator.
 
     Returns:
-        tuple: A tuple containing the hand name, rank, and relevant card values.
+        tuple: The made hand category and a tuple of the five tie-break values.
     """
+    tie_breaks = tuple(strength >> 4 * i & 15 for i in range(4, -1, -1))
+    return strength >> STRENGTH_SHIFT, tie_breaks
 
-    # Check for a flush draw and the highest suit cards
-    flush = check_flush_draw(list_of_cards)
 
-    # Check for a straight draw and its top card
-    straight = check_straight_draw(list_of_cards)
+def build_straight_table():
+    """
+    Build a table of the top card of the best straight contained in every 13-bit rank mask.
 
-    # Determine the hand based on evaluation
-    if flush[0] >= 5:
-        # Check for a straight within the flush
-        straight_flush = check_straight_draw(flush[1])
-        if straight_flush[0] >= 5:
-            return f"Straight Flush, {straight_flush[1]} high", 10, (straight[1], )
+    Returns:
+        list: 8192 entries holding the top card value of the best straight, or 0 if there is none.
+    """
+    table = [0] * 8192
+    for mask in range(8192):
+        for top in range(14, 5, -1):
+            run = 31 << (top - 6)
+            if mask & run == run:
+                table[mask] = top
+                break
         else:
-            flush_five = high_cards(flush[1])
-            return f"Flush, {flush_five[0]} high", 7, flush_five
-            # impossible to have a flush and quads or full house in 7 cards
-
-    # Check for multiples (four of a kind, full house, three of a kind, two pair, or a pair)
-    multiples = check_multiples(list_of_cards)
-    leftover = check_multiples(multiples[2])
-
-    if multiples[0] == 4:
-        kicker = high_cards(multiples[2])[0]
-        return f"Quad {multiples[1]}s", 9, (multiples[1], ), (kicker, )
-    elif multiples[0] == 3 and leftover[0] >= 2:
-        return f"Full House, {multiples[1]}s over {leftover[1]}s", 8, (multiples[1], leftover[1])
-
-    if straight[0] >= 5:
-        return f"Straight, {straight[1]} high", 6, (straight[1], )
-
-    if multiples[0] == 3:
-        kickers = high_cards(multiples[2])[:2]
-        return f"Three of a kind, {multiples[1]}s", 5, (multiples[1], ), tuple(kickers)
-
-    if multiples[0] == 2:
-        if leftover[0] == 2:
-            remainder = high_cards(leftover[2])
-            if remainder:
-                kicker = high_cards(leftover[2])[0]
-            else:
-                kicker = 0
-            return f"Two pair, {multiples[1]}s and {leftover[1]}s", 4, (multiples[1], leftover[1], kicker)
+            wheel = RANK_BITS[14] | 15
+            if mask & wheel == wheel:
+                table[mask] = 5
+    return table
+
+
+def build_flush_table():
+    """
+    Build a table of the strength of the best flush or straight flush for every 13-bit rank mask of one suit.
+
+    Returns:
+        list: 8192 entries holding a hand strength, or 0 for masks with fewer than five cards.
+    """
+    table = [0] * 8192
+    for mask in range(8192):
+        flush_values = [value for value in range(14, 1, -1) if mask & RANK_BITS[value]]
+        if len(flush_values) < 5:
+            continue
+        if STRAIGHTS[mask]:
+            table[mask] = pack_strength(10, (STRAIGHTS[mask], ))
         else:
-            kickers = high_cards(leftover[2])[:3]
-            return f"A pair of {multiples[1]}s", 3, (multiples[1], ), tuple(kickers)
-    else:
-        high_card = high_cards(list_of_cards)
-        return f"High card {high_card[0]}", 2, tuple(high_card)
+            table[mask] = pack_strength(7, flush_values[:5])
+    return table
+
+
+def rank_strength(counts):
+    """
+    Find the strength of the best hand that can be made from a collection of card values, ignoring flushes.
+
+    Args:
+        counts (dict): The number of cards held of each value.
+
+    Returns:
+        int: The hand strength.
+    """
+    mask = 0
+    for value in counts:
+        mask |= RANK_BITS[value]
+    groups = sorted(((counts[value], value) for value in counts), reverse=True)
+    singles = sorted(counts, reverse=True)
+
+    if groups[0][0] == 4:
+        kickers = [value for value in singles if value != groups[0][1]]
+        return pack_strength(9, (groups[0][1], ) + tuple(kickers[:1]))
+    if groups[0][0] == 3 and len(groups) > 1 and groups[1][0] >= 2:
+        return pack_strength(8, (groups[0][1], groups[1][1]))
+    if STRAIGHTS[mask]:
+        return pack_strength(6, (STRAIGHTS[mask], ))
+    if groups[0][0] == 3:
+        kickers = [value for value in singles if value != groups[0][1]]
+        return pack_strength(5, (groups[0][1], ) + tuple(kickers[:2]))
+    if groups[0][0] == 2 and len(groups) > 1 and groups[1][0] == 2:
+        kickers = [value for value in singles if value not in (groups[0][1], groups[1][1])]
+        return pack_strength(4, (groups[0][1], groups[1][1]) + tuple(kickers[:1]))
+    if groups[0][0] == 2:
+        kickers = [value for value in singles if value != groups[0][1]]
+        return pack_strength(3, (groups[0][1], ) + tuple(kickers[:3]))
+    return pack_strength(2, tuple(singles[:5]))
+
+
+def build_rank_table(max_cards=7):
+    """
+    Build the perfect hash table from every collection of up to seven card values to its non-flush strength.
 
+    Each collection is keyed by the sum of the `RANK_KEYS` of its cards, which stores the count of each value in its
+    own four bits.
+
+    Args:
+        max_cards (int): The largest number of cards to build entries for.
 
-def check_house_possibility(house_cards, deck):
+    Returns:
+        dict: A dictionary of rank keys and hand strengths.
     """
-    Check the possibility of forming a poker house with given house cards and a deck.
+    table = {}
+
+    def add_values(lowest, counts, key, cards):
+        for value in range(lowest, 15):
+            for count in range(1, min(4, max_cards - cards) + 1):
+                counts[value] = count
+                table[key + count * RANK_KEYS[value]] = rank_strength(counts)
+                add_values(value + 1, counts, key + count * RANK_KEYS[value], cards + count)
+            counts.pop(value, None)
+
+    add_values(2, {}, 0, 0)
+    return table
+
 
-    This function checks if it is possible to form a poker full house (a set of three cards and a pair)
-    with the provided house cards while considering the availability of cards in the deck.
+# The number of bits of the open addressing table the rank keys are hashed into, about three slots per key, and the
+# multiplier that spreads the keys over it
+RANK_HASH_BITS = 18
+RANK_HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def rank_slots(keys):
+    """
+    Hash rank keys to their first slot in the rank hash table.
 
     Args:
-        house_cards (list): A list of Card objects representing the house cards to check.
-        deck (Deck): The deck of cards to verify card availability from.
+        keys (np.ndarray): An array of rank keys.
 
     Returns:
-        bool: True if forming a full house is possible, False otherwise.
+        np.ndarray: The slot each key's search of the table starts from.
     """
-    possible = True
-    for card in house_cards:
-        if not deck.cards[card]:
-            possible = False
-    return possible
+    return ((keys * RANK_HASH_MULTIPLIER) >> np.uint64(64 - RANK_HASH_BITS)).astype(np.int64)
 
 
-def calculate_equity(my_hand, pack, possible_hands, house_cards=()):
+def build_rank_hash(table):
     """
-    Calculate equity for a poker hand against a range of possible opponent hands.
+    Build the open addressing table that looks the rank keys of many hands up at once.
 
-    This function calculates the equity of a poker hand against a range of possible opponent hands.
-    It simulates various outcomes based on possible house cards and competing opponent hands.
+    Each key is stored in the first free slot from the one it hashes to, so that looking it up only has to step on
+    past the slots taken by other keys. Keys are placed a round at a time, each free slot going to the first key that
+    reaches it.
 
     Args:
-        my_hand (Hand): The poker hand of the hero.
-        pack (Deck): The deck of cards used in the simulation.
-        possible_hands (dict): A dictionary of possible opponent hand ranges.
-        house_cards (list, optional): House cards that are already dealt.
+        table (dict): A dictionary of rank keys and hand strengths, as built by `build_rank_table`.
 
-    Yields:
-        tuple: A tuple containing equity percentages and hand breakdown percentages for the hero and opponents.
+    Returns:
+        tuple: An array of the key in each slot and an array of the strength in each slot.
     """
-    # Initialize a dictionary to store hand breakdown information for the hero and opponents.
-    hands_breakdown = {'hero': {n: {'made': 0, 'wins': 0} for n in range(2, 11)}}
-    for i in range(len(possible_hands)):
-        hands_breakdown[i] = {n: {'made': 0, 'wins': 0} for n in range(2, 11)}
+    size = 1 << RANK_HASH_BITS
+    keys = np.array(list(table), dtype=np.uint64)
+    strengths = np.array(list(table.values()), dtype=np.int64)
+    slot_keys = np.zeros(size, dtype=np.uint64)
+    slot_strengths = np.zeros(size, dtype=np.int64)
+    taken = np.zeros(size, dtype=bool)
+    slots = rank_slots(keys)
+    pending = np.arange(len(keys))
+    while pending.size:
+        free = pending[~taken[slots[pending]]]
+        placed = free[np.unique(slots[free], return_index=True)[1]]
+        slot_keys[slots[placed]] = keys[placed]
+        slot_strengths[slots[placed]] = strengths[placed]
+        taken[slots[placed]] = True
+        pending = pending[~np.isin(pending, placed)]
+        slots[pending] = (slots[pending] + 1) & (size - 1)
+    return slot_keys, slot_strengths
+
+
+STRAIGHTS = build_straight_table()
+FLUSHES = build_flush_table()
+RANKS = build_rank_table()
+
+# Array versions of the tables for evaluating many hands at once with NumPy
+RANK_TABLE_KEYS = np.array(sorted(RANKS), dtype=np.uint64)
+RANK_TABLE_STRENGTHS = np.array([RANKS[key] for key in sorted(RANKS)], dtype=np.int64)
+RANK_HASH_KEYS, RANK_HASH_STRENGTHS = build_rank_hash(RANKS)
+FLUSH_TABLE = np.array(FLUSHES, dtype=np.int64)
+CARD_RANK_KEYS = np.array([key & RANK_KEY_MASK for key in CARD_KEYS], dtype=np.uint64)
+CARD_SUIT_KEYS = np.array([key >> 52 for key in CARD_KEYS], dtype=np.int64)
+CARD_RANK_BITS = np.array(CARD_BITS, dtype=np.int64)
+COMBO_CARD_ARRAY = np.array(COMBO_CARDS, dtype=np.int64)
+COMBO_MASK_ARRAY = np.array(COMBO_MASKS, dtype=np.uint64)
+CARD_MASK_ARRAY = np.array([1 << index for index in range(52)], dtype=np.uint64)
+
+
+def index_strength(card_indices):
+    """
+    Evaluate a list of card indices and determine the strength of the best poker hand.
 
-    # Get the hero's hand as a tuple.
-    hand = my_hand.tuple
-    total = 0
+    This function looks the best hand up in precomputed tables, so it is cheap enough to call for every player on
+    every simulated run out. The human-readable name of a hand is only produced on request by `describe_strength`.
 
-    # Initialize a dictionary to store results (number of wins) for the hero and opponents.
-    results = {'hero': 0}
-    for count, villain_range in enumerate(possible_hands):
-        results[count] = 0
+    Args:
+        card_indices (list): A list of up to seven card indices (0-51) to evaluate.
 
-    # Calculate the number of remaining cards to deal.
-    remaining = 5 - len(house_cards)
+    Returns:
+        int: The hand strength. Stronger hands have larger strengths and the made hand category can be read from
+        `strength >> STRENGTH_SHIFT`.
+    """
+    key = 0
+    for index in card_indices:
+        key += CARD_KEYS[index]
+
+    # Adding three to each suit's count only carries into its top bit when five or more cards share that suit
+    flush = ((key >> 52) + 0x3333) & 0x8888
+    if flush:
+        suit = FLUSH_SUITS[flush]
+        mask = 0
+        for index in card_indices:
+            if index & 3 == suit:
+                mask |= CARD_BITS[index]
+        return FLUSHES[mask]
+    return RANKS[key & RANK_KEY_MASK]
+
+
+def hand_strength(list_of_cards):
+    """
+    Evaluate a list of cards and determine the strength of the best poker hand.
+
+    Args:
+        list_of_cards (list): A list of up to seven Card objects to evaluate.
+
+    Returns:
+        int: The hand strength, as returned by `index_strength`.
+    """
+    return index_strength([card.index for card in list_of_cards])
+
+
+def describe_strength(strength):
+    """
+    Describe a hand strength in words.
+
+    Args:
+        strength (int): A hand strength produced by `hand_strength`.
 
-    # Create a list of leftover cards from the deck.
-    leftover = [card for card in pack.cards if pack.cards[card]]
+    Returns:
+        str: The name of the hand (e.g., 'Full House, 14s over 13s').
+    """
+    category, tie_breaks = unpack_strength(strength)
+    if category == 10:
+        return f"Straight Flush, {tie_breaks[0]} high"
+    elif category == 9:
+        return f"Quad {tie_breaks[0]}s"
+    elif category == 8:
+        return f"Full House, {tie_breaks[0]}s over {tie_breaks[1]}s"
+    elif category == 7:
+        return f"Flush, {tie_breaks[0]} high"
+    elif category == 6:
+        return f"Straight, {tie_breaks[0]} high"
+    elif category == 5:
+        return f"Three of a kind, {tie_breaks[0]}s"
+    elif category == 4:
+        return f"Two pair, {tie_breaks[0]}s and {tie_breaks[1]}s"
+    elif category == 3:
+        return f"A pair of {tie_breaks[0]}s"
+    return f"High card {tie_breaks[0]}"
+
+
+def rank_strengths(keys):
+    """
+    Look the rank keys of many hands up in the rank hash table.
 
-    # Generate all possible combinations of house cards from the leftover cards.
-    houses = list(combinations(leftover, remaining))
+    Args:
+        keys (np.ndarray): An array of rank keys, each of which must be in the table.
 
-    randomiser = 0
+    Returns:
+        np.ndarray: The non-flush strength of each key.
+    """
+    slots = rank_slots(keys)
+    strengths = RANK_HASH_STRENGTHS[slots]
 
-    while True:
-        possible = False
-        villain_hands = {}
-        opponents = len(possible_hands)
+    # Step the keys that found another key in their slot on until they find their own
+    missed = np.nonzero(RANK_HASH_KEYS[slots] != keys)[0]
+    while missed.size:
+        slots[missed] = (slots[missed] + 1) & (len(RANK_HASH_KEYS) - 1)
+        found = RANK_HASH_KEYS[slots[missed]] == keys[missed]
+        strengths[missed[found]] = RANK_HASH_STRENGTHS[slots[missed[found]]]
+        missed = missed[~found]
+    return strengths
 
-        # Deal opponent hands and simulate a possible house card combination.
-        for n in range(opponents):
-            chosen = (n + randomiser) % opponents
-            villain = possible_hands[chosen]
-            villain.refresh()
-            new_list = [hand for hand in villain.hands if villain.hands[hand]]
-            villain_hole = choice(new_list).tuple
-            villain_hands[chosen] = villain_hole
 
-            # Mark dealt cards as unavailable in the deck.
-            for card in villain_hole:
-                pack.deal_card(card)
+def batch_strength(card_indices):
+    """
+    Evaluate many hands at once and determine the strength of the best poker hand in each.
 
-        house = []
+    This is the array version of `index_strength`: rank keys are looked up in the rank hash table and the rows
+    holding a flush are then looked up in the flush table.
 
-        # Randomly select a house card combination until a possible one is found.
-        while not possible:
-            house = choice(houses)
-            possible = check_house_possibility(house, pack)
+    Args:
+        card_indices (numpy.ndarray): An array of shape (hands, cards) holding up to seven card indices per hand.
 
-        # Combine hero's hand, house cards, and dealt house cards.
-        hero_final = hand + house + house_cards
-        competing = {'hero': hero_final}
+    Returns:
+        numpy.ndarray: The strength of each hand.
+    """
+    strengths = rank_strengths(CARD_RANK_KEYS[card_indices].sum(axis=1, dtype=np.uint64))
 
-        # Combine opponent hands, house cards, and dealt house cards.
-        for villain in villain_hands:
-            villain_final = villain_hands[villain] + house + house_cards
-            competing[villain] = villain_final
+    # Find the rows with five or more cards of one suit and look their flush up instead
+    suit_counts = CARD_SUIT_KEYS[card_indices].sum(axis=1)
+    flush = (suit_counts + 0x3333) & 0x8888
+    rows = np.nonzero(flush)[0]
+    if rows.size:
+        flush = flush[rows]
+        suit = (flush >= 0x80).astype(np.int64) + (flush >= 0x800) + (flush >= 0x8000)
+        flush_cards = card_indices[rows]
+        in_suit = (flush_cards & 3) == suit[:, None]
+        masks = (CARD_RANK_BITS[flush_cards] * in_suit).sum(axis=1)
+        strengths[rows] = FLUSH_TABLE[masks]
+    return strengths
 
-        # Increment the total number of simulations.
-        total += 1
-        randomiser += 1
 
-        # Determine the winner of the current simulation.
-        run_out = decide_winner(competing)
+# How many boards' strength indices are kept
+BOARD_INDEX_SIZE = 32
 
-        # Update results with the winner of the current simulation.
-        for player in results:
-            results[player] += run_out[player]
-            made_hand = read_them_and_weep(competing[player])[1]
 
-            # Update hand breakdown statistics.
-            hands_breakdown[player][made_hand]['made'] += 1
-            hands_breakdown[player][made_hand]['wins'] += run_out[player]
+class BoardIndex:
+    """
+    The strength of every combo on one board, evaluated once and kept in sorted order.
 
-        # Calculate and yield the current equity percentages.
-        share = {player: results[player] * 100 / total for player in results}
-        hands_breakdown_percentages = {player: {made_hand: {'made': hands_breakdown[player][made_hand]['made'] / total,
-                                                            'wins': hands_breakdown[player][made_hand]['wins'] / total}
-                                                for made_hand in hands_breakdown[player]}
-                                       for player in hands_breakdown}
-        yield share, hands_breakdown_percentages
+    Attributes:
+        board (tuple): The sorted card indices of the board, a flop, turn or river.
+        live (np.ndarray): Whether each combo, by combo index, shares no card with the board.
+        strengths (np.ndarray): The strength of each combo with the board, or -1 for combos that share a card with it.
+        order (np.ndarray): The combo indices of the live combos, strongest first.
+        ranks (np.ndarray): The position of each combo in `order`, or 1326 for combos that share a card with the board.
 
-        # Restore dealt cards to the deck.
-        for antagonist in villain_hands:
-            for card in villain_hands[antagonist]:
-                pack.add_cards(card)
+    Methods:
+        top(combos, fraction): Get the strongest fraction of some combos on the board.
+    """
+    def __init__(self, board):
+        self.board = board
+        self.live = (COMBO_MASK_ARRAY & np.uint64(sum(1 << index for index in board))) == 0
+        live = np.nonzero(self.live)[0]
+        cards = np.concatenate([COMBO_CARD_ARRAY[live], np.broadcast_to(np.array(board, dtype=np.int64),
+                                                                        (len(live), len(board)))], axis=1)
+        self.strengths = np.full(1326, -1, dtype=np.int64)
+        self.strengths[live] = batch_strength(cards)
+        self.order = live[np.argsort(-self.strengths[live], kind='stable')]
+        self.ranks = np.full(1326, 1326, dtype=np.int64)
+        self.ranks[self.order] = np.arange(len(self.order))
+
+    def top(self, combos, fraction):
+        """
+        Get the strongest fraction of some combos on the board, keeping combos tied with the weakest one kept.
+
+        Args:
+            combos (iterable): The combo indices, such as the combos in a range.
+            fraction (float): The fraction of the live combos to keep, from 0 to 1.
+
+        Returns:
+            frozenset: The combo indices kept.
+        """
+        combos = np.array(tuple(combos), dtype=np.int64)
+        combos = combos[self.live[combos]]
+        keep = ceil(fraction * len(combos))
+        if not keep:
+            return frozenset()
+        ordered = combos[np.argsort(self.ranks[combos], kind='stable')]
+        cutoff = self.strengths[ordered[keep - 1]]
+        return frozenset(combos[self.strengths[combos] >= cutoff].tolist())
+
+
+@lru_cache(maxsize=BOARD_INDEX_SIZE)
+def build_board_index(board):
+    """
+    Build the strength index of a board, keeping the indices of the most recently used boards.
 
+    Args:
+        board (tuple): The sorted card indices of the board.
 
-def calculate_called_equity(my_hand, pack, possible_hands, initial_ranges, house_cards=()):
+    Returns:
+        BoardIndex: The strength index of the board.
     """
-    Calculate equity for a poker hand in a scenario where opponents may fold or call.
+    return BoardIndex(board)
 
-    This function calculates the equity of a poker hand in a scenario where possible opponents
-    may choose to fold or call based on their initial hand ranges.
+
+def board_index(board):
+    """
+    Get the strength index of a board, which is only built the first time the board is seen.
+
+    Args:
+        board (iterable): The card indices of the board, in any order.
+
+    Returns:
+        BoardIndex: The strength index of the board.
+    """
+    return build_board_index(tuple(sorted(board)))
+
+
+# Without a flush a combo's strength only depends on its ranks: the rank key of each of the 91 pairs of ranks a
+# combo can hold, the pair each combo holds and the rank bits of each combo's cards of each suit
+RANK_PAIR_KEYS, COMBO_RANK_PAIRS = np.unique(CARD_RANK_KEYS[COMBO_CARD_ARRAY].sum(axis=1, dtype=np.uint64),
+                                             return_inverse=True)
+COMBO_SUIT_BITS = np.array([[sum(CARD_BITS[index] for index in cards if index & 3 == suit) for cards in COMBO_CARDS]
+                            for suit in range(4)], dtype=np.int64)
+
+
+def board_strengths(boards):
+    """
+    Evaluate every combo on many complete boards at once.
+
+    Each board is only looked up in the rank table once for each pair of ranks, and the boards holding three or more
+    cards of a suit are then looked up in the flush table for the combos that complete the flush. A seven card hand
+    holding a flush cannot hold a full house or quads, so the stronger of the two lookups is the combo's strength.
+
+    Args:
+        boards (np.ndarray): An array of shape (boards, 5) holding the card indices of each board.
+
+    Returns:
+        np.ndarray: An array of shape (boards, 1326) holding the strength of every combo on each board, which is
+        meaningless for combos sharing a card with the board.
+    """
+    keys = CARD_RANK_KEYS[boards].sum(axis=1, dtype=np.uint64)[:, None] + RANK_PAIR_KEYS
+    positions = np.minimum(np.searchsorted(RANK_TABLE_KEYS, keys), len(RANK_TABLE_KEYS) - 1)
+    strengths = RANK_TABLE_STRENGTHS[positions][:, COMBO_RANK_PAIRS]
+
+    # Only one suit can have three or more of a board's five cards
+    counts = (CARD_SUIT_KEYS[boards].sum(axis=1)[:, None] >> 4 * np.arange(4)) & 15
+    rows = np.nonzero(counts.max(axis=1) >= 3)[0]
+    if rows.size:
+        suit = counts[rows].argmax(axis=1)
+        in_suit = (boards[rows] & 3) == suit[:, None]
+        bits = (CARD_RANK_BITS[boards[rows]] * in_suit).sum(axis=1)
+        strengths[rows] = np.maximum(strengths[rows], FLUSH_TABLE[bits[:, None] | COMBO_SUIT_BITS[suit]])
+    return strengths
+
+
+@lru_cache(maxsize=BOARD_INDEX_SIZE)
+def build_combo_equities(hero, house):
+    """
+    Calculate the hero's exact heads up equity against every combo, which is only done the first time a hand and
+    house are seen.
+
+    Every remaining run out is evaluated at once with `board_strengths`, and each combo only meets the run outs that
+    do not hold one of its cards. Before the flop the equities are read from the preflop table instead.
+
+    Args:
+        hero (int): The combo index of the hero's hand.
+        house (tuple): The sorted card indices of the house cards.
+
+    Returns:
+        np.ndarray: The hero's equity percentage against every combo, or NaN for combos sharing a card with the hero
+        or the house, or None before the flop without a preflop table.
+    """
+    dead = COMBO_MASKS[hero] | sum(1 << index for index in house)
+    clashes = (COMBO_MASK_ARRAY & np.uint64(dead)) != 0
+    if not house:
+        if PREFLOP_TABLE is None:
+            return None
+        equities = PREFLOP_TABLE[hero] / PREFLOP_SCALE * 100
+    else:
+        live = [index for index in range(52) if not dead >> index & 1]
+        run_outs = np.array(list(combinations(live, 5 - len(house))), dtype=np.int64)
+        strengths = board_strengths(np.concatenate([np.broadcast_to(house, (len(run_outs), len(house))), run_outs],
+                                                   axis=1))
+        hero_strengths = strengths[:, hero, None]
+        masks = (np.uint64(1) << run_outs.astype(np.uint64)).sum(axis=1, dtype=np.uint64)
+        meets = (masks[:, None] & COMBO_MASK_ARRAY) == 0
+        points = ((hero_strengths > strengths).astype(np.int64) * 2 + (hero_strengths == strengths)) * meets
+        equities = points.sum(axis=0) * 50 / np.maximum(meets.sum(axis=0), 1)
+    equities[clashes] = np.nan
+    equities.flags.writeable = False
+    return equities
+
+
+def combo_equities(my_hand, house_cards=()):
+    """
+    Get the hero's exact heads up equity against every combo on the house.
 
     Args:
         my_hand (Hand): The poker hand of the hero.
-        pack (Deck): The deck of cards used in the simulation.
-        possible_hands (list): A dictionary of possible opponent hand ranges.
-        initial_ranges (list): The initial hand ranges of possible opponents.
         house_cards (list, optional): House cards that are already dealt.
 
-    Yields:
-        tuple: A tuple containing equity percentages, fold percentages, and average number of players.
+    Returns:
+        np.ndarray: The hero's equity percentage against every combo, as returned by `build_combo_equities`.
     """
-    hand = my_hand.tuple
-    total = 0
-    folds = 0
-    wins = 0
-    players = 0
+    return build_combo_equities(my_hand.index, tuple(sorted(card.index for card in house_cards)))
 
-    # Calculate the number of remaining cards to deal.
-    remaining = 5 - len(house_cards)
 
-    # Create a list of leftover cards from the deck.
-    leftover = [card for card in pack.cards if pack.cards[card]]
-
-    # Generate all possible combinations of house cards from the leftover cards.
-    houses = list(combinations(leftover, remaining))
-    randomiser = 0
-
-    while True:
-        possible = False
-        villain_hands = {}
-        opponents = len(possible_hands)
-
-        # Iterate over possible opponents.
-        for n in range(opponents):
-            chosen = (n + randomiser) % opponents
-            villain_initial = initial_ranges[chosen]
-            villain_initial.refresh()
-            villain = possible_hands[chosen]
-            villain.refresh()
-
-            # Extract the initial and current possible opponent hand lists.
-            old_list = [hand for hand in villain_initial.hands if villain_initial.hands[hand]]
-            new_list = [hand for hand in villain.hands if villain.hands[hand]]
-
-            # Calculate the calling percentage based on the difference in hand lists.
-            call_percentage = len(new_list) / len(old_list)
-
-            # Generate a random number to determine if the opponent calls.
-            random_number = random()
-            if random_number < call_percentage:
-                # The opponent calls, so choose a hand from the current list.
-                villain_hole = choice(new_list).tuple
-                villain_hands[chosen] = villain_hole
-
-                # Mark the dealt cards as unavailable in the deck.
-                for card in villain_hole:
-                    pack.deal_card(card)
-
-        randomiser += 1
-        total += 1
-
-        # If no opponent called, increment the fold count.
-        if not villain_hands:
-            folds += 1
-            if total - folds:
-                # Calculate and yield equity, fold percentage, and average number of players.
-                output = wins / (total - folds), folds / total, players / (total - folds)
-                yield output
-            continue
+def range_equities(my_hand, villain_range, house_cards=()):
+    """
+    Get the hero's exact heads up equity against every live combo in a villain's range.
 
-        house = []
+    Args:
+        my_hand (Hand): The poker hand of the hero.
+        villain_range (Range): The villain's range.
+        house_cards (list, optional): House cards that are already dealt.
 
-        # Randomly select a house card combination until a possible one is found.
-        while not possible:
-            house = choice(houses)
-            possible = check_house_possibility(house, pack)
-        hero_final = hand + house + house_cards
-        competing = {'hero': hero_final}
+    Returns:
+        dict: The hero's equity percentage against each live combo index in the range that shares no card with the
+        hero, or None if the equities cannot be calculated.
+    """
+    equities = combo_equities(my_hand, house_cards)
+    if equities is None:
+        return None
+    return {combo: float(equities[combo]) for combo in villain_range.compile().combos
+            if not np.isnan(equities[combo])}
 
-        # Combine opponent hands, house cards, and dealt house cards.
-        for villain in villain_hands:
-            villain_final = villain_hands[villain] + house + house_cards
-            competing[villain] = villain_final
 
-        players += len(competing)
+# The starting hand class of every combo, named as the hand buttons name them (e.g. 'AKs', 'AK' or 'AA')
+RANK_NAMES = {value: name for name, value in values.items()}
+COMBO_CLASSES = tuple(RANK_NAMES[high // 4 + 2] + RANK_NAMES[low // 4 + 2] + ('s' if low & 3 == high & 3 else '')
+                      for low, high in COMBO_CARDS)
 
-        # Determine the winner of the current simulation.
-        run_out = decide_winner(competing)
+# How many houses' equity matrices are kept
+EQUITY_MATRIX_SIZE = 4
 
-        # Increment the wins counter for the hero.
-        wins += run_out['hero']
 
-        # Calculate and yield equity, fold percentage, and average number of players.
-        output = wins / (total - folds), folds / total, players / (total - folds)
-        yield output
+class EquityMatrix:
+    """
+    Represents the heads up equity of every combo against every other combo on a house, so that whole ranges can be
+    compared and any part of them aggregated without calculating anything again.
 
-        # Restore dealt cards to the deck.
-        for antagonist in villain_hands:
-            for card in villain_hands[antagonist]:
-                pack.add_cards(card)
+    Every pair of combos that share no card with each other or the house meets the same number of run outs, so each
+    pair counts equally when aggregating.
 
+    Attributes:
+        house (tuple): The sorted card indices of the house cards.
+        equities (np.ndarray): The equity percentage of each row's combo against each column's combo, or NaN where
+            the combos share a card with each other or the house.
 
-def calculate_shove_ev(my_hand, pack, possible_hands, pot, bet, initial_ranges, house_cards=()):
+    Methods:
+        combo_equities(hero_combos, villain_combos): Get the equity of each hero combo against some villain combos.
+        equity(hero_combos, villain_combos): Get the equity of some hero combos against some villain combos.
+        class_equities(hero_combos, villain_combos): Get the equity of each starting hand class of some hero combos.
     """
-    Calculate the expected value (EV) of shoving (going all-in) with a poker hand.
+    def __init__(self, house, equities):
+        self.house = house
+        self.equities = equities
+
+    def block(self, hero_combos, villain_combos):
+        """
+        Get the part of the matrix between some hero combos and some villain combos.
+
+        Args:
+            hero_combos (iterable): The combo indices of the hero's hands.
+            villain_combos (iterable): The combo indices of the villain's hands.
+
+        Returns:
+            tuple: The hero combo indices, as an array, and the block of the matrix in their rows and the villain
+            combos' columns.
+        """
+        rows = np.array(sorted(set(hero_combos)), dtype=np.int64)
+        columns = np.array(sorted(set(villain_combos)), dtype=np.int64)
+        return rows, self.equities[rows[:, None], columns[None, :]]
+
+    def combo_equities(self, hero_combos, villain_combos):
+        """
+        Get the equity of each hero combo against the villain combos it shares no card with.
+
+        Args:
+            hero_combos (iterable): The combo indices of the hero's hands.
+            villain_combos (iterable): The combo indices of the villain's hands.
+
+        Returns:
+            dict: The equity percentage of each hero combo that meets at least one villain combo.
+        """
+        rows, block = self.block(hero_combos, villain_combos)
+        met = ~np.isnan(block)
+        totals = np.where(met, block, 0).sum(axis=1)
+        return {int(combo): float(total / count) for combo, total, count in zip(rows, totals, met.sum(axis=1))
+                if count}
+
+    def equity(self, hero_combos, villain_combos):
+        """
+        Get the equity of some hero combos against some villain combos, every pair that shares no card counting
+        equally.
+
+        Args:
+            hero_combos (iterable): The combo indices of the hero's hands.
+            villain_combos (iterable): The combo indices of the villain's hands.
+
+        Returns:
+            float: The hero's equity percentage, or None if no pair of combos can be dealt together.
+        """
+        _, block = self.block(hero_combos, villain_combos)
+        met = ~np.isnan(block)
+        if not met.any():
+            return None
+        return float(block[met].mean())
+
+    def class_equities(self, hero_combos, villain_combos):
+        """
+        Get the equity of each starting hand class among some hero combos against some villain combos.
+
+        Args:
+            hero_combos (iterable): The combo indices of the hero's hands.
+            villain_combos (iterable): The combo indices of the villain's hands.
+
+        Returns:
+            dict: The equity percentage of each class name (e.g. 'AKs') with a combo that meets a villain combo.
+        """
+        rows, block = self.block(hero_combos, villain_combos)
+        met = ~np.isnan(block)
+        totals = {}
+        for combo, total, count in zip(rows, np.where(met, block, 0).sum(axis=1), met.sum(axis=1)):
+            if count:
+                name = COMBO_CLASSES[combo]
+                previous = totals.get(name, (0, 0))
+                totals[name] = previous[0] + total, previous[1] + count
+        return {name: float(total / count) for name, (total, count) in totals.items()}
+
+
+@lru_cache(maxsize=EQUITY_MATRIX_SIZE)
+def build_equity_matrix(house):
+    """
+    Calculate the heads up equity of every combo against every other combo on a house, which is only done the first
+    time the house is seen.
 
-    This function calculates the expected value of shoving (going all-in) with a poker hand in a
-    scenario where opponents may fold or call based on their initial hand ranges.
+    Every remaining run out is evaluated at once with `board_strengths`. On each run out the combos' strengths are
+    turned into small ranks and every pair of combos compared at once, the combos sharing a card with the run out
+    being left out, and the comparisons are summed over the run outs. Before the flop the matrix is read from the
+    preflop table instead.
+
+    Args:
+        house (tuple): The sorted card indices of the house cards.
+
+    Returns:
+        EquityMatrix: The equity matrix, or None before the flop without a preflop table.
+    """
+    dead = sum(1 << index for index in house)
+    blocked = (COMBO_MASK_ARRAY & np.uint64(dead)) != 0
+    clashes = ((COMBO_MASK_ARRAY[:, None] & COMBO_MASK_ARRAY[None, :]) != 0) | blocked[:, None] | blocked[None, :]
+    if not house:
+        if PREFLOP_TABLE is None:
+            return None
+        equities = PREFLOP_TABLE / PREFLOP_SCALE * 100
+    else:
+        live = [index for index in range(52) if not dead >> index & 1]
+        run_outs = np.array(list(combinations(live, 5 - len(house))), dtype=np.int64)
+        boards = np.concatenate([np.broadcast_to(house, (len(run_outs), len(house))), run_outs], axis=1)
+        strengths = board_strengths(boards)
+        masks = (np.uint64(1) << run_outs.astype(np.uint64)).sum(axis=1, dtype=np.uint64)
+
+        # Sum the sign of each pair's comparison, which stays within 16 bits for the at most 1176 run outs
+        signs = np.zeros((1326, 1326), dtype=np.int16)
+        comparison = np.empty((1326, 1326), dtype=np.int16)
+        for strength, mask in zip(strengths, masks):
+            ranks = np.unique(strength, return_inverse=True)[1].astype(np.int16)
+            np.subtract(ranks[:, None], ranks[None, :], out=comparison)
+            np.clip(comparison, -1, 1, out=comparison)
+            dealt = np.nonzero(COMBO_MASK_ARRAY & mask)[0]
+            comparison[dealt] = 0
+            comparison[:, dealt] = 0
+            signs += comparison
+
+        # A pair of combos wins, ties and loses on the run outs of the cards left after their four cards
+        met = comb(len(live) - 4, 5 - len(house))
+        equities = (met + signs) / (2 * met) * 100
+    equities[clashes] = np.nan
+    equities.flags.writeable = False
+    return EquityMatrix(house, equities)
+
+
+def equity_matrix(house_cards=()):
+    """
+    Get the heads up equity matrix of every combo against every other combo on the house.
+
+    Args:
+        house_cards (list, optional): House cards that are already dealt.
+
+    Returns:
+        EquityMatrix: The equity matrix, as returned by `build_equity_matrix`.
+    """
+    return build_equity_matrix(tuple(sorted(card.index for card in house_cards)))
+
+
+# Every relabelling of the four suits, and the card and combo each card and combo becomes under it
+SUIT_PERMUTATIONS = tuple(permutations(range(len(suits))))
+CARD_PERMUTATIONS = tuple(tuple(index // 4 * 4 + permutation[index % 4] for index in range(52))
+                          for permutation in SUIT_PERMUTATIONS)
+COMBO_PERMUTATIONS = tuple(tuple(combo_index(card_map[low], card_map[high]) for low, high in COMBO_CARDS)
+                           for card_map in CARD_PERMUTATIONS)
+COMBO_PERMUTATION_ARRAY = np.array(COMBO_PERMUTATIONS, dtype=np.int64)
+
+
+def canonicalise(hero, house=(), ranges=()):
+    """
+    Find the canonical form of a spot under relabelling of the suits.
+
+    Spots that only differ by which suit is which have the same equities, so every suit relabelling of a spot is
+    tried and the smallest relabelled spot is its canonical form. The hero's hand and the house are compared first,
+    and the villains' ranges are only relabelled for the relabellings that tie on those.
+
+    Args:
+        hero (int): The combo index of the hero's hand, or None to canonicalise the house and ranges alone.
+        house (iterable, optional): The card indices of the house cards.
+        ranges (iterable, optional): The combo indices in each villain's range.
+
+    Returns:
+        tuple: The canonical spot, as a tuple of the hero's combo index, a sorted tuple of the house card indices and
+        a sorted tuple of combo indices for each villain, and the index in `SUIT_PERMUTATIONS` of the relabelling
+        that turns the spot into it.
+    """
+    heads = [(hero if hero is None else COMBO_PERMUTATIONS[permutation][hero],
+              tuple(sorted(CARD_PERMUTATIONS[permutation][index] for index in house)))
+             for permutation in range(len(SUIT_PERMUTATIONS))]
+    head = min(heads)
+    ranges = [np.array(tuple(combos), dtype=np.int64) for combos in ranges]
+
+    best = None
+    for permutation in range(len(SUIT_PERMUTATIONS)):
+        if heads[permutation] != head:
+            continue
+        spot = head + tuple(tuple(np.sort(COMBO_PERMUTATION_ARRAY[permutation][combos]).tolist())
+                            for combos in ranges)
+        if best is None or spot < best[0]:
+            best = spot, permutation
+    return best
+
+
+def canonical_spot(my_hand, possible_hands, house_cards=()):
+    """
+    Find the canonical form of a spot under relabelling of the suits.
 
     Args:
         my_hand (Hand): The poker hand of the hero.
-        pack (Deck): The deck of cards used in the simulation.
         possible_hands (list): A list of possible opponent hand ranges.
-        pot (float): The size of the pot.
-        bet (float): The size of the hero's bet.
-        initial_ranges (list): The initial hand ranges of possible opponents.
         house_cards (list, optional): House cards that are already dealt.
 
-    Yields:
-        float: The expected value (EV) of shoving (going all-in) with the hero's hand.
+    Returns:
+        tuple: The canonical spot and the index of the suit relabelling that turns the spot into it, as returned by
+        `canonicalise`.
     """
-    hand = my_hand.tuple
-    total = 0
-    balance = 0
-    wins = 0
-    times_called = 0
+    return canonicalise(my_hand.index, [card.index for card in house_cards],
+                        [villain.compile().combos for villain in possible_hands])
 
-    # Calculate the number of remaining cards to deal.
-    remaining = 5 - len(house_cards)
 
-    # Create a list of leftover cards from the deck.
-    leftover = [card for card in pack.cards if pack.cards[card]]
-
-    # Generate all possible combinations of house cards from the leftover cards.
-    houses = list(combinations(leftover, remaining))
-    randomiser = 0
-    while True:
-        possible = False
-        villain_hands = {}
-        opponents = len(possible_hands)
-
-        # Iterate over possible opponents.
-        for n in range(opponents):
-            chosen = (n + randomiser) % opponents
-            villain_initial = initial_ranges[chosen]
-            villain_initial.refresh()
-            villain = possible_hands[chosen]
-            villain.refresh()
-
-            # Extract the initial and current possible opponent hand lists.
-            old_list = [hand for hand in villain_initial.hands if villain_initial.hands[hand]]
-            new_list = [hand for hand in villain.hands if villain.hands[hand]]
-
-            # Calculate the calling percentage based on the difference in hand lists.
-            call_percentage = len(new_list) / len(old_list)
-
-            # Generate a random number to determine if the opponent calls.
-            random_number = random()
-            if random_number < call_percentage:
-                # The opponent calls, so choose a hand from the current list.
-                villain_hole = choice(new_list).tuple
-                villain_hands[chosen] = villain_hole
-
-                # Mark the dealt cards as unavailable in the deck.
-                for card in villain_hole:
-                    pack.deal_card(card)
-        randomiser += 1
-        total += 1
-
-        # If no opponent called, the hero collects the pot.
-        if not villain_hands:
-            balance += pot
-            ev = balance / total
-            yield ev
-            continue
+def restore_combos(values, permutation):
+    """
+    Map per-combo results of a canonical spot back onto the combos of the original spot.
 
-        house = []
+    Args:
+        values (np.ndarray): An array indexed by combo index in the canonical spot.
+        permutation (int): The index of the suit relabelling that turned the original spot into the canonical one.
 
-        # Randomly select a house card combination until a possible one is found.
-        while not possible:
-            house = choice(houses)
-            possible = check_house_possibility(house, pack)
+    Returns:
+        np.ndarray: The same results indexed by combo index in the original spot.
+    """
+    return values[COMBO_PERMUTATION_ARRAY[permutation]]
 
-        hero_final = hand + house + house_cards
-        competing = {'hero': hero_final}
 
-        # Combine opponent hands, house cards, and dealt house cards.
-        for villain in villain_hands:
-            villain_final = villain_hands[villain] + house + house_cards
-            competing[villain] = villain_final
+# Pots are tallied in whole shares, so that a pot split between up to ten players still divides exactly
+SHARE_SCALE = 2520
 
-        run_out = decide_winner(competing)
+# Process pools that simulations are shared between, by number of workers
+pools = {}
+pool_lock = threading.Lock()
 
-        # Adjust the balance based on the result of the hand.
-        if run_out['hero'] == 0:
-            balance -= bet
-        else:
-            balance += (pot + (bet * len(competing))) * run_out['hero'] - bet
+# How much lower than the interface's the scheduling priority of worker processes is, where the OS supports it
+WORKER_NICENESS = 5
 
-        ev = balance / total
-        times_called += 1
-        wins += run_out['hero']
-        yield ev
 
-        # Restore dealt cards to the deck.
-        for antagonist in villain_hands:
-            for card in villain_hands[antagonist]:
-                pack.add_cards(card)
+def lower_priority():
+    """
+    Lower the scheduling priority of a worker process, so that the interface stays responsive on machines with few
+    cores while every core is simulating.
+    """
+    if hasattr(os, 'nice'):
+        os.nice(WORKER_NICENESS)
 
 
-def decide_winner(players):
+def get_pool(workers):
     """
-    Determine the winner and calculate their share of the pot.
+    Get the process pool with the given number of workers, starting it the first time it is needed.
 
-    This function compares each player's hand against all other players' hands and calculates the
-    share of the pot they should receive based on their chances of winning.
+    Worker processes are spawned rather than forked so that they do not inherit the interface's threads, and run at a
+    lower priority than the interface.
 
     Args:
-        players (dict): A dictionary containing player names as keys and their poker hands as values.
+        workers (int): The number of worker processes.
 
     Returns:
-        dict: A dictionary containing player names as keys and their share of the pot as values.
+        ProcessPoolExecutor: The process pool.
     """
-    result = {}
+    with pool_lock:
+        if workers not in pools:
+            pools[workers] = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'),
+                                                 initializer=lower_priority)
+        return pools[workers]
 
-    # Initialize each player's result to 0.
-    for player in players:
-        result[player] = 0
 
-    # Compare each player's hand with all other players.
-    for player in players:
-        for opponent in players:
-            if player != opponent:
-                duel = compare(players[player], players[opponent])
+def run_tallies(kernel, args, runs, workers=None, job=None):
+    """
+    Run a tally kernel again and again, yielding the merged tally after each run.
 
-                # If the player loses to any opponent, their result is 0.
-                if duel == 0:
-                    result[player] = 0
-                    break
-                else:
-                    result[player] += duel
+    With more than one worker the runs are shared between a pool of worker processes, keeping one run per worker in
+    flight. Every run is given its own child of one seed sequence, so the random streams of the runs are independent
+    of each other. Runs still queued when the generator is closed are cancelled.
 
-    # Calculate the total sum of results.
-    total = sum(result[player] for player in players)
+    The runs in flight are tracked by the job calculating, which cancels those still queued when it is paused. The
+    pool hands runs to its workers ahead of time, where they can no longer be cancelled, so keeping no more runs in
+    flight than there are workers bounds what a paused job leaves for the pool to finish before the job of the
+    visible tab. No more runs are queued until the job is resumed, and the runs cancelled are replaced.
 
-    # Calculate each player's share of the pot based on their chances of winning.
-    for player in players:
-        result[player] /= total
-    return result
+    Args:
+        kernel (function): The tally kernel, called as `kernel(*args, runs, seed)` and returning an integer array.
+        args (tuple): The arguments describing the spot to the kernel.
+        runs (int): The number of run outs simulated by each call of the kernel.
+        workers (int, optional): The number of worker processes, defaulting to the number of CPUs.
+        job (Job, optional): The job calculating, which tracks the runs queued.
+
+    Yields:
+        np.ndarray: The sum of the tallies of every run so far.
+    """
+    workers = workers or os.cpu_count() or 1
+    seeds = np.random.SeedSequence()
+    tally = 0
+
+    if workers == 1:
+        while True:
+            tally = tally + kernel(*args, runs, seeds.spawn(1)[0])
+            yield tally
+
+    pool = get_pool(workers)
+    pending = set()
+    try:
+        while True:
+            # Wait out a pause before queueing more runs
+            if job is not None:
+                job.resumed.wait()
+            for child in seeds.spawn(workers - len(pending)):
+                future = pool.submit(kernel, *args, runs, child)
+                if job is not None:
+                    job.track(future)
+                pending.add(future)
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            finished = [future for future in done if not future.cancelled()]
+            for future in finished:
+                tally = tally + future.result()
+            if finished:
+                yield tally
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+# The most times the villains' hands of a simulated run out are dealt, looking for hands that fit together
+DEAL_ATTEMPTS = 100
+
+
+def simulate_run_outs(hero, house, ranges, dead, runs, seed_sequence=None):
+    """
+    Simulate random run outs of a spot and evaluate every player's hand in each.
 
+    Every villain is dealt a hand from their range at once, and every hand of the rows where any two hands share a
+    card is dealt again, so that every combination of hands that fit together is equally likely. The house is then
+    completed from the cards left in each run out, and every player's hand is evaluated with `batch_strength`.
 
-def check_draws(villain_hands, house):
+    Args:
+        hero (tuple): The card indices of the hero's hand.
+        house (tuple): The card indices of the house cards that are already dealt.
+        ranges (list): A tuple of the combo indices in each villain's range.
+        dead (int): A mask of the cards that cannot be dealt, including the hero's hand and the house cards.
+        runs (int): The number of run outs to simulate.
+        seed_sequence (np.random.SeedSequence, optional): The seed of the random stream to simulate with, or a
+            generator to carry on drawing from.
+
+    Returns:
+        tuple: An array of the combo index each villain held in each run out and an array of the strength of each
+        player's hand (the hero first) in each run out, without the rare run outs where the villains could not be
+        dealt hands that fit together.
     """
-    Check and categorize possible draws for each player's hand against the community cards.
+    rng = np.random.default_rng(seed_sequence)
+    opponents = len(ranges)
+    ranges = [np.array(combos, dtype=np.int64) for combos in ranges]
+    ranges = [combos[(COMBO_MASK_ARRAY[combos] & np.uint64(dead)) == 0] for combos in ranges]
+    hero = np.array(hero, dtype=np.int64)
+    house = np.array(house, dtype=np.int64)
+    remaining = 5 - len(house)
+    live = np.array([index for index in range(52) if not dead >> index & 1], dtype=np.int64)
+
+    # Deal every villain a hand at once, dealing the whole row again where any two hands share a card. Redrawing
+    # only the clashing villain would favour the hands that clash with few of the other villains' hands
+    held = [np.zeros(runs, dtype=np.int64) for _ in range(opponents)]
+    clash = np.ones(runs, dtype=bool)
+    if all(len(combos) for combos in ranges):
+        for _ in range(DEAL_ATTEMPTS):
+            rows = np.nonzero(clash)[0]
+            if not rows.size:
+                break
+            used = np.zeros(rows.size, dtype=np.uint64)
+            clashing = np.zeros(rows.size, dtype=bool)
+            for n, combos in enumerate(ranges):
+                hole = combos[rng.integers(len(combos), size=rows.size)]
+                clashing |= (COMBO_MASK_ARRAY[hole] & used) != 0
+                used |= COMBO_MASK_ARRAY[hole]
+                held[n][rows] = hole
+            clash[rows] = clashing
+    complete = ~clash
+    holes = [COMBO_CARD_ARRAY[hole] for hole in held]
+
+    # Deal the rest of the house a card at a time from the live cards, dealing each card again in the rows where it
+    # is already held, so that every card left in a row is equally likely
+    size = runs
+    used = np.zeros(runs, dtype=np.uint64)
+    for hole in held:
+        used |= COMBO_MASK_ARRAY[hole]
+    run_outs = np.empty((runs, remaining), dtype=np.int64)
+    for card in range(remaining):
+        dealt = live[rng.integers(len(live), size=runs)]
+        clash = np.nonzero(used & CARD_MASK_ARRAY[dealt])[0]
+        while clash.size:
+            dealt[clash] = live[rng.integers(len(live), size=clash.size)]
+            clash = clash[(used[clash] & CARD_MASK_ARRAY[dealt[clash]]) != 0]
+        used |= CARD_MASK_ARRAY[dealt]
+        run_outs[:, card] = dealt
+    if not complete.all():
+        # Drop the rows where the villains were not dealt hands that fit together, which leaves the rest unbiased
+        run_outs = run_outs[complete]
+        held = [hole[complete] for hole in held]
+        holes = [hole[complete] for hole in holes]
+        size = int(complete.sum())
+    board = np.concatenate([np.broadcast_to(house, (size, len(house))), run_outs], axis=1)
+
+    # Evaluate every player's hand
+    strengths = np.stack([batch_strength(np.concatenate([np.broadcast_to(hero, (size, 2)), board], axis=1))] +
+                         [batch_strength(np.concatenate([hole, board], axis=1)) for hole in holes])
+    return np.stack(held).reshape(opponents, size), strengths
+
+
+def equity_tally(hero, house, ranges, dead, runs, seed_sequence=None):
+    """
+    Simulate random run outs of a spot and tally how often each player makes and wins with each kind of hand.
 
-    This function evaluates the possible draws for each player's hand in relation to the community cards,
-    including straight draws, flush draws, overcards, and made hands.
+    The run outs are simulated by `simulate_run_outs`, and each pot is split into whole shares between the strongest
+    hands.
 
     Args:
-        villain_hands (HandRange): A range of possible opponent hands.
-        house (list): Community cards on the board.
+        hero (tuple): The card indices of the hero's hand.
+        house (tuple): The card indices of the house cards that are already dealt.
+        ranges (list): A tuple of the combo indices in each villain's range.
+        dead (int): A mask of the cards that cannot be dealt, including the hero's hand and the house cards.
+        runs (int): The number of run outs to simulate.
+        seed_sequence (np.random.SeedSequence, optional): The seed of the random stream to simulate with.
 
     Returns:
-        dict: A dictionary containing draw information for each player's hand.
+        np.ndarray: An integer array indexed by player (the hero first), then 0 for the number of times each kind of
+        hand was made, 1 for the shares of pots it won or 2 for the sum of the squares of those shares, then the made
+        hand category.
+    """
+    opponents = len(ranges)
+    _, strengths = simulate_run_outs(hero, house, ranges, dead, runs, seed_sequence)
+    winners = strengths == strengths.max(axis=0)
+    shares = winners * (SHARE_SCALE // winners.sum(axis=0))
+    categories = strengths >> STRENGTH_SHIFT
+
+    tally = np.zeros((opponents + 1, 3, 11), dtype=np.int64)
+    for player in range(opponents + 1):
+        tally[player, 0] = np.bincount(categories[player], minlength=11)
+        np.add.at(tally[player, 1], categories[player], shares[player])
+        np.add.at(tally[player, 2], categories[player], shares[player] ** 2)
+    return tally
+
+
+def combo_equity_tally(hero, house, ranges, dead, villains, runs, seed_sequence=None):
+    """
+    Simulate random run outs of a spot and tally them by the combo some villains held.
+
+    The run outs are simulated by `simulate_run_outs` and tallied as in `equity_tally`, but every run out is added
+    once for each of the given villains, under the combo they held in it. Each villain only takes a row per combo in
+    their range, so the tally grows with the ranges broken down rather than with every combo of every villain.
+
+    Args:
+        hero (tuple): The card indices of the hero's hand.
+        house (tuple): The card indices of the house cards that are already dealt.
+        ranges (list): A tuple of the combo indices in each villain's range.
+        dead (int): A mask of the cards that cannot be dealt, including the hero's hand and the house cards.
+        villains (tuple): The indices of the villains to tally by combo.
+        runs (int): The number of run outs to simulate.
+        seed_sequence (np.random.SeedSequence, optional): The seed of the random stream to simulate with.
+
+    Returns:
+        np.ndarray: An integer array with a row for each combo in each given villain's range in turn, each row in the
+        form of the tallies returned by `equity_tally`. Summing any one villain's rows gives the tally of every run out.
+    """
+    held, strengths = simulate_run_outs(hero, house, ranges, dead, runs, seed_sequence)
+    players = len(strengths)
+    winners = strengths == strengths.max(axis=0)
+    shares = winners * (SHARE_SCALE // winners.sum(axis=0))
+
+    # Each player's run outs land in the cell of their made hand category, within the row of the combo each villain
+    # held, and are counted, summed and summed in squares with one weighted count per villain
+    size = players * 3 * 11
+    cells = np.arange(players)[:, None] * 33 + (strengths >> STRENGTH_SHIFT)
+    weights = np.concatenate([np.ones_like(shares), shares, shares ** 2]).ravel()
+    offsets = np.array([0, 11, 22])[:, None, None]
+    rows = [len(ranges[villain]) for villain in villains]
+    tally = np.empty(sum(rows) * size, dtype=np.int64)
+    start = 0
+    for villain, count in zip(villains, rows):
+        row = np.zeros(1326, dtype=np.int64)
+        row[np.array(ranges[villain], dtype=np.int64)] = np.arange(count)
+        positions = (row[held[villain]] * size + cells + offsets).ravel()
+        tally[start * size:(start + count) * size] = np.bincount(positions, weights=weights, minlength=count * size)
+        start += count
+    return tally.reshape(sum(rows), players, 3, 11)
+
+
+def call_patterns(initial, calling, dead):
+    """
+    Find the probability of every pattern of villains calling and folding.
+
+    Every combination of live hands from the villains' initial ranges that do not share a card counts equally, and a
+    villain calls if their hand is in their calling range. When the combinations fit within `COUNT_LIMIT` they are
+    counted exactly with `count_hands`, the villain with the largest initial range counted last, and otherwise about
+    `PATTERN_SAMPLES` of them are sampled to estimate the probabilities. Villains without a live hand always fold.
+
+    Args:
+        initial (list): A tuple of the combo indices in each villain's initial range.
+        calling (list): A tuple of the combo indices in each villain's calling range.
+        dead (int): A mask of the cards that cannot be dealt, including the hero's hand and the house cards.
+
+    Returns:
+        tuple: A list of a tuple of the indices of the calling villains and its probability for each of the 2^n
+        patterns, the pattern where every villain folds first, and the number of deals the probabilities were
+        estimated from, or None if they are exact.
+    """
+    opponents = len(initial)
+    ranges = [np.array([combo for combo in combos if not COMBO_MASKS[combo] & dead], dtype=np.int64)
+              for combos in initial]
+    calls = [np.zeros(1326, dtype=np.int64) for _ in calling]
+    for lookup, villain in zip(calls, calling):
+        lookup[list(villain)] = 1
+    active = sorted((n for n in range(opponents) if len(ranges[n])), key=lambda n: len(ranges[n]))
+    size = 1
+    for n in active[:-1]:
+        size *= len(ranges[n])
+
+    # Each pattern is indexed by a mask of the villains calling in it
+    probabilities = np.zeros(1 << opponents)
+    samples = None
+    if active and size <= COUNT_LIMIT:
+        held, counts = count_hands([ranges[n] for n in active], [calls[n][ranges[n]] for n in active],
+                                   lambda held: np.tile([1, 2], (len(held), 1)))
+        patterns = (held << np.array(active[:-1], dtype=np.int64)).sum(axis=1)
+        np.add.at(probabilities, patterns, counts[:, 0])
+        np.add.at(probabilities, patterns | 1 << active[-1], counts[:, 1] - counts[:, 0])
+    elif active:
+        # Deal every villain a hand at once and keep the deals where no two hands share a card, which leaves every
+        # combination of hands equally likely, dealing again until enough are kept
+        rng = np.random.default_rng()
+        for _ in range(PATTERN_ATTEMPTS):
+            used = np.zeros(PATTERN_SAMPLES, dtype=np.uint64)
+            clash = np.zeros(PATTERN_SAMPLES, dtype=bool)
+            patterns = np.zeros(PATTERN_SAMPLES, dtype=np.int64)
+            for n in active:
+                hole = ranges[n][rng.integers(len(ranges[n]), size=PATTERN_SAMPLES)]
+                clash |= (COMBO_MASK_ARRAY[hole] & used) != 0
+                used |= COMBO_MASK_ARRAY[hole]
+                patterns |= calls[n][hole] << n
+            probabilities += np.bincount(patterns[~clash], minlength=1 << opponents)
+            if probabilities.sum() >= PATTERN_SAMPLES:
+                break
+        samples = int(probabilities.sum())
+    total = probabilities.sum()
+    if not total:
+        # No villain can be dealt a hand, so every villain folds
+        probabilities[0] = total = 1
+    probabilities /= total
+    return [(tuple(n for n in range(opponents) if pattern >> n & 1), float(probabilities[pattern]))
+            for pattern in range(1 << opponents)], samples
+
+
+def pattern_weights(patterns):
+    """
+    Get the probability of each number of players in the pot from the call and fold patterns.
+
+    Args:
+        patterns (list): The call and fold patterns and their probabilities, as returned by `call_patterns`.
+
+    Returns:
+        np.ndarray: The probability of a pot being played by each number of players, 1 being every villain folding.
+    """
+    weights = np.zeros(11)
+    for callers, probability in patterns:
+        weights[len(callers) + 1] += probability
+    return weights
+
+
+def called_tally(hero, house, calling, folding, patterns, dead, runs, seed_sequence=None):
+    """
+    Simulate random run outs of a spot where the villains may fold or call, and tally the hero's results when called.
+
+    The run outs are shared between the patterns where at least one villain calls in proportion to their
+    probabilities, and each pattern's run outs are simulated at once by `simulate_run_outs`, dealing the calling
+    villains hands from their calling ranges and the folding villains, whose cards are out of the deck too, hands
+    from the rest of their initial ranges. No run out is spent on pots every villain folds, whose share is known
+    from the patterns, so the tally holds the hero's results given the number of players called.
+
+    Args:
+        hero (tuple): The card indices of the hero's hand.
+        house (tuple): The card indices of the house cards that are already dealt.
+        calling (list): A tuple of the combo indices in each villain's calling range.
+        folding (list): A tuple of the combo indices each villain folds, the rest of their initial range.
+        patterns (list): The call and fold patterns and their probabilities, as returned by `call_patterns`.
+        dead (int): A mask of the cards that cannot be dealt, including the hero's hand and the house cards.
+        runs (int): The number of run outs to simulate.
+        seed_sequence (np.random.SeedSequence, optional): The seed of the random stream to simulate with.
+
+    Returns:
+        np.ndarray: An integer array where row 0 counts the pots played by each number of players, row 1 holds the
+        shares of those pots the hero won and row 2 the sum of their squares.
     """
+    rng = np.random.default_rng(seed_sequence)
+    tally = np.zeros((3, 11), dtype=np.int64)
+    called = [(callers, probability) for callers, probability in patterns if callers and probability]
+    if not called:
+        return tally
+    probabilities = np.array([probability for _, probability in called])
+
+    for (callers, _), pattern_runs in zip(called, rng.multinomial(runs, probabilities / probabilities.sum())):
+        if not pattern_runs:
+            continue
+        # Villains folding without a live hand to fold have no cards to take out of the deck
+        dealt = [n for n in range(len(calling)) if n in callers or folding[n]]
+        ranges = [calling[n] if n in callers else folding[n] for n in dealt]
+        _, strengths = simulate_run_outs(hero, house, ranges, dead, int(pattern_runs), rng)
+
+        # The hero wins the pot outright above every caller, and splits it with the callers level with them
+        hero_strength = strengths[0]
+        strengths = strengths[[dealt.index(n) + 1 for n in callers]]
+        best = strengths.max(axis=0)
+        ties = (strengths == best).sum(axis=0)
+        shares = np.where(hero_strength > best, SHARE_SCALE, SHARE_SCALE // (ties + 1)) * (hero_strength >= best)
+        players = len(callers) + 1
+        tally[0, players] += len(shares)
+        tally[1, players] += shares.sum()
+        tally[2, players] += (shares ** 2).sum()
+    return tally
+
+
+def size_estimates(tally, weights):
+    """
+    Estimate the hero's share of the pot for each number of players that has been simulated.
+
+    Args:
+        tally (np.ndarray): A called tally, as returned by `called_tally`.
+        weights (np.ndarray): The probability of each number of players, as returned by `pattern_weights`.
+
+    Returns:
+        list: A tuple of the number of players, its probability among the pots called, rescaled over the numbers of
+        players simulated so far, the hero's average share and its standard error, as fractions, for each number
+        of players simulated.
+    """
+    counts, shares, squares = tally
+    sizes = [size for size in range(2, 11) if counts[size] and weights[size]]
+    called = sum(weights[size] for size in sizes)
+    return [(size, weights[size] / called, int(shares[size]) / SHARE_SCALE / int(counts[size]),
+             standard_error(int(counts[size]), int(shares[size]), int(squares[size])) / SHARE_SCALE)
+            for size in sizes]
+
+
+def called_percentages(tally, weights=None):
+    """
+    Turn a called tally into the hero's equity when called, the fold percentage and the average number of players.
+
+    Args:
+        tally (np.ndarray): A called tally, as returned by `called_tally` or `counted_called_tally`.
+        weights (np.ndarray, optional): The exact probability of each number of players, as returned by
+            `pattern_weights`, when the tally only holds called pots.
+
+    Returns:
+        tuple: A tuple containing the hero's equity when called, the fraction of pots where every villain folded and
+        the average number of players when called, or None if no villain has called yet.
+    """
+    if weights is not None:
+        estimates = size_estimates(tally, weights)
+        if not estimates:
+            return None
+        players = sum(weights[size] * size for size in range(2, 11)) / (1 - weights[1])
+        return sum(weight * share for _, weight, share, _ in estimates), float(weights[1]), float(players)
+    counts, shares, _ = tally
+    total = int(counts.sum())
+    called = total - int(counts[1])
+    if not called:
+        return None
+    wins = int(shares[2:].sum()) / SHARE_SCALE
+    players = sum(int(counts[size]) * size for size in range(2, 11))
+    return wins / called, int(counts[1]) / total, players / called
+
+
+def ev_coefficients(tally, weights=None):
+    """
+    Get how the expected value of shoving grows with the pot and the bet, which it is linear in as the villains'
+    calling ranges do not depend on the bet.
+
+    Args:
+        tally (np.ndarray): A called tally, as returned by `called_tally` or `counted_called_tally`.
+        weights (np.ndarray, optional): The exact probability of each number of players, as returned by
+            `pattern_weights`, when the tally only holds called pots.
+
+    Returns:
+        tuple: The expected value gained per unit of pot and per unit of bet.
+    """
+    if weights is not None:
+        estimates = size_estimates(tally, weights)
+        called = 1 - weights[1]
+        per_pot = weights[1] + called * sum(weight * share for _, weight, share, _ in estimates)
+        per_bet = called * sum(weight * (size * share - 1) for size, weight, share, _ in estimates)
+        return float(per_pot), float(per_bet)
+    counts, shares, _ = tally
+    total = int(counts.sum())
+    per_pot = int(shares.sum()) / SHARE_SCALE / total
+    per_bet = sum(size * int(shares[size]) / SHARE_SCALE - int(counts[size]) for size in range(1, 11)) / total
+    return per_pot, per_bet
+
+
+def tally_ev(tally, pot, bet, weights=None):
+    """
+    Calculate the expected value of shoving from a called tally.
+
+    Args:
+        tally (np.ndarray): A called tally, as returned by `called_tally` or `counted_called_tally`.
+        pot (float | np.ndarray): The size of the pot, or an array of sizes broadcast against the bets.
+        bet (float | np.ndarray): The size of the hero's bet, or an array of sizes broadcast against the pots.
+        weights (np.ndarray, optional): The exact probability of each number of players, as returned by
+            `pattern_weights`, when the tally only holds called pots.
+
+    Returns:
+        float | np.ndarray: The expected value of shoving, counting a pot won with every villain folding as winning
+        the pot.
+    """
+    per_pot, per_bet = ev_coefficients(tally, weights)
+    return pot * per_pot + bet * per_bet
+
+
+# The number of standard errors either side of an estimate that its 95% confidence interval reaches
+CONFIDENCE_Z = 1.96
+
+# The number of run outs needed before the standard error is trusted enough to stop a simulation on
+MIN_RUNS = 1000
+
+
+def standard_error(total, shares, squares):
+    """
+    Get the standard error of the average of many outcomes from their count, sum and sum of squares.
+
+    Args:
+        total (int): The number of outcomes.
+        shares (float): The sum of the outcomes.
+        squares (float): The sum of the squares of the outcomes.
+
+    Returns:
+        float: The standard error of the average outcome, or infinity with fewer than two outcomes.
+    """
+    if total < 2:
+        return float('inf')
+    variance = max(squares - shares * shares / total, 0) / (total - 1)
+    return sqrt(variance / total)
+
+
+def equity_errors(tally):
+    """
+    Get the standard errors of the equity percentages of an equity tally.
+
+    Args:
+        tally (np.ndarray): An equity tally, as returned by `equity_tally`.
+
+    Returns:
+        dict: The standard error of each player's equity percentage.
+    """
+    players = ['hero'] + list(range(len(tally) - 1))
+    total = int(tally[0, 0].sum())
+    return {player: standard_error(total, int(tally[count, 1].sum()), int(tally[count, 2].sum())) * 100 / SHARE_SCALE
+            for count, player in enumerate(players)}
+
+
+# How often, in seconds, the equity generator yields a snapshot by default
+SNAPSHOT_INTERVAL = 0.05
+
+
+class EquitySnapshot:
+    """
+    A snapshot of an equity calculation, holding its integer tally and deriving percentages from it on demand.
+
+    Attributes:
+        tally (np.ndarray): The equity tally, as returned by `equity_tally`.
+        exact (bool): Whether the tally is exact rather than simulated.
+        preflop (dict): The exact equity percentages looked up from the preflop table, or None.
+        combos (ComboTally): The tally of the run outs simulated so far by the combo some villains held, or None.
+        players (list): The players, 'hero' followed by the index of each villain.
+        runs (int): The number of run outs tallied.
+
+    Methods:
+        equity(): Get the equity percentage of each player.
+        errors(): Get the standard error of each player's equity percentage.
+        breakdown(player): Get how often a player makes and wins with each kind of hand.
+    """
+    def __init__(self, tally, exact=False, preflop=None, combos=None):
+        self.tally = tally
+        self.exact = exact
+        self.preflop = preflop
+        self.combos = combos
+        self.players = ['hero'] + list(range(len(tally) - 1))
+        self.runs = int(tally[0, 0].sum())
+
+    @property
+    def equity_exact(self):
+        """bool: Whether the equities are exact, enumerated or looked up from the preflop table."""
+        return bool(self.exact or self.preflop)
+
+    def equity(self):
+        """
+        Get the equity percentage of each player.
+
+        Returns:
+            dict: The equity percentage of each player.
+        """
+        if self.preflop:
+            return self.preflop
+        return {player: int(self.tally[count, 1].sum()) * 100 / SHARE_SCALE / self.runs
+                for count, player in enumerate(self.players)}
+
+    def errors(self):
+        """
+        Get the standard error of each player's equity percentage, which is zero when the equities are exact.
+
+        Returns:
+            dict: The standard error of each player's equity percentage.
+        """
+        if self.equity_exact:
+            return {player: 0.0 for player in self.players}
+        return equity_errors(self.tally)
+
+    def breakdown(self, player):
+        """
+        Get how often a player makes each kind of hand and how often they win with it.
+
+        Args:
+            player: The player, 'hero' or the index of a villain.
+
+        Returns:
+            dict: For each made hand category, the fraction of run outs it was made in ('made') and the fraction of
+            pots won with it ('wins').
+        """
+        made, shares, _ = self.tally[self.players.index(player)]
+        return {made_hand: {'made': int(made[made_hand]) / self.runs,
+                            'wins': int(shares[made_hand]) / SHARE_SCALE / self.runs}
+                for made_hand in range(2, 11)}
+
+
+class ComboTally:
+    """
+    Represents an equity tally broken down by the combo some villains held, so that it can be re-aggregated rather
+    than simulated again when one of their ranges is edited.
+
+    Only the villains whose ranges have been edited in the spot are broken down, as the breakdown costs memory and
+    transfer for every combo it covers. Every run out is added under the combo each of them held in it, so the run
+    outs under any of their combos add up to the tally of every run out. When a single one of their ranges is edited,
+    the run outs under the combos still in it are a fair sample of the new spot. That villain becomes the anchor the
+    tally is read from, and the other villains' breakdowns, which still hold run outs with combos no longer in the
+    range, start again.
+
+    The run outs added since the tally was started are held apart from those it started with, so that adding each
+    batch does not copy the whole breakdown.
+
+    Attributes:
+        spot (tuple): The hero's combo index, the house card indices and the mask of dead cards.
+        ranges (tuple): A tuple of the combo indices in each villain's range.
+        villains (tuple): The indices of the villains broken down by combo.
+        offsets (dict): The first row of each villain broken down by combo.
+        tally (np.ndarray): The tally the breakdown started with, in the form returned by `combo_equity_tally`.
+        extra (np.ndarray): The tally of the run outs added since, in the same form, or None.
+        anchor (int): The villain whose breakdown holds every run out that is still valid.
+
+    Methods:
+        rows(villain, combos=None): Get the rows of a villain's combos.
+        added(tally, rows=None): Get the tally with more run outs added.
+        runs(): Get the number of run outs that are still valid.
+        total(): Get the equity tally of the run outs that are still valid.
+        reaggregate(spot, ranges): Re-aggregate the tally for the same spot with edited ranges.
+    """
+    def __init__(self, spot, ranges, villains, tally=None, anchor=None, extra=None):
+        self.spot = spot
+        self.ranges = tuple(tuple(combos) for combos in ranges)
+        self.villains = tuple(villains)
+        counts = [len(self.ranges[villain]) for villain in self.villains]
+        self.offsets = dict(zip(self.villains, np.cumsum([0] + counts[:-1]).tolist()))
+        if tally is None:
+            tally = np.zeros((sum(counts), len(ranges) + 1, 3, 11), dtype=np.int64)
+        self.tally = tally
+        self.extra = extra
+        self.anchor = self.villains[0] if anchor is None else anchor
+
+    def rows(self, villain, combos=None):
+        """
+        Get the rows of a villain's combos.
+
+        Args:
+            villain (int): The index of a villain broken down by combo.
+            combos (list, optional): Some of the combo indices in the villain's range, or None for all of them.
+
+        Returns:
+            slice: The rows of every combo in the villain's range, or an array of the rows of the given combos.
+        """
+        start = self.offsets[villain]
+        if combos is None:
+            return slice(start, start + len(self.ranges[villain]))
+        positions = {combo: start + n for n, combo in enumerate(self.ranges[villain])}
+        return np.array([positions[combo] for combo in combos], dtype=np.int64)
+
+    def added(self, tally, rows=None):
+        """
+        Get the tally with more run outs added.
+
+        The tally of the run outs is kept as it is rather than summed into the breakdown, so it should not be changed
+        afterwards.
+
+        Args:
+            tally (np.ndarray): The tally of the new run outs, as returned by `combo_equity_tally`.
+            rows (np.ndarray, optional): The rows to add the run outs to, for run outs only breaking down some combos.
+
+        Returns:
+            ComboTally: The tally with the run outs added.
+        """
+        start = self.tally if self.extra is None else self.tally + self.extra
+        if rows is None:
+            return ComboTally(self.spot, self.ranges, self.villains, start, self.anchor, tally)
+        if start is self.tally:
+            start = start.copy()
+        start[rows] += tally
+        return ComboTally(self.spot, self.ranges, self.villains, start, self.anchor)
+
+    def runs(self):
+        """
+        Get the number of run outs that are still valid.
+
+        Returns:
+            int: The number of run outs under the anchor's combos.
+        """
+        return int(self.total()[0, 0].sum())
+
+    def total(self):
+        """
+        Get the equity tally of the run outs that are still valid.
+
+        Returns:
+            np.ndarray: An equity tally in the same form as the tallies returned by `equity_tally`.
+        """
+        rows = self.rows(self.anchor)
+        total = self.tally[rows].sum(axis=0)
+        if self.extra is not None:
+            total += self.extra[rows].sum(axis=0)
+        return total
+
+    def reaggregate(self, spot, ranges):
+        """
+        Re-aggregate the tally for the same spot with edited ranges.
+
+        Only an edit of a single villain's range can be re-aggregated, and only if that villain is broken down by
+        combo and the range keeps at least as many combos as it adds. The combos added have not been dealt yet, so
+        they need topping up with run outs of their own until they have been dealt about as often as the kept combos.
+
+        Args:
+            spot (tuple): The hero's combo index, the house card indices and the mask of dead cards.
+            ranges (list): The combo indices in each villain's range.
+
+        Returns:
+            tuple: The re-aggregated tally and, if combos were added, a tuple of the villain, the combos added and
+            the number of run outs to top them up with, or None if the tally cannot be re-aggregated.
+        """
+        ranges = tuple(tuple(combos) for combos in ranges)
+        if spot != self.spot or len(ranges) != len(self.ranges) or not self.runs():
+            return None
+        edited = [villain for villain in range(len(ranges)) if set(ranges[villain]) != set(self.ranges[villain])]
+        if not edited:
+            return self, None
+        if len(edited) > 1 or edited[0] not in self.villains:
+            return None
+
+        villain = edited[0]
+        before = set(self.ranges[villain])
+        kept = [combo for combo in ranges[villain] if combo in before]
+        added = [combo for combo in ranges[villain] if combo not in before]
+        if not kept or len(added) > len(kept):
+            return None
+        reaggregated = ComboTally(spot, ranges, self.villains, anchor=villain)
+        rows = self.rows(villain, kept)
+        reaggregated.tally[reaggregated.rows(villain, kept)] = self.tally[rows] + (
+            0 if self.extra is None else self.extra[rows])
+        if not added:
+            return reaggregated, None
+        return reaggregated, (villain, added, ceil(reaggregated.runs() * len(added) / len(kept)))
+
+
+def called_error(tally, weights=None):
+    """
+    Get the standard error of the hero's equity when called from a called tally.
+
+    Args:
+        tally (np.ndarray): A called tally, as returned by `called_tally`.
+        weights (np.ndarray, optional): The exact probability of each number of players, as returned by
+            `pattern_weights`, when the tally only holds called pots.
+
+    Returns:
+        float: The standard error of the hero's equity when called, as a fraction.
+    """
+    if weights is not None:
+        # Each number of players is estimated separately, so their variances add up in proportion to their weights
+        return sqrt(sum((weight * error) ** 2 for _, weight, _, error in size_estimates(tally, weights)))
+    counts, shares, squares = tally
+    return standard_error(int(counts[2:].sum()), int(shares[2:].sum()), int(squares[2:].sum())) / SHARE_SCALE
+
+
+def ev_error(tally, pot, bet, weights=None, samples=None):
+    """
+    Get the standard error of the expected value of shoving from a called tally.
+
+    Args:
+        tally (np.ndarray): A called tally, as returned by `called_tally`.
+        pot (float | np.ndarray): The size of the pot, or with `weights` an array of sizes.
+        bet (float | np.ndarray): The size of the hero's bet, or with `weights` an array of sizes.
+        weights (np.ndarray, optional): The probability of each number of players, as returned by
+            `pattern_weights`, when the tally only holds called pots.
+        samples (int, optional): The number of deals the weights were estimated from, if they are not exact.
+
+    Returns:
+        float | np.ndarray: The standard error of the expected value of shoving.
+    """
+    if weights is not None:
+        # The pots every villain folds are worth exactly the pot, so only the called pots add to the variance
+        estimates = size_estimates(tally, weights)
+        called = 1 - weights[1]
+        variance = sum((called * weight * (pot + bet * size) * error) ** 2 for size, weight, _, error in estimates)
+        if samples:
+            # Estimated weights add the variance of the pot's worth over the numbers of players they were dealt
+            worths = [(weights[1], pot)] + [(called * weight, (pot + bet * size) * share - bet)
+                                            for size, weight, share, _ in estimates]
+            ev = sum(weight * worth for weight, worth in worths)
+            spread = sum(weight * worth ** 2 for weight, worth in worths) - ev ** 2
+            variance = variance + np.maximum(spread, 0) / samples
+        return np.sqrt(variance)
+    counts, shares, squares = tally
+    balance = 0
+    balance_squares = 0
+    for size in range(1, 11):
+        # Each pot played by this many players is worth (pot + bet * size) * share / SHARE_SCALE - bet to the hero
+        worth = (pot + bet * size) / SHARE_SCALE
+        balance += worth * int(shares[size]) - bet * int(counts[size])
+        balance_squares += (worth * worth * int(squares[size]) - 2 * bet * worth * int(shares[size]) +
+                            bet * bet * int(counts[size]))
+    return standard_error(int(counts.sum()), balance, balance_squares)
+
+
+def converged(half_width, runs, started, precision=None, max_runs=None, max_time=None):
+    """
+    Decide whether a simulation has run for long enough.
+
+    Args:
+        half_width (float): The half width of the 95% confidence interval of the simulated result.
+        runs (int): The number of run outs simulated.
+        started (float): The time the simulation started.
+        precision (float, optional): Stop once the half width is no more than this, after at least `MIN_RUNS` run outs.
+        max_runs (int, optional): Stop once this many run outs have been simulated.
+        max_time (float, optional): Stop once the simulation has run for this many seconds.
+
+    Returns:
+        bool: True if any of the given stopping rules is met.
+    """
+    return ((precision is not None and runs >= MIN_RUNS and half_width <= precision) or
+            (max_runs is not None and runs >= max_runs) or (max_time is not None and time.time() - started >= max_time))
+
+
+# The exact preflop heads up equity table built by build_preflop_table.py, holding equities scaled to PREFLOP_SCALE
+PREFLOP_TABLE_PATH = 'tables/preflop_equity.npy'
+PREFLOP_SCALE = 65535
+
+
+def load_preflop_table(path=PREFLOP_TABLE_PATH):
+    """
+    Memory map the preflop heads up equity table.
+
+    Args:
+        path (str, optional): The file the table was saved to.
+
+    Returns:
+        np.memmap: The table, indexed by hero combo and then villain combo, or None if it has not been built.
+    """
+    try:
+        return np.load(path, mmap_mode='r')
+    except OSError:
+        return None
+
+
+PREFLOP_TABLE = load_preflop_table()
+
+
+def calculate_preflop_equity(my_hand, pack, possible_hands, house_cards=()):
+    """
+    Look up the exact equity of a poker hand against one opponent's range before the flop.
+
+    The equity against each live combo in the villain's range is read from `PREFLOP_TABLE` and averaged, each combo
+    counting equally as it does when the spot is simulated.
+
+    Args:
+        my_hand (Hand): The poker hand of the hero.
+        pack (Deck): The deck of cards used in the simulation, with the hero's hand dealt.
+        possible_hands (list): A list of possible opponent hand ranges.
+        house_cards (list, optional): House cards that are already dealt.
+
+    Returns:
+        dict: The equity percentages of the hero and the villain, or None if the spot is not a heads up preflop spot
+        or the table has not been built.
+    """
+    if PREFLOP_TABLE is None or len(possible_hands) != 1 or house_cards or pack.dealt & ~my_hand.mask:
+        return None
+    combos = [combo for combo in possible_hands[0].compile().combos if not COMBO_MASKS[combo] & my_hand.mask]
+    if not combos:
+        return None
+    equity = int(PREFLOP_TABLE[my_hand.index, combos].sum(dtype=np.int64)) * 100 / PREFLOP_SCALE / len(combos)
+    return {'hero': equity, 0: 100 - equity}
+
+
+# How often, in seconds, a running simulation saves its tally to the cache
+CACHE_INTERVAL = 1
+
+# Changed whenever the layout of the tallies changes, so that tallies cached in an older layout are not resumed
+TALLY_VERSION = 4
+
+
+def spot_key(kind, my_hand, pack, possible_hands, house_cards=()):
+    """
+    Get the cache key of a spot, which is the same for every spot that only differs by a relabelling of the suits.
+
+    Args:
+        kind (str): The kind of tally the spot is cached for, such as 'equity' or 'called'.
+        my_hand (Hand): The poker hand of the hero.
+        pack (Deck): The deck of cards used in the simulation, with the hero's hand and house cards dealt.
+        possible_hands (list): A list of the opponents' ranges.
+        house_cards (list, optional): House cards that are already dealt.
+
+    Returns:
+        str: The key of the spot, or None if cards other than the hero's hand and the house are dead, which the
+        canonical spot does not describe.
+    """
+    if pack.dealt & ~(my_hand.mask | sum(card.mask for card in house_cards)):
+        return None
+    spot, _ = canonical_spot(my_hand, possible_hands, house_cards)
+    return hashlib.sha1(f'{kind}{TALLY_VERSION}{spot}'.encode()).hexdigest()
+
+
+def cached_tallies(tallies, cache=None, key=None, resume=True):
+    """
+    Resume a stream of tallies from the cache and keep the cache up to date with it.
+
+    The cached tally of the spot is yielded straight away, and every tally from the stream is added to it. The
+    merged tally is saved back to the cache every `CACHE_INTERVAL` seconds and when the generator is closed.
+
+    Args:
+        tallies (generator): The stream of merged tallies, as yielded by `run_tallies`.
+        cache (EquityCache, optional): The cache, or None to pass the stream through unchanged.
+        key (str, optional): The key of the spot, or None to pass the stream through unchanged.
+        resume (bool, optional): Whether to resume from the cached tally, rather than only saving the stream over it
+            when the stream already holds every run out of the spot worth keeping.
+
+    Yields:
+        np.ndarray: The cached tally plus the tally of the stream so far.
+    """
+    if cache is None or key is None:
+        yield from tallies
+        return
+
+    cached = cache.get(key) if resume else None
+    start = cached[0] if cached else 0
+    latest = None
+    if cached:
+        yield start
+    saved = time.time()
+    try:
+        for tally in tallies:
+            latest = start + tally
+            yield latest
+            if time.time() - saved >= CACHE_INTERVAL:
+                cache.put(key, latest)
+                saved = time.time()
+    finally:
+        tallies.close()
+        if latest is not None:
+            cache.put(key, latest)
+
+
+# Exact enumeration is used instead of sampling when it needs no more hand evaluations than this
+EXACT_LIMIT = 2000000
+
+
+def enumeration_size(my_hand, pack, possible_hands, house_cards=()):
+    """
+    Estimate the number of hands that exact enumeration of a spot would have to evaluate.
+
+    Args:
+        my_hand (Hand): The poker hand of the hero.
+        pack (Deck): The deck of cards used in the simulation, with the hero's hand and house cards dealt.
+        possible_hands (list): A list of possible opponent hand ranges.
+        house_cards (list, optional): House cards that are already dealt.
+
+    Returns:
+        int: The number of remaining run outs multiplied by the number of live combos in each villain's range.
+    """
+    live = 52 - bin(pack.dealt | my_hand.mask).count('1')
+    size = comb(live, 5 - len(house_cards))
+    for villain in possible_hands:
+        size *= len(villain.compile())
+    return size
+
+
+def use_exact(my_hand, pack, possible_hands, house_cards=()):
+    """
+    Decide whether a spot is small enough to enumerate exactly rather than simulate.
+
+    Args:
+        my_hand (Hand): The poker hand of the hero.
+        pack (Deck): The deck of cards used in the simulation, with the hero's hand and house cards dealt.
+        possible_hands (list): A list of possible opponent hand ranges.
+        house_cards (list, optional): House cards that are already dealt.
+
+    Returns:
+        bool: True if the spot can be counted with `use_counting`, or at least the flop is known and the enumeration
+        fits within `EXACT_LIMIT`.
+    """
+    if use_counting(my_hand, pack, possible_hands, house_cards):
+        return True
+    return len(house_cards) >= 3 and enumeration_size(my_hand, pack, possible_hands, house_cards) <= EXACT_LIMIT
+
+
+# The most villain hand combinations, summed over the run outs, that exact counting goes through
+COUNT_LIMIT = 200000
+
+
+def counting_size(my_hand, pack, possible_hands, house_cards=()):
+    """
+    Estimate the number of villain hand combinations that exact counting of a spot would go through.
+
+    Args:
+        my_hand (Hand): The poker hand of the hero.
+        pack (Deck): The deck of cards used in the calculation, with the hero's hand and house cards dealt.
+        possible_hands (list): A list of possible opponent hand ranges.
+        house_cards (list, optional): House cards that are already dealt.
+
+    Returns:
+        int: The number of remaining run outs multiplied by the number of live combos in every villain's range but
+        the largest, whose hands are counted rather than gone through.
+    """
+    live = 52 - bin(pack.dealt | my_hand.mask).count('1')
+    size = comb(live, 5 - len(house_cards))
+    for length in sorted(len(villain.compile()) for villain in possible_hands)[:-1]:
+        size *= length
+    return size
+
+
+def use_counting(my_hand, pack, possible_hands, house_cards=()):
+    """
+    Decide whether a spot can be counted exactly by `counted_equity_tally` or `counted_called_tally`.
+
+    Args:
+        my_hand (Hand): The poker hand of the hero.
+        pack (Deck): The deck of cards used in the calculation, with the hero's hand and house cards dealt.
+        possible_hands (list): A list of possible opponent hand ranges, the initial ranges in a called spot.
+        house_cards (list, optional): House cards that are already dealt.
+
+    Returns:
+        bool: True if at least the turn is known and the counting fits within `COUNT_LIMIT`.
+    """
+    return len(house_cards) >= 4 and counting_size(my_hand, pack, possible_hands, house_cards) <= COUNT_LIMIT
+
+
+def exact_equity_tally(my_hand, pack, possible_hands, house_cards=()):
+    """
+    Tally the exact results of a poker hand against a range of possible opponent hands.
+
+    Every remaining run out is enumerated against every combination of live villain hands that do not share a card,
+    each combination counting equally. On each run out the strength of every combo in the villains' ranges is
+    evaluated once and the players' hands are then compared by broadcasting one array axis per villain.
+
+    Args:
+        my_hand (Hand): The poker hand of the hero.
+        pack (Deck): The deck of cards used in the calculation, with the hero's hand and house cards dealt.
+        possible_hands (list): A list of possible opponent hand ranges.
+        house_cards (list, optional): House cards that are already dealt.
+
+    Returns:
+        np.ndarray: An equity tally in the same form as the tallies returned by `equity_tally`.
+    """
+    if use_counting(my_hand, pack, possible_hands, house_cards):
+        return counted_equity_tally(my_hand, pack, possible_hands, house_cards)
+
+    opponents = len(possible_hands)
+    players = ['hero'] + list(range(opponents))
+
+    ranges = []
+    for villain in possible_hands:
+        ranges.append(np.array(villain.compile().combos, dtype=np.int64))
+    union = np.unique(np.concatenate(ranges))
+
+    # Villain hands that share a card can never be dealt together
+    compatible = {}
+    for i in range(opponents):
+        for j in range(i + 1, opponents):
+            overlap = COMBO_MASK_ARRAY[ranges[i]][:, None] & COMBO_MASK_ARRAY[ranges[j]][None, :]
+            compatible[i, j] = overlap == 0
+
+    def along(array, axis):
+        # Reshape a villain's array so that it lies along its own axis of the broadcast grid
+        shape = [1] * opponents
+        shape[axis] = -1
+        return array.reshape(shape)
+
+    dead = pack.dealt | my_hand.mask
+    live = [index for index in range(52) if not dead >> index & 1]
+    house = [card.index for card in house_cards]
+    remaining = 5 - len(house_cards)
+
+    tally = np.zeros((len(players), 3, 11), dtype=np.int64)
+    strengths = np.zeros(1326, dtype=np.int64)
+
+    for run_out in combinations(live, remaining):
+        board = house + list(run_out)
+        run_out_mask = np.uint64(sum(1 << index for index in run_out))
+
+        # Evaluate every combo in any villain's range once for this run out
+        dealt = union[(COMBO_MASK_ARRAY[union] & run_out_mask) == 0]
+        dealt_cards = np.concatenate([COMBO_CARD_ARRAY[dealt], np.broadcast_to(board, (len(dealt), 5))], axis=1)
+        strengths[dealt] = batch_strength(dealt_cards)
+        hero = index_strength(list(my_hand.indices) + board)
+
+        weight = np.ones([1] * opponents, dtype=np.int64)
+        villains = []
+        for n, combos in enumerate(ranges):
+            weight = weight * along((COMBO_MASK_ARRAY[combos] & run_out_mask) == 0, n)
+            villains.append(along(strengths[combos], n))
+        for (i, j), pairs in compatible.items():
+            shape = [1] * opponents
+            shape[i], shape[j] = pairs.shape
+            weight = weight * pairs.reshape(shape)
+
+        best = hero
+        for villain in villains:
+            best = np.maximum(best, villain)
+        winners = (hero == best) + sum(villain == best for villain in villains)
+
+        # Each pot is split into whole numbers of shares between the strongest hands
+        shares = weight * (SHARE_SCALE // winners)
+        squares = shares * (SHARE_SCALE // winners)
+        tally[0, 0, hero >> STRENGTH_SHIFT] += weight.sum()
+        tally[0, 1, hero >> STRENGTH_SHIFT] += (shares * (hero == best)).sum()
+        tally[0, 2, hero >> STRENGTH_SHIFT] += (squares * (hero == best)).sum()
+        for n, villain in enumerate(villains):
+            others = tuple(axis for axis in range(opponents) if axis != n)
+            categories = strengths[ranges[n]] >> STRENGTH_SHIFT
+            np.add.at(tally[n + 1, 0], categories, weight.sum(axis=others).reshape(-1))
+            np.add.at(tally[n + 1, 1], categories, (shares * (villain == best)).sum(axis=others).reshape(-1))
+            np.add.at(tally[n + 1, 2], categories, (squares * (villain == best)).sum(axis=others).reshape(-1))
+    return tally
+
+
+# The number of rows of other villains' hands that the last villain's combos are counted against at a time
+COUNT_CHUNK = 4096
+
+# The number of deals of the villains' hands sampled to estimate the call and fold patterns of spots too large to count,
+# and the most times that many deals are tried to find them among those where the hands share no card
+PATTERN_SAMPLES = 100000
+PATTERN_ATTEMPTS = 20
+
+# The value of a folding villain's hand in a called spot, below any made hand so that it never wins a pot
+FOLDED = -1
+
+
+def count_hands(ranges, values, thresholds):
+    """
+    Count the last villain's hands below some thresholds against every combination of the other villains' hands.
+
+    The other villains' hands are gone through, keeping only the combinations where no two share a card. Rather than
+    going through the last villain's hands as well, the number of its combos below each threshold is looked up, the
+    combos holding a card of the other villains' hands are taken back out by card and the combos made from two of
+    those cards, taken out twice, are added back.
+
+    Args:
+        ranges (list): An array of the combo indices each villain can hold, none sharing a card with the hero or the
+            house.
+        values (list): An array of the value of each villain's combos, such as their strengths on the board.
+        thresholds (function): Given an array of the values of the other villains' hands in each row, returns an
+            array of the thresholds to count the last villain's hands below in each row.
+
+    Returns:
+        tuple: An array of the values of the other villains' hands in each row and an array of the number of the
+        last villain's hands sharing no card with them below each of the row's thresholds.
+    """
+    # Go through every combination of the other villains' hands that do not share a card
+    hands = np.zeros((1, 0), dtype=np.int64)
+    held = np.zeros((1, 0), dtype=np.int64)
+    used = np.zeros(1, dtype=np.uint64)
+    for combos, combo_values in zip(ranges[:-1], values[:-1]):
+        row, column = np.nonzero((used[:, None] & COMBO_MASK_ARRAY[combos][None, :]) == 0)
+        hands = np.concatenate([hands[row], combos[column, None]], axis=1)
+        held = np.concatenate([held[row], combo_values[column, None]], axis=1)
+        used = used[row] | COMBO_MASK_ARRAY[combos[column]]
+
+    # Count the last villain's combos below each of its distinct values, in all and holding each card
+    last = ranges[-1]
+    distinct = np.unique(values[-1])
+    ranks = np.searchsorted(distinct, values[-1])
+    below = np.concatenate([[0], np.cumsum(np.bincount(ranks, minlength=len(distinct)))])
+    by_card = np.zeros((52, len(distinct) + 1), dtype=np.int64)
+    for side in range(2):
+        np.add.at(by_card, (COMBO_CARD_ARRAY[last, side], ranks + 1), 1)
+    by_card = np.cumsum(by_card, axis=1)
+    combo_ranks = np.full(1326, len(distinct) + 1, dtype=np.int64)
+    combo_ranks[last] = ranks
+
+    cards = COMBO_CARD_ARRAY[hands].reshape(len(hands), -1)
+    first, second = np.triu_indices(cards.shape[1], 1)
+    counts = []
+    for start in range(0, len(hands), COUNT_CHUNK):
+        chunk = cards[start:start + COUNT_CHUNK]
+        limits = np.searchsorted(distinct, thresholds(held[start:start + COUNT_CHUNK]))
+        count = below[limits] - by_card[chunk[:, :, None], limits[:, None, :]].sum(axis=1)
+        high = np.maximum(chunk[:, first], chunk[:, second])
+        pairs = high * (high - 1) // 2 + np.minimum(chunk[:, first], chunk[:, second])
+        count += (combo_ranks[pairs][:, :, None] < limits[:, None, :]).sum(axis=1)
+        counts.append(count)
+    return held, np.concatenate(counts)
+
+
+def run_out_strengths(house, dead):
+    """
+    Iterate over the strength of every combo on each remaining run out of a house with at least four cards.
+
+    Args:
+        house (list): The card indices of the house cards.
+        dead (int): A mask of the cards that cannot be dealt, including the hero's hand and the house cards.
+
+    Yields:
+        np.ndarray: The strength of every combo on a complete board, or -1 for combos sharing a card with it, with
+        the river only indexed through `board_index` when it is already known.
+    """
+    if len(house) == 5:
+        yield board_index(house).strengths
+        return
+    for index in range(52):
+        if not dead >> index & 1:
+            yield BoardIndex(sorted(house + [index])).strengths
+
+
+def board_equity_tally(hero, ranges, strengths):
+    """
+    Tally the exact results of the hero's hand against some villains on a complete board.
+
+    Args:
+        hero (int): The combo index of the hero's hand.
+        ranges (list): An array of the combo indices each villain can hold, none sharing a card with the hero or the
+            board, with the last villain's hands counted by `count_hands`.
+        strengths (np.ndarray): The strength of every combo on the board.
+
+    Returns:
+        np.ndarray: An equity tally of the hero and the villains in the order of `ranges`, in the same form as the
+        tallies returned by `equity_tally`.
+    """
+    opponents = len(ranges)
+    hero_strength = int(strengths[hero])
+    boundaries = np.arange(12, dtype=np.int64) << STRENGTH_SHIFT
+
+    def thresholds(held):
+        # The last villain's hands below the best other hand, up to it, below each category and above the best hand
+        best = held.max(axis=1, initial=hero_strength)[:, None]
+        return np.concatenate([best, best + 1, np.broadcast_to(boundaries, (len(held), 12)),
+                               np.maximum(boundaries, best + 1)], axis=1)
+
+    held, counts = count_hands(ranges, [strengths[combos] for combos in ranges], thresholds)
+    players = np.concatenate([np.full((len(held), 1), hero_strength), held], axis=1)
+    best = players.max(axis=1)
+    winners = players == best[:, None]
+    alone = SHARE_SCALE // winners.sum(axis=1)
+    shared = SHARE_SCALE // (winners.sum(axis=1) + 1)
+
+    # Each combination of the other hands meets the last villain's hands below, level with and above the best of them
+    lower = counts[:, 0]
+    level = counts[:, 1] - counts[:, 0]
+    total = counts[:, 13]
+    won = lower * alone + level * shared
+    won_squares = lower * alone * alone + level * shared * shared
+
+    tally = np.zeros((opponents + 1, 3, 11), dtype=np.int64)
+    for player in range(opponents):
+        categories = players[:, player] >> STRENGTH_SHIFT
+        np.add.at(tally[player, 0], categories, total)
+        np.add.at(tally[player, 1], categories, won * winners[:, player])
+        np.add.at(tally[player, 2], categories, won_squares * winners[:, player])
+    above = np.diff(counts[:, 14:], axis=1).sum(axis=0)
+    tally[opponents, 0] = np.diff(counts[:, 2:14], axis=1).sum(axis=0)
+    tally[opponents, 1] = above * SHARE_SCALE
+    tally[opponents, 2] = above * SHARE_SCALE ** 2
+    np.add.at(tally[opponents, 1], best >> STRENGTH_SHIFT, level * shared)
+    np.add.at(tally[opponents, 2], best >> STRENGTH_SHIFT, level * shared * shared)
+    return tally
+
+
+def counted_equity_tally(my_hand, pack, possible_hands, house_cards=()):
+    """
+    Count the exact results of a poker hand against a range of possible opponent hands on the turn or river.
+
+    Every remaining run out is gone through, and on each one every combo is evaluated once and the villains' hands
+    counted with `board_equity_tally`, the villain with the largest range counted last. Every combination of live
+    villain hands that do not share a card counts equally, as in `exact_equity_tally`, but the number of
+    combinations gone through only grows with the ranges of the other villains.
+
+    Args:
+        my_hand (Hand): The poker hand of the hero.
+        pack (Deck): The deck of cards used in the calculation, with the hero's hand and house cards dealt.
+        possible_hands (list): A list of possible opponent hand ranges.
+        house_cards (list, optional): House cards that are already dealt.
+
+    Returns:
+        np.ndarray: An equity tally in the same form as the tallies returned by `equity_tally`.
+    """
+    dead = pack.dealt | my_hand.mask
+    ranges = [np.array(villain.compile().combos, dtype=np.int64) for villain in possible_hands]
+    ranges = [combos[(COMBO_MASK_ARRAY[combos] & np.uint64(dead)) == 0] for combos in ranges]
+    order = sorted(range(len(ranges)), key=lambda n: len(ranges[n]))
+
+    tally = np.zeros((len(ranges) + 1, 3, 11), dtype=np.int64)
+    for strengths in run_out_strengths([card.index for card in house_cards], dead):
+        ordered = [ranges[n][strengths[ranges[n]] >= 0] for n in order]
+        if any(not len(combos) for combos in ordered):
+            continue
+        tally[[0] + [n + 1 for n in order]] += board_equity_tally(my_hand.index, ordered, strengths)
+    return tally
+
+
+def board_called_tally(hero, initial, calling, strengths):
+    """
+    Tally the exact results of the hero's hand on a complete board where the villains may fold or call.
+
+    Args:
+        hero (int): The combo index of the hero's hand.
+        initial (list): An array of the combo indices each villain can hold, none sharing a card with the hero or the
+            board, with the last villain's hands counted by `count_hands`.
+        calling (list): A boolean array of whether each villain calls with each of their combos.
+        strengths (np.ndarray): The strength of every combo on the board.
+
+    Returns:
+        np.ndarray: A called tally in the same form as the tallies returned by `called_tally`.
+    """
+    hero_strength = int(strengths[hero])
+    values = [np.where(calls, strengths[combos], FOLDED) for combos, calls in zip(initial, calling)]
+
+    def thresholds(held):
+        # The last villain's folding hands, calling hands below the best other hand, up to it, and all its hands
+        best = held.max(axis=1, initial=hero_strength)[:, None]
+        return np.concatenate([np.zeros_like(best), best, best + 1, np.full_like(best, 11 << STRENGTH_SHIFT)], axis=1)
+
+    held, counts = count_hands(initial, values, thresholds)
+    callers = (held != FOLDED).sum(axis=1)
+    best = held.max(axis=1, initial=hero_strength)
+    ahead = best == hero_strength
+    alone = SHARE_SCALE // ((held == best[:, None]).sum(axis=1) + 1) * ahead
+    shared = SHARE_SCALE // ((held == best[:, None]).sum(axis=1) + 2) * ahead
+
+    # The last villain folds, calls with a hand below the best other hand, level with it or above it
+    folded = counts[:, 0]
+    lower = counts[:, 1] - counts[:, 0]
+    level = counts[:, 2] - counts[:, 1]
+    called = counts[:, 3] - counts[:, 0]
+
+    tally = np.zeros((3, 11), dtype=np.int64)
+    np.add.at(tally[0], callers + 1, folded)
+    np.add.at(tally[0], callers + 2, called)
+    np.add.at(tally[1], callers + 1, folded * alone)
+    np.add.at(tally[1], callers + 2, lower * alone + level * shared)
+    np.add.at(tally[2], callers + 1, folded * alone * alone)
+    np.add.at(tally[2], callers + 2, lower * alone * alone + level * shared * shared)
+    return tally
+
+
+def counted_called_tally(my_hand, pack, possible_hands, initial_ranges, house_cards=()):
+    """
+    Count the exact results of a poker hand on the turn or river in a spot where opponents may fold or call.
+
+    Every combination of live hands from the villains' initial ranges that do not share a card counts equally, and
+    each villain calls if their hand is in their calling range. The hands are counted on each remaining run out
+    with `board_called_tally`, the villain with the largest initial range counted last.
+
+    Args:
+        my_hand (Hand): The poker hand of the hero.
+        pack (Deck): The deck of cards used in the calculation, with the hero's hand and house cards dealt.
+        possible_hands (list): A list of the opponents' calling ranges.
+        initial_ranges (list): The initial hand ranges of possible opponents.
+        house_cards (list, optional): House cards that are already dealt.
+
+    Returns:
+        np.ndarray: A called tally in the same form as the tallies returned by `called_tally`.
+    """
+    dead = pack.dealt | my_hand.mask
+    initial = [np.array(villain.compile().combos, dtype=np.int64) for villain in initial_ranges]
+    initial = [combos[(COMBO_MASK_ARRAY[combos] & np.uint64(dead)) == 0] for combos in initial]
+    calling = [np.array(villain.compile().combos, dtype=np.int64) for villain in possible_hands]
+    order = sorted(range(len(initial)), key=lambda n: len(initial[n]))
+
+    tally = np.zeros((3, 11), dtype=np.int64)
+    for strengths in run_out_strengths([card.index for card in house_cards], dead):
+        ordered = [initial[n][strengths[initial[n]] >= 0] for n in order]
+        if any(not len(combos) for combos in ordered):
+            continue
+        calls = [np.isin(combos, calling[n]) for combos, n in zip(ordered, order)]
+        tally += board_called_tally(my_hand.index, ordered, calls, strengths)
+    return tally
+
+
+def calculate_equity_batch(my_hand, pack, possible_hands, house_cards=(), batch_size=10000, workers=None,
+                           cache=None, precision=None, max_runs=None, max_time=None,
+                           snapshot_interval=SNAPSHOT_INTERVAL, by_combo=(), combos=None, job=None):
+    """
+    Calculate equity for a poker hand against a range of possible opponent hands, many run outs at a time.
+
+    Each batch of `batch_size` run outs is simulated by `equity_tally`, with the batches shared between a pool of
+    worker processes, and the merged tallies are yielded as snapshots. Heads up before the flop the equities are
+    looked up with `calculate_preflop_equity` instead.
+
+    Tallied by combo for some villains, the batches are simulated by `combo_equity_tally` instead. When the combo
+    tally of an earlier calculation of the spot, broken down for the same villains, can be re-aggregated for an edited
+    range, its estimate is yielded straight away and only the combos added to the range are simulated until they
+    catch up, before the whole spot is simulated again.
+
+    Args:
+        my_hand (Hand): The poker hand of the hero.
+        pack (Deck): The deck of cards used in the simulation, with the hero's hand and house cards dealt.
+        possible_hands (list): A list of possible opponent hand ranges.
+        house_cards (list, optional): House cards that are already dealt.
+        batch_size (int, optional): The number of run outs simulated per batch.
+        workers (int, optional): The number of worker processes, defaulting to the number of CPUs.
+        cache (EquityCache, optional): A cache to resume the spot's tally from and save it to.
+        precision (float, optional): Stop once the 95% confidence interval of every player's equity is within this
+            many percentage points either side.
+        max_runs (int, optional): Stop once this many run outs have been simulated.
+        max_time (float, optional): Stop after this many seconds.
+        snapshot_interval (float, optional): Yield a snapshot at most every this many seconds, besides the last.
+        by_combo (tuple, optional): The indices of the villains to tally the run outs by the combo they held.
+        combos (ComboTally, optional): The combo tally of an earlier calculation to re-aggregate, tallying by combo.
+        job (Job, optional): The job calculating, which cancels the runs queued in the process pool when paused.
+
+    Yields:
+        EquitySnapshot: A snapshot of the merged tally of the hero and opponents so far, with the combo tally when
+        tallying by combo. When the spot is small enough to
+        enumerate, the exact result is yielded once and the generator finishes.
+    """
+    key = None if cache is None else spot_key('equity', my_hand, pack, possible_hands, house_cards)
+    if use_exact(my_hand, pack, possible_hands, house_cards):
+        cached = cache.get(key) if key else None
+        if cached and cached[1]:
+            tally = cached[0]
+        else:
+            tally = exact_equity_tally(my_hand, pack, possible_hands, house_cards)
+            if key:
+                cache.put(key, tally, exact=True)
+        yield EquitySnapshot(tally, exact=True)
+        return
+
+    hero = my_hand.indices
+    house = tuple(card.index for card in house_cards)
+    ranges = [villain.compile().combos for villain in possible_hands]
+    dead = pack.dealt | my_hand.mask
+
+    # Heads up before the flop the equities are exact from the start, and only the hand breakdown is simulated
+    preflop = calculate_preflop_equity(my_hand, pack, possible_hands, house_cards)
+
+    started = time.time()
+    shown = 0
+    villains = tuple(sorted(by_combo))
+    if villains:
+        latest, top_up = ComboTally((my_hand.index, house, dead), ranges, villains), None
+        reaggregated = None
+        if combos is not None and combos.villains == villains:
+            reaggregated = combos.reaggregate((my_hand.index, house, dead), ranges)
+        if reaggregated:
+            latest, top_up = reaggregated
+            yield EquitySnapshot(latest.total(), preflop=preflop, combos=latest)
+            shown = time.time()
+
+        # Deal the edited villain only the combos added to their range until those have been dealt often enough
+        if top_up:
+            villain, added, runs = top_up
+            topped = list(ranges)
+            topped[villain] = tuple(added)
+            tallies = run_tallies(combo_equity_tally, (hero, house, topped, dead, (villain,)), batch_size, workers,
+                                  job)
+            try:
+                for tally in tallies:
+                    if tally[:, 0, 0].sum() >= runs:
+                        break
+                    if time.time() - shown >= snapshot_interval:
+                        yield EquitySnapshot(latest.total(), preflop=preflop, combos=latest)
+                        shown = time.time()
+            finally:
+                tallies.close()
+            latest = latest.added(tally, latest.rows(villain, added))
+        start = latest
+
+        def totals(tallies):
+            # Keep the latest combo tally and pass on the merged tally of the run outs still valid
+            nonlocal latest
+            try:
+                for combo_tally in tallies:
+                    latest = start.added(combo_tally)
+                    yield latest.total()
+            finally:
+                tallies.close()
+
+        tallies = totals(run_tallies(combo_equity_tally, (hero, house, ranges, dead, villains), batch_size, workers,
+                                     job))
+        tallies = cached_tallies(tallies, cache, key, resume=not reaggregated)
+    else:
+        latest = None
+        tallies = cached_tallies(run_tallies(equity_tally, (hero, house, ranges, dead), batch_size, workers, job),
+                                 cache, key)
+
+    for tally in tallies:
+        runs = int(tally[0, 0].sum())
+        if not runs:
+            continue
+
+        # The hand breakdown is still simulated when the equities are exact, so stop on its precision
+        done = converged(CONFIDENCE_Z * max(equity_errors(tally).values()), runs, started, precision, max_runs,
+                         max_time)
+        if done or time.time() - shown >= snapshot_interval:
+            yield EquitySnapshot(tally, preflop=preflop, combos=latest)
+            shown = time.time()
+        if done:
+            return
+
+
+def calculate_called_equity(my_hand, pack, possible_hands, initial_ranges, house_cards=(), runs=5000,
+                            workers=None, cache=None, precision=None, max_runs=None, max_time=None, job=None):
+    """
+    Calculate equity for a poker hand in a scenario where opponents may fold or call.
+
+    This function calculates the equity of a poker hand in a scenario where possible opponents
+    may choose to fold or call based on their initial hand ranges. The fold percentage and average number of players
+    come exactly from the call and fold patterns of `call_patterns`, and runs of `runs` run outs, all of them
+    called, are simulated by `called_tally` to estimate the equity for each number of players, shared between a pool
+    of worker processes.
+
+    Args:
+        my_hand (Hand): The poker hand of the hero.
+        pack (Deck): The deck of cards used in the simulation.
+        possible_hands (list): A dictionary of possible opponent hand ranges.
+        initial_ranges (list): The initial hand ranges of possible opponents.
+        house_cards (list, optional): House cards that are already dealt.
+        runs (int, optional): The number of run outs simulated per run.
+        workers (int, optional): The number of worker processes, defaulting to the number of CPUs.
+        cache (EquityCache, optional): A cache to resume the spot's tally from and save it to.
+        precision (float, optional): Stop once the 95% confidence interval of the equity when called is within this
+            many percentage points either side.
+        max_runs (int, optional): Stop once this many run outs have been simulated.
+        max_time (float, optional): Stop after this many seconds.
+        job (Job, optional): The job calculating, which cancels the runs queued in the process pool when paused.
+
+    Yields:
+        tuple: A tuple containing equity percentages, fold percentages, average number of players, the standard
+        error of the equity and the standard error of the fold percentage, which is None when the patterns are
+        counted exactly. On the turn or river the exact result is yielded once, with None for both standard errors,
+        when `use_counting` allows. When every villain always folds, a result with no equity, every pot folded and
+        no players is yielded once instead.
+    """
+    # Every villain folds, so the hero wins the pot and there is no equity when called to estimate
+    folded = (0.0, 1.0, 0.0, None, None)
+    key = None if cache is None else spot_key('called', my_hand, pack, initial_ranges + possible_hands, house_cards)
+    if use_counting(my_hand, pack, initial_ranges, house_cards):
+        tally = exact_called_tally(my_hand, pack, possible_hands, initial_ranges, house_cards, cache, key)
+        output = called_percentages(tally)
+        yield output + (None, None) if output else folded
+        return
+
+    started = time.time()
+    spot, samples = called_spot(my_hand, pack, possible_hands, initial_ranges, house_cards)
+    weights = pattern_weights(spot[4])
+    if weights[1] >= 1:
+        yield folded
+        return
+    fold_error = None if samples is None else sqrt(weights[1] * (1 - weights[1]) / samples)
+    for tally in cached_tallies(run_tallies(called_tally, spot, runs, workers, job), cache, key):
+        output = called_percentages(tally, weights)
+        if output:
+            error = called_error(tally, weights)
+            yield output + (error, fold_error)
+            if converged(CONFIDENCE_Z * error * 100, int(tally[0].sum()), started, precision, max_runs, max_time):
+                return
+
+
+def exact_called_tally(my_hand, pack, possible_hands, initial_ranges, house_cards=(), cache=None, key=None):
+    """
+    Get the exact called tally of a spot from the cache, or count it with `counted_called_tally` and cache it.
+
+    Args:
+        my_hand (Hand): The poker hand of the hero.
+        pack (Deck): The deck of cards used in the calculation.
+        possible_hands (list): A list of the opponents' calling ranges.
+        initial_ranges (list): The initial hand ranges of possible opponents.
+        house_cards (list, optional): House cards that are already dealt.
+        cache (EquityCache, optional): A cache to look the spot's exact tally up in and save it to.
+        key (str, optional): The key of the spot in the cache.
+
+    Returns:
+        np.ndarray: The exact called tally.
+    """
+    cached = cache.get(key) if key else None
+    if cached and cached[1]:
+        return cached[0]
+    tally = counted_called_tally(my_hand, pack, possible_hands, initial_ranges, house_cards)
+    if key:
+        cache.put(key, tally, exact=True)
+    return tally
+
+
+def called_spot(my_hand, pack, possible_hands, initial_ranges, house_cards=()):
+    """
+    Get the arguments describing a spot where opponents may fold or call to `called_tally`.
+
+    Args:
+        my_hand (Hand): The poker hand of the hero.
+        pack (Deck): The deck of cards used in the simulation.
+        possible_hands (list): A list of the opponents' calling ranges.
+        initial_ranges (list): The initial hand ranges of possible opponents.
+        house_cards (list, optional): House cards that are already dealt.
+
+    Returns:
+        tuple: The arguments, which are the hero's card indices, the house card indices, the live calling and folding
+        combos of each villain, the call and fold patterns and their probabilities and the mask of dead cards, and
+        the number of deals the patterns were estimated from, or None if they are exact.
+    """
+    house = tuple(card.index for card in house_cards)
+    initial = [villain.compile().combos for villain in initial_ranges]
+    dead = pack.dealt | my_hand.mask
+
+    # A villain only calls with the hands of their calling range they can hold, and folds the rest
+    calling = []
+    folding = []
+    for villain, held in zip(possible_hands, initial_ranges):
+        calls = villain.compile().combo_set
+        live = [combo for combo in held.compile().combos if not COMBO_MASKS[combo] & dead]
+        calling.append(tuple(combo for combo in live if combo in calls))
+        folding.append(tuple(combo for combo in live if combo not in calls))
+    patterns, samples = call_patterns(initial, calling, dead)
+    return (my_hand.indices, house, calling, folding, patterns, dead), samples
+
+
+class ShoveEstimate:
+    """
+    A snapshot of a shove calculation, from which the EV of shoving any bet into any pot is derived without simulating
+    again, as the villains' calling ranges do not depend on the sizes.
+
+    Attributes:
+        tally (np.ndarray): The called tally, as returned by `called_tally` or `counted_called_tally`.
+        weights (np.ndarray): The probability of each number of players, as returned by `pattern_weights`, or None
+            when the tally holds every pot.
+        exact (bool): Whether the tally is exact rather than simulated.
+        samples (int): The number of deals the weights were estimated from, or None if they are exact.
+        runs (int): The number of run outs tallied.
+
+    Methods:
+        ev(pot, bet): Get the EV of shoving a bet into a pot.
+        error(pot, bet): Get the standard error of the EV of shoving a bet into a pot.
+    """
+    def __init__(self, tally, weights=None, exact=False, samples=None):
+        self.tally = tally
+        self.weights = weights
+        self.exact = exact
+        self.samples = samples
+        self.runs = int(tally[0].sum())
+
+    def ev(self, pot, bet):
+        """
+        Get the EV of shoving a bet into a pot, for every pair of sizes at once when given arrays of them.
+
+        Args:
+            pot (float | np.ndarray): The size of the pot, or an array of sizes broadcast against the bets.
+            bet (float | np.ndarray): The size of the hero's bet, or an array of sizes broadcast against the pots.
+
+        Returns:
+            float | np.ndarray: The EV of shoving.
+        """
+        return tally_ev(self.tally, pot, bet, self.weights)
+
+    def error(self, pot, bet):
+        """
+        Get the standard error of the EV of shoving a bet into a pot.
+
+        Args:
+            pot (float | np.ndarray): The size of the pot, or an array of sizes broadcast against the bets.
+            bet (float | np.ndarray): The size of the hero's bet, or an array of sizes broadcast against the pots.
+
+        Returns:
+            float | np.ndarray: The standard error of the EV, or None if the EV is exact.
+        """
+        if self.exact:
+            return None
+        return ev_error(self.tally, pot, bet, self.weights, self.samples)
+
+
+def calculate_shove_ev(my_hand, pack, possible_hands, initial_ranges, house_cards=(), runs=5000, workers=None,
+                       cache=None, precision=None, max_runs=None, max_time=None, job=None):
+    """
+    Calculate the expected value (EV) of shoving (going all-in) with a poker hand, for every bet and pot size.
+
+    This function calculates the expected value of shoving (going all-in) with a poker hand in a
+    scenario where opponents may fold or call based on their initial hand ranges. The pots every villain folds are
+    weighted exactly by `call_patterns`, and runs of `runs` run outs, all of them called, are simulated by
+    `called_tally`, shared between a pool of worker processes. Neither depends on the sizes, so the EV of any bet
+    into any pot is then found in closed form from the latest estimate.
+
+    Args:
+        my_hand (Hand): The poker hand of the hero.
+        pack (Deck): The deck of cards used in the simulation.
+        possible_hands (list): A list of possible opponent hand ranges.
+        initial_ranges (list): The initial hand ranges of possible opponents.
+        house_cards (list, optional): House cards that are already dealt.
+        runs (int, optional): The number of run outs simulated per run.
+        workers (int, optional): The number of worker processes, defaulting to the number of CPUs.
+        cache (EquityCache, optional): A cache to resume the spot's tally from and save it to.
+        precision (float, optional): Stop once the 95% confidence interval of the EV of a pot sized bet is within
+            this percentage of the pot either side.
+        max_runs (int, optional): Stop once this many run outs have been simulated.
+        max_time (float, optional): Stop after this many seconds.
+        job (Job, optional): The job calculating, which cancels the runs queued in the process pool when paused.
+
+    Yields:
+        ShoveEstimate: The latest estimate of the EV of shoving. On the turn or river the exact estimate is yielded
+        once when `use_counting` allows, as it is when every villain always folds.
+    """
+    key = None if cache is None else spot_key('called', my_hand, pack, initial_ranges + possible_hands, house_cards)
+    if use_counting(my_hand, pack, initial_ranges, house_cards):
+        tally = exact_called_tally(my_hand, pack, possible_hands, initial_ranges, house_cards, cache, key)
+        if tally[0].sum():
+            yield ShoveEstimate(tally, exact=True)
+        return
+
+    started = time.time()
+    spot, samples = called_spot(my_hand, pack, possible_hands, initial_ranges, house_cards)
+    weights = pattern_weights(spot[4])
+    if weights[1] >= 1:
+        # Every villain folds, so the hero wins the pot whatever the bet
+        yield ShoveEstimate(np.zeros((3, 11), dtype=np.int64), weights, exact=samples is None, samples=samples)
+        return
+    for tally in cached_tallies(run_tallies(called_tally, spot, runs, workers, job), cache, key):
+        if not tally[0].sum():
+            continue
+        estimate = ShoveEstimate(tally, weights, samples=samples)
+        yield estimate
+        if converged(CONFIDENCE_Z * estimate.error(100, 100), estimate.runs, started, precision, max_runs, max_time):
+            return
+
+
+def check_draws(villain_hands, house):
+    """
+    Check and categorize possible draws for each player's hand against the community cards.
+
+    This function evaluates the possible draws for each player's hand in relation to the community cards,
+    including straight draws, flush draws, overcards, and made hands.
+
+    Args:
+        villain_hands (HandRange): A range of possible opponent hands.
+        house (list): Community cards on the board.
+
+    Returns:
+        dict: A dictionary containing draw information for each player's hand.
+    """
+    # Look the strength of every combo on the board up in the board's index, evaluated once per board
+    index = board_index(card.index for card in house)
+
     # Evaluate the current draws on the board
     on_board_draws = {
         'straight': check_gutshot_straight_draw(house),
         'run-of-three': False,
         'flush': check_flush_draw(house)[0],
-        'made': read_them_and_weep(house)
+        'made': hand_strength(house)
     }
+    on_board_name = describe_strength(on_board_draws['made'])
 
     # Check for run-of-three straight draws
     if check_straight_draw(house)[0] == 3:
@@ -774,19 +2731,20 @@ def check_draws(villain_hands, house):
 
     for hand in hands:
         all_cards = list(hand.tuple) + house
-        made = read_them_and_weep(all_cards)
+        made = int(index.strengths[hand.index])
+        made_hand, tie_breaks = unpack_strength(made)
 
         # Evaluate the made hand
-        if made[0] != on_board_draws['made'][0] and made[1] != 2:
+        if made_hand != 2 and describe_strength(made) != on_board_name:
             house_in_order = high_cards(house)
 
-            if made[1] == 10:
+            if made_hand == 10:
                 draw_dict[hand]['made'] = 'Straight Flush'
-            elif made[1] == 9:
+            elif made_hand == 9:
                 draw_dict[hand]['made'] = 'Quads'
-            elif made[1] == 8:
+            elif made_hand == 8:
                 draw_dict[hand]['made'] = 'Full House'
-            elif made[1] == 7:
+            elif made_hand == 7:
                 house_flush_cards = high_cards(check_flush_draw(house)[1])
                 complete_flush_cards = high_cards(check_flush_draw(all_cards)[1])
 
@@ -806,11 +2764,11 @@ def check_draws(villain_hands, house):
                     draw_dict[hand]['made'] = 'Nut Flush'
                 else:
                     draw_dict[hand]['made'] = 'Flush'
-            elif made[1] == 6:
+            elif made_hand == 6:
                 draw_dict[hand]['made'] = 'Straight'
-            elif made[1] == 5:
+            elif made_hand == 5:
                 draw_dict[hand]['made'] = 'Three of a Kind'
-            elif made[1] == 4:
+            elif made_hand == 4:
                 draw_dict[hand]['made'] = 'Two Pair'
                 # pairs = made[2][0], made[2][1]
                 #
@@ -830,14 +2788,14 @@ def check_draws(villain_hands, house):
                 #         draw_dict[hand]['made'] = 'Bottom Two Pair'
                 #     else:
                 #         draw_dict[hand]['made'] = 'Mid Two Pair'
-            elif made[1] == 3:
-                if made[2][0] > house_in_order[0]:
+            elif made_hand == 3:
+                if tie_breaks[0] > house_in_order[0]:
                     draw_dict[hand]['made'] = 'Overpair'
-                elif made[2][0] < house_in_order[-1]:
+                elif tie_breaks[0] < house_in_order[-1]:
                     draw_dict[hand]['made'] = 'Underpair'
-                elif made[2][0] == house_in_order[0]:
+                elif tie_breaks[0] == house_in_order[0]:
                     draw_dict[hand]['made'] = 'Top Pair'
-                elif made[2][0] == house_in_order[-1]:
+                elif tie_breaks[0] == house_in_order[-1]:
                     draw_dict[hand]['made'] = 'Bottom Pair'
                 else:
                     draw_dict[hand]['made'] = 'Mid Pair'
@@ -868,7 +2826,7 @@ def check_draws(villain_hands, house):
                         draw_dict[hand]['run-of-three'] = True
 
         # Check for overcards
-        if made[1] == on_board_draws['made'][1] and made != on_board_draws['made']:
+        if made_hand == on_board_draws['made'] >> STRENGTH_SHIFT and made != on_board_draws['made']:
             hand_cards = [hand.card_1.value, hand.card_2.value]
             hand_cards.sort(reverse=True)
             house_in_order = high_cards(house)
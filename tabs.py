@@ -4,6 +4,13 @@ from widgets import *
 import copy
 import time
 
+# How often, in milliseconds, tabs show the latest results of their background calculations
+POLL_INTERVAL = 50
+
+# The shove tab draws the EV of this many bet sizes, up to this many times the pot or the bet entered if larger
+SWEEP_POINTS = 60
+SWEEP_POTS = 3
+
 
 class Tab(ttk.Frame):
     """Base class for tab frames"""
@@ -11,6 +18,42 @@ class Tab(ttk.Frame):
         super().__init__(padding=5, *args, **kwargs)
         self['relief'] = 'raised'
         self.grid_propagate(False)
+        self.results = None     # Where the tab's current background calculation publishes its results
+        self.version = None     # The version of the game data the tab last calculated or was reset for
+
+    def poll(self, results, show):
+        """
+        Show the latest result of a background calculation and poll again until the calculation has finished.
+
+        Results are only ever shown from the main loop, as Tk is not thread-safe.
+
+        Args:
+            results (LatestValue): Where the calculation publishes its results.
+            show: The function called with each result shown.
+        """
+        # Stop polling calculations that have been replaced by a newer one
+        if results is not self.results:
+            return
+
+        # Check whether the calculation has finished before taking its result, so its last result is never missed
+        done = results.done
+        result = results.take()
+        if result is not None:
+            show(result)
+        if not done:
+            self.after(POLL_INTERVAL, self.poll, results, show)
+
+    def checking_equity(self):
+        """
+        Get the hero's equity shown on the Overview, which is the equity of checking.
+
+        Returns:
+            float: The hero's equity percentage, or None if the Overview has not shown one yet.
+        """
+        try:
+            return float(self.manager.game_data['equity']['hero'].get()[:-1])
+        except (KeyError, ValueError):
+            return None
 
 
 class WelcomeTab(Tab):
@@ -64,11 +107,17 @@ class OverviewTab(Tab):
         self.blank = get_blank_card(self.manager.small_card)
         self.labels = []
         self.player_bars = {}
+        self.errors = {}
+        self.shown = False
+        self.spot = None        # The spot and the villains' combos the last calculation was for
+        self.edited = set()     # The villains whose ranges have been edited in the spot, which are tallied by combo
         self.in_depth = InDepthTab(master=self, manager=self.manager)
 
         # Create widgets
         self.instructions = ttk.Label(self, text=overview_text, style='Guide.TLabel', justify='right')
         self.next_tab = ttk.Button(self, text='Done', command=self.move_on)
+        self.cache_info = tk.StringVar()
+        self.cache_label = ttk.Label(self, textvariable=self.cache_info, style='Guide.TLabel', justify='right')
         self.players_frame = ttk.Frame(self, height=int(manager.height * 0.42), width=int(manager.width * 0.4))
         self.players_frame['relief'] = 'raised'
         self.players_frame.grid_propagate(False)
@@ -77,6 +126,7 @@ class OverviewTab(Tab):
         self.in_depth.grid(column=0, row=0, rowspan=4, pady=self.manager.small_pad, padx=self.manager.small_pad)
         self.instructions.grid(column=1, row=0, sticky='ne')
         self.next_tab.grid(column=1, row=1, sticky='ne')
+        self.cache_label.grid(column=1, row=2, sticky='ne')
         self.players_frame.grid(column=0, row=4)
 
         self.columnconfigure(1, weight=1)
@@ -91,7 +141,6 @@ class OverviewTab(Tab):
         """
         self.manager.notebook.select(self.manager.tabs['bet_for_value'])
 
-    @threaded
     def calculate(self):
         """
         Calculate the equity of each player based on game data.
@@ -99,17 +148,17 @@ class OverviewTab(Tab):
         This method clears existing labels, checks for necessary data, and creates display widgets for equity
         calculations.
 
-        If the required data is available, it calculates equity for the hero and each opponent, updates the display,
-        and allows incremental calculation to avoid freezing the GUI.
+        If the required data is available, it starts calculating equity for the hero and each opponent in the
+        background and polls for the results, so the simulation never waits for the display to be drawn.
 
         """
         # Clear existing labels
         for label in self.labels:
             label.destroy()
+        self.version = self.manager.game_data.version()
 
         # Check if necessary data is available
         if self.manager.game_data['hand'] and self.manager.game_data['ranges']:
-            self.manager.calculating['equity'] = True
             self.manager.game_data['equity'] = {}
 
             # Create display widgets for the user
@@ -125,6 +174,10 @@ class OverviewTab(Tab):
             self.labels.append(hero_bar)
             self.player_bars['hero'] = hero_bar
             hero_bar.grid(column=2, row=0, sticky='w', padx=self.manager.small_pad)
+            self.errors['hero'] = tk.StringVar()
+            hero_error = ttk.Label(self.players_frame, textvariable=self.errors['hero'], width=7)
+            self.labels.append(hero_error)
+            hero_error.grid(column=3, row=0, sticky='w')
 
             # Create display widgets for each opponent
             for count, villain in enumerate(self.manager.game_data['ranges']):
@@ -141,6 +194,10 @@ class OverviewTab(Tab):
                 self.labels.append(player_bar)
                 player_bar.grid(column=2, row=count + 1, sticky='w', padx=self.manager.small_pad)
                 self.player_bars[count] = player_bar
+                self.errors[count] = tk.StringVar()
+                error_label = ttk.Label(self.players_frame, textvariable=self.errors[count], width=7)
+                self.labels.append(error_label)
+                error_label.grid(column=3, row=count + 1, sticky='w')
 
             # Create copies of game data for equity calculation
             ranges = copy.deepcopy(self.manager.game_data['ranges'])
@@ -148,30 +205,84 @@ class OverviewTab(Tab):
             for villain in ranges:
                 villain.deck = deck
 
-            # Iterate through equity calculations
-            n = 0
-            for i in calculate_equity(self.manager.game_data['hand'], deck, ranges,
-                                      tuple(self.manager.game_data['house'])):
-                if not self.manager.calculating['equity']:
+            # Only tally the villains whose ranges have been edited in the same spot by combo, as the breakdown
+            # costs memory and transfer for every combo it covers, and only their further edits can be re-aggregated
+            spot = (self.manager.game_data['hand'].index,
+                    tuple(card.index for card in self.manager.game_data['house']), deck.dealt)
+            combos = tuple(villain.compile().combos for villain in ranges)
+            if self.spot is None or self.spot[0] != spot or len(self.spot[1]) != len(combos):
+                self.edited = set()
+            else:
+                self.edited |= {n for n in range(len(combos)) if combos[n] != self.spot[1][n]}
+            self.spot = spot, combos
+
+            # Calculate in the background and show the latest results as they come in, carrying the run outs of the
+            # last calculation over where only a villain's range was edited since
+            snapshot = self.manager.game_data['snapshot']
+            self.results = LatestValue()
+            self.shown = False
+            self.manager.jobs.start('equity', self.simulate, self.manager.game_data['hand'], deck, ranges,
+                                    tuple(self.manager.game_data['house']), tuple(sorted(self.edited)),
+                                    snapshot and snapshot.combos, self.results)
+            self.poll(self.results, self.show)
+
+    def simulate(self, job, hand, deck, ranges, house, by_combo, combos, results):
+        """
+        Calculate the equity of each player in the background, publishing each result without touching the display.
+
+        Args:
+            job (Job): The job the calculation runs as, which stops when it is cancelled.
+            hand (Hand): The hero's hand.
+            deck (Deck): A copy of the game deck.
+            ranges (list): Copies of the villains' ranges.
+            house (tuple): The house cards.
+            by_combo (tuple): The indices of the villains to tally the run outs by the combo they held.
+            combos (ComboTally): The combo tally of the last calculation, or None.
+            results (LatestValue): Where each result is published.
+        """
+        try:
+            # Iterate through equity calculations, each result covering a whole batch of run outs
+            for i in calculate_equity_batch(hand, deck, ranges, house, workers=self.manager.workers,
+                                            cache=self.manager.cache, precision=self.manager.precision['equity'],
+                                            by_combo=by_combo, combos=combos, job=job):
+                if job.cancelled:
+                    break
+                results.put(i)
+
+                # Pause while another tab's calculation has the CPU, and stop once this one has run for long enough
+                if not job.checkpoint() or job.elapsed >= self.manager.max_time:
                     break
-                else:
-                    for player in self.manager.game_data['equity']:
-                        self.manager.game_data['equity'][player].set(f'{round(i[0][player], 1)}%')
-                        equity = i[0][player]
-                        if equity >= 50:
-                            colour = 'green'
-                        elif equity >= 20:
-                            colour = 'orange'
-                        else:
-                            colour = 'red'
-                        self.player_bars[player].configure(width=int(equity / 2), background=colour)
-                        self.manager.game_data['hands_breakdown'] = i[1]
-                        n += 1
-                    if n == 100:
-                        self.in_depth.refresh()
-                    if n % 100 == 0:
-                        self.in_depth.calculate()
-                    self.update()
+        finally:
+            results.finish()
+
+    def show(self, snapshot):
+        """
+        Show a snapshot of the equity calculation.
+
+        Args:
+            snapshot (EquitySnapshot): The latest snapshot of the calculation.
+        """
+        equities = snapshot.equity()
+        errors = snapshot.errors()
+        for player in self.manager.game_data['equity']:
+            self.manager.game_data['equity'][player].set(f'{round(equities[player], 1)}%')
+            error = f'± {round(CONFIDENCE_Z * errors[player], 1)}%'
+            self.errors[player].set('exact' if snapshot.equity_exact else error)
+            equity = equities[player]
+            if equity >= 50:
+                colour = 'green'
+            elif equity >= 20:
+                colour = 'orange'
+            else:
+                colour = 'red'
+            self.player_bars[player].configure(width=int(equity / 2), background=colour)
+        self.manager.game_data['snapshot'] = snapshot
+        if not self.shown:
+            self.shown = True
+            self.cache_info.set(self.manager.cache.describe())
+            self.in_depth.refresh()
+        else:
+            self.in_depth.calculate()
 
     def refresh(self):
         """
@@ -182,7 +293,7 @@ class OverviewTab(Tab):
 
         """
         self.update()
-        if self.manager.calculating['equity']:
+        if self.manager.jobs.active('equity'):
             # Wait for the in-depth display to be ready before reloading it
             self.in_depth.after(5000, self.in_depth.refresh)
 
@@ -720,8 +831,7 @@ class RangesTab(Tab):
             del self.manager.game_data['ranges'][index]
 
             # Stop ongoing calculations for removed range
-            for calculation in self.manager.calculating:
-                self.manager.calculating[calculation] = False
+            self.manager.stop_calculating()
 
             # Destroy the frame associated with the removed range
             self.frames[index].destroy()
@@ -735,7 +845,8 @@ class ShoveCalculatorTab(Tab):
     Interface for finding the expected value of a bet.
 
     This class represents a tab in the application for calculating the expected value (EV) of a bet.
-    Users can input the bet size and pot size and calculate the EV of shoving all-in.
+    Users can input the bet size and pot size and calculate the EV of shoving all-in. The EV of every bet size is
+    drawn as a curve, and changing the sizes redraws it from the latest estimate without calculating again.
 
     Attributes:
         manager (Manager): The main application manager.
@@ -743,6 +854,8 @@ class ShoveCalculatorTab(Tab):
         frames (list): Frames for displaying opponent range information.
         range_displays (list): RangeDisplay instances for displaying opponent ranges.
         deck (Deck): A copy of the game deck for calculations.
+        estimate (ShoveEstimate): The latest estimate of the EV of shoving, or None.
+        spot (tuple): The game version and the hands each villain calls with that the estimate is for.
     """
     def __init__(self, manager, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -754,6 +867,8 @@ class ShoveCalculatorTab(Tab):
         self.frames = []
         self.range_displays = []
         self.deck = copy.deepcopy(self.manager.game_data['deck'])
+        self.estimate = None
+        self.spot = None
 
         # Create a Notebook for displaying multiple range displays
         self.notebook = ttk.Notebook(self, style='Ranges.TNotebook')
@@ -773,6 +888,10 @@ class ShoveCalculatorTab(Tab):
         self.bet_size.insert(tk.END, '100')
         self.pot_amount.insert(tk.END, '100')
 
+        # Redraw the EV from the latest estimate whenever the sizes change
+        self.bet_size.bind('<KeyRelease>', lambda _: self.show())
+        self.pot_amount.bind('<KeyRelease>', lambda _: self.show())
+
         # Calculate button
         self.calculate_button = ttk.Button(self.calculation_frame, text='Calculate', command=self.calculate)
         self.calculate_button.grid(column=5, row=0, padx=self.manager.small_pad)
@@ -785,7 +904,7 @@ class ShoveCalculatorTab(Tab):
         ev_label = ttk.Label(self.calculation_frame, text='Expected Value vs. Checking:')
         ev_label.grid(column=6, row=0, padx=self.manager.small_pad)
         self.ev = tk.StringVar()
-        self.ev_label = ttk.Label(self.calculation_frame, textvariable=self.ev, width=4, anchor='e')
+        self.ev_label = ttk.Label(self.calculation_frame, textvariable=self.ev, width=16, anchor='e')
         self.ev_label.grid(column=7, row=0, padx=self.manager.small_pad)
         self.calculation_frame.grid(column=0, row=0, sticky='w', padx=self.manager.small_pad,
                                     pady=self.manager.small_pad)
@@ -798,6 +917,10 @@ class ShoveCalculatorTab(Tab):
         self.next_button = ttk.Button(self, text='Done', command=self.move_on)
         self.next_button.grid(column=1, row=1, sticky='ne')
 
+        # Curve of the EV of every bet size
+        self.curve = EVCurve(self.manager, self)
+        self.curve.grid(column=1, row=2, sticky='ne', padx=self.manager.small_pad, pady=self.manager.small_pad)
+
         self.columnconfigure(1, weight=1)
 
     def move_on(self):
@@ -816,9 +939,14 @@ class ShoveCalculatorTab(Tab):
         self.frames = []
         self.range_displays = []
         self.ev.set('')
+        self.curve.delete('all')
+        self.estimate = None
+        self.spot = None
+        self.version = self.manager.game_data.version()
 
-        # Stop current calculation
-        self.manager.calculating['shove'] = False
+        # Stop current calculation and stop showing its results
+        self.manager.jobs.cancel('shove')
+        self.results = None
 
         # Reconstruct range displays for each villain
         for count, villain in enumerate(self.manager.game_data['ranges']):
@@ -837,11 +965,11 @@ class ShoveCalculatorTab(Tab):
 
     def refresh(self):
         """
-        Refresh the ShoveCalculatorTab by calling the reset method, effectively resetting the tab's state.
+        Refresh the ShoveCalculatorTab by calling the reset method if the game has changed since it was last reset.
         """
-        self.reset()
+        if self.version != self.manager.game_data.version():
+            self.reset()
 
-    @threaded
     def calculate(self):
         """
         Perform EV (Expected Value) calculation for a bet scenario.
@@ -849,20 +977,20 @@ class ShoveCalculatorTab(Tab):
         This method calculates the expected value of a bet based on the user's input, including the bet size,
         pot size, and opponent ranges. It updates the EV label with the result.
 
-        It first stops any ongoing calculations, then checks if the necessary game data (hand and ranges) are available.
-        It creates copies of the game data for the calculation and iterates through the range displays for each villain
-        to update their ranges based on user filters. Finally, it performs the EV calculation and updates the EV label.
+        It first checks if the necessary game data (hand and ranges) are available. It creates copies of the game data
+        for the calculation and iterates through the range displays for each villain to update their ranges based on
+        user filters. Finally, it starts the EV calculation in the background and polls for its results, unless the
+        villains' calling ranges have not changed since the last calculation, whose estimate gives the EV of any sizes.
         """
-        # Stop any ongoing calculations
-        if self.manager.calculating['shove']:
-            self.manager.calculating['shove'] = False
-
-        # Pause briefly to allow the previous calculation to stop
-        time.sleep(0.2)
-
         # Check if hand and ranges are available for calculation
         if self.manager.game_data['hand'] and self.manager.game_data['ranges']:
-            self.manager.calculating['shove'] = True
+            # The sizes do not change the estimate, so only calculate again for new calling ranges
+            spot = (self.version, tuple(frozenset(display.filter.selected_hands) for display in self.range_displays))
+            if spot == self.spot and self.results is not None:
+                self.show()
+                return
+            self.spot = spot
+            self.estimate = None
 
             # Create copies of game data for calculation
             self.deck = copy.deepcopy(self.manager.game_data['deck'])
@@ -888,23 +1016,71 @@ class ShoveCalculatorTab(Tab):
                 villain.refresh()
                 self.ranges.append(villain)
 
-            # Get the bet size and pot amount from the input fields
-            bet = float(self.bet_size.get())
-            pot = float(self.pot_amount.get())
+            # Calculate in the background and show the latest results as they come in
+            self.results = LatestValue()
+            self.manager.jobs.start('shove', self.simulate, self.manager.game_data['hand'], self.deck, self.ranges,
+                                    initial_ranges, tuple(self.manager.game_data['house']), self.results)
+            self.poll(self.results, self.show)
+
+    def simulate(self, job, hand, deck, ranges, initial_ranges, house, results):
+        """
+        Estimate the EV of shoving in the background, publishing each estimate without touching the display.
 
+        Args:
+            job (Job): The job the calculation runs as, which stops when it is cancelled.
+            hand (Hand): The hero's hand.
+            deck (Deck): A copy of the game deck.
+            ranges (list): The ranges each villain calls with.
+            initial_ranges (list): Copies of the villains' full ranges.
+            house (tuple): The house cards.
+            results (LatestValue): Where each estimate is published.
+        """
+        try:
             # Perform the EV calculation
-            for j in calculate_shove_ev(self.manager.game_data['hand'], self.deck, self.ranges, pot, bet,
-                                        initial_ranges, tuple(self.manager.game_data['house'])):
-                if not self.manager.calculating['shove']:
+            for j in calculate_shove_ev(hand, deck, ranges, initial_ranges, house, workers=self.manager.workers,
+                                        cache=self.manager.cache, precision=self.manager.precision['shove'], job=job):
+                if job.cancelled:
                     break
-                else:
-                    checking_equity = float(self.manager.game_data['equity']['hero'].get()[:-1]) / 100
-                    checking_ev = checking_equity * pot
-                    ev_vs_checking = j - checking_ev
+                results.put(j)
 
-                    # Update the EV label with the result
-                    self.ev.set(str(int(ev_vs_checking)))
-                    self.update()
+                # Pause while another tab's calculation has the CPU, and stop once this one has run for long enough
+                if not job.checkpoint() or job.elapsed >= self.manager.max_time:
+                    break
+        finally:
+            results.finish()
+
+    def show(self, estimate=None):
+        """
+        Show the EV of the bet entered relative to checking, and draw the EV of every bet size into the pot entered.
+
+        Args:
+            estimate (ShoveEstimate, optional): A new estimate of the EV of shoving, or None to show the latest one.
+        """
+        if estimate is not None:
+            self.estimate = estimate
+        if self.estimate is None:
+            return
+        try:
+            bet = float(self.bet_size.get())
+            pot = float(self.pot_amount.get())
+        except ValueError:
+            return
+        checking_equity = self.checking_equity()
+        if pot <= 0 or bet <= 0 or checking_equity is None:
+            return
+        checking_ev = checking_equity / 100 * pot
+        ev_vs_checking = self.estimate.ev(pot, bet) - checking_ev
+
+        # Update the EV label with the result and its precision as a percentage of the pot
+        error = self.estimate.error(pot, bet)
+        if error is None:
+            self.ev.set(f'{int(ev_vs_checking)} (exact)')
+        else:
+            self.ev.set(f'{int(ev_vs_checking)} ± {round(CONFIDENCE_Z * float(error) * 100 / pot, 1)}% pot')
+
+        # Every bet size comes from the same estimate in one pass
+        bets = np.linspace(0, max(SWEEP_POTS * pot, bet), SWEEP_POINTS + 1)[1:]
+        self.curve.draw(bets, self.estimate.ev(pot, bets) - checking_ev, bet)
 
 
 class BetForValueTab(Tab):
@@ -927,7 +1103,6 @@ class BetForValueTab(Tab):
         super().__init__(*args, **kwargs)
         self.manager = manager
         self.manager.tabs['bet_for_value'] = self
-        self.manager.calculating['value'] = False
 
         # Initialise class variables
         self.ranges = None
@@ -951,10 +1126,10 @@ class BetForValueTab(Tab):
         self.max_bet_label = ttk.Label(self.calculation_frame, textvariable=self.max_bet, width=18, anchor='e')
         self.max_bet_label.grid(column=0, row=0, padx=self.manager.small_pad)
         self.equity = tk.StringVar()
-        self.equity_label = ttk.Label(self.calculation_frame, textvariable=self.equity, width=20, anchor='e')
+        self.equity_label = ttk.Label(self.calculation_frame, textvariable=self.equity, width=28, anchor='e')
         self.equity_label.grid(column=1, row=0, padx=self.manager.small_pad)
         self.fold = tk.StringVar()
-        self.fold_label = ttk.Label(self.calculation_frame, textvariable=self.fold, width=10, anchor='e')
+        self.fold_label = ttk.Label(self.calculation_frame, textvariable=self.fold, width=18, anchor='e')
         self.fold_label.grid(column=2, row=0, padx=self.manager.small_pad)
         self.max_call = tk.StringVar()
         self.max_call_label = ttk.Label(self.calculation_frame, textvariable=self.max_call, width=16, anchor='e')
@@ -990,8 +1165,9 @@ class BetForValueTab(Tab):
         and refresh the interface.
 
         """
-        # Stop any ongoing calculations
-        self.manager.calculating['value'] = False
+        # Stop any ongoing calculations and stop showing their results
+        self.manager.jobs.cancel('value')
+        self.results = None
 
         # Remove all existing frames
         for frame in self.frames:
@@ -1000,6 +1176,7 @@ class BetForValueTab(Tab):
         # Clear existing data
         self.frames = []
         self.range_displays = []
+        self.version = self.manager.game_data.version()
         self.max_bet.set('')
         self.equity.set('')
         self.fold.set('')
@@ -1024,44 +1201,33 @@ class BetForValueTab(Tab):
 
     def refresh(self):
         """
-        Refresh the interface to its initial state.
+        Refresh the interface to its initial state if the game has changed since it was last reset.
 
         This method is used to reset the entire interface and calculations, effectively starting from scratch.
         It stops any ongoing calculations, clears existing data and frames, and re-initialises the range displays for
-        each opponent.
+        each opponent. While the game is unchanged the tab is left as it is, keeping the selected hands and any
+        calculation in progress.
 
         """
-        self.reset()
+        if self.version != self.manager.game_data.version():
+            self.reset()
 
-    @threaded
     def calculate(self):
         """
         Calculate and display various values related to bet sizing and equity.
 
         This method performs calculations to determine the equity, fold percentage, maximum call percentage, and
-        betting recommendations based on the selected hands and bet sizing. It updates the interface to display these
-        calculated values.
+        betting recommendations based on the selected hands and bet sizing. The calculation runs in the background,
+        and the interface is updated with its latest values as they come in.
 
         The calculated values are as follows:
         - Equity: The equity percentage of the hero's hand against the selected range.
         - Fold Percentage: The percentage of the opponent folding against the hero's bet.
         - Maximum Call Percentage: The maximum percentage of an opponent's hand to call the hero's bet.
         - Betting Recommendations: Recommendations for bet sizing based on equity and the current situation.
-
-        The method stops ongoing calculations if the 'value' flag is set to False and pauses briefly between
-        calculations.
         """
-        # Stop ongoing calculation
-        if self.manager.calculating['value']:
-            self.manager.calculating['value'] = False
-
-        # Wait for calculation to stop
-        time.sleep(0.2)
-
         # Check if necessary data is present
         if self.manager.game_data['hand'] and self.manager.game_data['ranges']:
-            self.manager.calculating['value'] = True
-
             # Copy data for calculation
             self.deck = copy.deepcopy(self.manager.game_data['deck'])
             initial_ranges = copy.deepcopy(self.manager.game_data['ranges'])
@@ -1085,40 +1251,91 @@ class BetForValueTab(Tab):
                 villain.refresh()
                 self.ranges.append(villain)
 
+            # Calculate in the background and show the latest results as they come in
+            self.results = LatestValue()
+            self.manager.jobs.start('value', self.simulate, self.manager.game_data['hand'], self.deck, self.ranges,
+                                    initial_ranges, tuple(self.manager.game_data['house']), self.results)
+            self.poll(self.results, self.show)
+
+    def simulate(self, job, hand, deck, ranges, initial_ranges, house, results):
+        """
+        Calculate the equity when called in the background, publishing each result without touching the display.
+
+        Args:
+            job (Job): The job the calculation runs as, which stops when it is cancelled.
+            hand (Hand): The hero's hand.
+            deck (Deck): A copy of the game deck.
+            ranges (list): The ranges each villain calls with.
+            initial_ranges (list): Copies of the villains' full ranges.
+            house (tuple): The house cards.
+            results (LatestValue): Where each result is published.
+        """
+        try:
             # Calculate equity and bet amounts
-            for j in calculate_called_equity(self.manager.game_data['hand'], self.deck, self.ranges,
-                                             initial_ranges, tuple(self.manager.game_data['house'])):
-                if not self.manager.calculating['value']:
+            for j in calculate_called_equity(hand, deck, ranges, initial_ranges, house,
+                                             workers=self.manager.workers, cache=self.manager.cache,
+                                             precision=self.manager.precision['value'], job=job):
+                if job.cancelled:
                     break
-                else:
-                    checking_equity = float(self.manager.game_data['equity']['hero'].get()[:-1])
-                    called_equity = j[0] * 100
-                    fold = j[1] * 100
+                results.put(j)
 
-                    # Calculate the maximum call percentage
-                    if called_equity < 100:
-                        max_call = called_equity * 100 / (100 - 2 * called_equity)
-                    else:
-                        max_call = 999999999
+                # Pause while another tab's calculation has the CPU, and stop once this one has run for long enough
+                if not job.checkpoint() or job.elapsed >= self.manager.max_time:
+                    break
+        finally:
+            results.finish()
 
-                    # Calculate maximum bet amount
-                    bet_amount = find_bet(called_equity, fold, 100, checking_equity, j[2])
+    def show(self, result):
+        """
+        Show a result of the calculation with the bet sizes it recommends.
+
+        Args:
+            result (tuple): The equity when called, the fold probability, the expected number of players, or zero if
+                every villain folds, the standard error of the equity, or None if the equity is exact, and the
+                standard error of the fold probability, or None if it is exact.
+        """
+        checking_equity = self.checking_equity()
+        if checking_equity is None:
+            return
 
-                    # Update the interface with calculated values
-                    self.equity.set(f'Equity {int(called_equity)}% vs selected')
-                    self.fold.set(f'{int(fold)}% folded')
-                    self.max_call.set(f'Max Call: {int(max_call)}% pot')
+        # Every villain folds to a bet, so any bet takes the pot and there is no equity when called to show
+        if not result[2]:
+            self.equity.set('Never called vs selected')
+            self.fold.set('100% folded')
+            self.max_call.set('')
+            self.max_bet.set('Any bet is profitable')
+            return
+        called_equity = result[0] * 100
+        fold = result[1] * 100
+
+        # Calculate the maximum call percentage
+        if called_equity < 100:
+            max_call = called_equity * 100 / (100 - 2 * called_equity)
+        else:
+            max_call = 999999999
 
-                    # Provide betting recommendations
-                    if called_equity > 50:
-                        self.max_bet.set('Any bet is profitable')
-                    elif bet_amount[0] == 'Max Bet:' and bet_amount[1] <= 0:
-                        self.max_bet.set('Better off checking')
-                    else:
-                        self.max_bet.set(f'{bet_amount[0]} {bet_amount[1]}% pot')
+        # Calculate maximum bet amount
+        bet_amount = find_bet(called_equity, fold, 100, checking_equity, result[2])
 
-                    # Trigger an update of the interface
-                    self.update()
+        # Update the interface with calculated values
+        if result[3] is None:
+            self.equity.set(f'Equity {int(called_equity)}% vs selected (exact)')
+        else:
+            error = round(CONFIDENCE_Z * result[3] * 100, 1)
+            self.equity.set(f'Equity {int(called_equity)}% ± {error}% vs selected')
+        if result[4] is None:
+            self.fold.set(f'{int(fold)}% folded')
+        else:
+            self.fold.set(f'{int(fold)}% ± {round(CONFIDENCE_Z * result[4] * 100, 1)}% folded')
+        self.max_call.set(f'Max Call: {int(max_call)}% pot')
+
+        # Provide betting recommendations
+        if called_equity > 50:
+            self.max_bet.set('Any bet is profitable')
+        elif bet_amount[0] == 'Max Bet:' and bet_amount[1] <= 0:
+            self.max_bet.set('Better off checking')
+        else:
+            self.max_bet.set(f'{bet_amount[0]} {bet_amount[1]}% pot')
 
 
 class InDepthTab(Tab):
@@ -1160,7 +1377,7 @@ class InDepthTab(Tab):
             self.choose_player.destroy()
 
         # Check if equity calculation is enabled
-        if self.manager.calculating['equity']:
+        if self.manager.jobs.active('equity'):
             # Create a list of player options including 'hero' and 'Villain X' for each villain
             players = ['hero'] + [f'Villain {n + 1}' for n in range(len(self.manager.game_data['equity']) - 1)]
 
@@ -1184,11 +1401,12 @@ class InDepthTab(Tab):
         including occurrence percentage, win percentage, and relative win rate percentage for each made hand.
         The calculated statistics are then updated and displayed in the user interface.
         """
-        # Get the selected player from the combobox
+        # Get the selected player from the combobox and the latest snapshot of the equity calculation
         player = self.chosen_player.get()
+        snapshot = self.manager.game_data['snapshot']
 
         # Check if a player is selected
-        if not player:
+        if not player or snapshot is None:
             return
 
         # If the selected player is not 'hero', convert it to the corresponding index
@@ -1196,9 +1414,7 @@ class InDepthTab(Tab):
             player = int(player[-1]) - 1
 
         # Iterate through the made hands for the selected player
-        for made_hand in self.manager.game_data['hands_breakdown'][player]:
-            stats = self.manager.game_data['hands_breakdown'][player][made_hand]
-
+        for made_hand, stats in snapshot.breakdown(player).items():
             # Calculate and update occurrence percentage
             occurrence_raw = stats['made']
             occurrence = round(occurrence_raw * 100, 1)
@@ -1336,9 +1552,9 @@ class Analysis(ttk.Notebook):
             - The method collects selected house cards from the 'update_house_tab'.
             - It updates the game data with the collected house cards and the selected hero's hand.
             - The method refreshes the content of the selected tab, ensuring up-to-date information.
-            - If equity calculations are not in progress, related tabs are reset and background calculation is
-            restarted.
-            - It stops tab-specific calculations and refreshes the entire application manager.
+            - Only if the game has changed since they were last calculated are related tabs reset and the background
+            calculation restarted, which is also restarted if it was cancelled.
+            - It refreshes the entire application manager.
         """
         # Create an empty list to store house cards
         house = []
@@ -1362,20 +1578,20 @@ class Analysis(ttk.Notebook):
         # Get the currently selected tab
         tab = event.widget.select()
 
-        # Refresh the content of the selected tab
+        # Refresh the content of the selected tab and give its calculation the CPU, pausing the others
         for pane in self.manager.tabs:
             if tab == str(self.manager.tabs[pane]):
                 self.manager.tabs[pane].refresh()
-
-        # If equity calculations are not in progress, reset related tabs and restart background calculation
-        if not self.manager.calculating['equity']:
-            self.bet_for_value_tab.reset()
-            self.shove_calculator_tab.reset()
+                self.manager.jobs.show(pane)
+
+        # Reset related tabs and restart the background calculation only if the game has really changed
+        version = self.manager.game_data.version()
+        for pane in (self.bet_for_value_tab, self.shove_calculator_tab):
+            if pane.version != version:
+                pane.reset()
+        if self.overview_tab.version != version or not self.manager.jobs.active('equity'):
             self.overview_tab.calculate()
 
-        # Stop tab specific calculations
-        self.manager.calculating['value'] = False
-        self.manager.calculating['shove'] = False
         self.manager.refresh()
 
 
@@ -1389,13 +1605,17 @@ class Interface(tk.Tk):
     Attributes:
         manager (Manager): An instance of the Manager class that manages the application's state and data.
         resize_ratio (float): A scaling ratio for resizing elements based on screen dimensions.
+        workers (int): The number of worker processes simulations are shared between, or None for the number of CPUs.
+        cache (EquityCache): The cache of simulation tallies, opened once and shared by every manager.
 
     Methods:
         reset(): Reset the application's state and user interface.
 
     """
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, workers=None, **kwargs):
         super().__init__(*args, **kwargs)
+        self.workers = workers
+        self.cache = EquityCache()
         self.configure(background='black')
         self.title("Hold 'Em Helper")
 
@@ -1405,7 +1625,7 @@ class Interface(tk.Tk):
         self.resize_ratio = min(screen_height / 768, screen_width / 1366)
 
         # Initialize the application manager
-        self.manager = Manager(self.resize_ratio)
+        self.manager = Manager(self.resize_ratio, self.workers, self.cache)
 
         # Create a summary sidebar
         self.summary = SummarySidebar(master=self, manager=self.manager)
@@ -1438,8 +1658,21 @@ class Interface(tk.Tk):
             process to complete before continuing to use the application.
 
         """
-        # Stop ongoing calculations
+        # Stop ongoing calculations, and rebuild once their threads have finished without blocking the interface
         self.manager.stop_calculating()
+        self.reset_button.state(['disabled'])
+        self.after(POLL_INTERVAL, self.rebuild, time.time() + JOB_TIMEOUT)
+
+    def rebuild(self, deadline):
+        """
+        Rebuild the application once the stopped calculations have finished, polling until they have.
+
+        Args:
+            deadline (float): The time to stop waiting for calculations and rebuild regardless.
+        """
+        if self.manager.jobs.running() and time.time() < deadline:
+            self.after(POLL_INTERVAL, self.rebuild, deadline)
+            return
 
         # Destroy the existing analysis and summary widgets
         self.after(1000, self.analysis.destroy())
@@ -1450,7 +1683,7 @@ class Interface(tk.Tk):
         screen_width = self.winfo_screenwidth()
         screen_height = self.winfo_screenheight()
         self.resize_ratio = min(screen_height / 768, screen_width / 1366)
-        self.manager = Manager(self.resize_ratio)
+        self.manager = Manager(self.resize_ratio, self.workers, self.cache)
 
         # Recreate the analysis notebook and summary sidebar
         self.analysis = Analysis(self.manager, resize=self.resize_ratio, master=self)
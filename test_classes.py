@@ -0,0 +1,155 @@
+from types import SimpleNamespace
+from classes import *
+from concurrent.futures import Future
+import random
+import threading
+import time
+
+
+def test_card_and_combo_indices_match_the_cards():
+    deck = Deck()
+    for index, card in enumerate(deck.card_list):
+        assert card.index == index == card_index(card.value, card.suit) and card.mask == 1 << index
+    for combo, hand in enumerate(deck.hand_list):
+        assert hand.index == combo == combo_index(*reversed(hand.indices))
+        assert set(COMBO_CARDS[combo]) == set(hand.indices) and COMBO_MASKS[combo] == hand.mask
+
+
+def test_deck_keeps_hand_availability_up_to_date():
+    rng = random.Random(0)
+    deck = Deck()
+    for _ in range(200):
+        index = rng.randrange(52)
+        if rng.random() < 0.6:
+            deck.deal_card(index)
+        else:
+            deck.add_cards(index)
+        live = {combo for combo in range(1326) if not COMBO_MASKS[combo] & deck.dealt}
+        assert set(deck.live_combos()) == live
+        assert {hand.index for hand, available in deck.possible_hands.items() if available} == live
+
+
+def test_compiled_range_follows_removed_hands_after_a_refresh():
+    deck = Deck()
+    villain = Range(deck, SimpleNamespace(get=lambda: 0), SimpleNamespace(get=lambda: 20))
+    compiled = villain.compile()
+    assert villain.compile() is compiled and set(compiled.combos) == set(villain.get_combos())
+
+    # Editing removed_hands in place, as the range displays do, takes effect once the range is refreshed
+    removed = [deck.get_hand(combo) for combo in compiled.combos[::3]]
+    villain.removed_hands.update(removed)
+    villain.refresh()
+    edited = villain.compile()
+    assert edited is not compiled
+    assert edited.combo_set == compiled.combo_set - {hand.index for hand in removed}
+    villain.removed_hands.difference_update(removed)
+    villain.refresh()
+    assert villain.compile().combo_set == compiled.combo_set
+
+def test_equity_cache_resumes_tallies_and_evicts_the_oldest(tmp_path):
+    cache = EquityCache(str(tmp_path / 'equity.sqlite'), size=2)
+    tally = np.arange(66, dtype=np.int64).reshape(2, 3, 11)
+    assert cache.get('a') is None
+    cache.put('a', tally)
+    cached, exact = cache.get('a')
+    assert (cached == tally).all() and not exact
+
+    # Using a spot keeps it, so the spot left unused is the one evicted
+    time.sleep(0.01)
+    cache.put('b', tally * 2, exact=True)
+    time.sleep(0.01)
+    cache.get('a')
+    time.sleep(0.01)
+    cache.put('c', tally * 3)
+    assert len(cache) == 2 and cache.get('b') is None
+    assert (cache.get('c')[0] == tally * 3).all()
+    assert (cache.hits, cache.misses) == (3, 2)
+
+
+def test_game_state_only_moves_on_for_real_changes():
+    deck = Deck()
+    state = GameState({'deck': deck, 'hand': None, 'house': [], 'ranges': []})
+    assert state.version() == 0
+
+    # Dealing a card in place moves the deck on once, and returning it moves it on again
+    deck.deal_card(0)
+    assert state.version() == state.version() == 1
+    state['hand'] = deck.get_hand(combo_index(8, 9))
+    state['hand'] = deck.get_hand(combo_index(9, 8))
+    assert state.version() == 2 and state.revisions['hand'] == 1
+    deck.add_cards(0)
+    assert state.version() == 3 and state.revisions['deck'] == 2
+
+
+def run_slices(job, slices=None):
+    """
+    Run a job in short slices until it is told to stop, counting the slices run.
+    """
+    while job.checkpoint():
+        if slices is not None:
+            slices.append(job.name)
+        time.sleep(0.005)
+
+
+def test_superseded_job_stops_at_its_next_checkpoint():
+    jobs = JobManager()
+    first = jobs.start('equity', run_slices)
+    second = jobs.start('equity', run_slices)
+    assert first.cancelled and not second.cancelled and jobs.current['equity'] is second
+    assert first.join(1) and first.finished and second.running
+    jobs.cancel()
+    assert jobs.join(1) == [] and not jobs.active('equity')
+
+
+def test_cancelling_a_paused_job_wakes_it_to_stop():
+    jobs = JobManager()
+    job = jobs.start('value', run_slices)
+    job.pause()
+    assert job.paused and not job.join(0.05)
+    jobs.cancel('value')
+    assert not job.paused and job.join(1)
+
+
+def test_join_reports_whether_the_job_stopped():
+    release = threading.Event()
+    job = Job('shove', lambda job: release.wait())
+    job.thread.start()
+    assert not job.join(0.05) and job.running
+    release.set()
+    assert job.join(1) and not job.running
+
+
+def test_showing_a_tab_pauses_the_other_jobs_until_it_is_shown_again():
+    jobs = JobManager()
+    jobs.show('bet_for_value')
+    equity, value = [], []
+    jobs.start('equity', run_slices, equity)
+    job = jobs.start('value', run_slices, value)
+    queued = Future()
+    job.track(queued)
+
+    # Showing the Overview pauses the hidden tab's job at its next checkpoint and cancels its queued runs
+    jobs.show('overview')
+    assert job.paused and queued.cancelled() and not jobs.current['equity'].paused
+    time.sleep(0.05)
+    paused_at = len(value)
+    time.sleep(0.05)
+    assert len(value) == paused_at and equity
+
+    # Showing its tab again resumes it and pauses the Overview's job instead
+    jobs.show('bet_for_value')
+    time.sleep(0.05)
+    assert len(value) > paused_at and not job.paused and jobs.current['equity'].paused
+    jobs.cancel()
+    assert jobs.join(1) == []
+
+
+def test_latest_value_replaces_values_never_taken():
+    results = LatestValue()
+    assert results.take() is None
+    results.put(1)
+    results.put(2)
+    assert results.take() == 2 and results.take() is None
+    results.put(3)
+    results.finish()
+    assert results.done and results.take() == 3
@@ -0,0 +1,499 @@
+from types import SimpleNamespace
+from functions import *
+import functions
+from itertools import product
+import random
+import threading
+import time
+import pytest
+
+
+def percentage(value):
+    # Stands in for the Tk variables the range sliders hold
+    return SimpleNamespace(get=lambda: value)
+
+
+def make_spot(hero, house, ranges):
+    """
+    Deal a spot from card indices, giving each villain the range between two percentages.
+    """
+    deck = Deck()
+    for index in hero + house:
+        deck.deal_card(index)
+    hand = deck.get_hand(combo_index(*hero))
+    house_cards = [deck.get_card(index) for index in house]
+    villains = [Range(deck, percentage(high), percentage(low)) for high, low in ranges]
+    return hand, deck, villains, house_cards
+
+
+def five_card_strength(cards):
+    """
+    Evaluate five cards directly from their values and suits, as a reference for the table-driven evaluator.
+    """
+    card_values = sorted((index // 4 + 2 for index in cards), reverse=True)
+    flush = len({index % 4 for index in cards}) == 1
+    distinct = sorted(set(card_values), reverse=True)
+    straight = None
+    if len(distinct) == 5 and distinct[0] - distinct[4] == 4:
+        straight = distinct[0]
+    elif distinct == [14, 5, 4, 3, 2]:
+        straight = 5
+    groups = sorted(((card_values.count(value), value) for value in distinct), reverse=True)
+    ranked = tuple(value for _, value in groups)
+
+    if straight and flush:
+        return pack_strength(10, (straight, ))
+    if groups[0][0] == 4:
+        return pack_strength(9, ranked)
+    if groups[0][0] == 3 and groups[1][0] == 2:
+        return pack_strength(8, ranked)
+    if flush:
+        return pack_strength(7, tuple(card_values))
+    if straight:
+        return pack_strength(6, (straight, ))
+    return pack_strength({3: 5, 2: 4 if groups[1][0] == 2 else 3, 1: 2}[groups[0][0]], ranked)
+
+
+def test_index_strength_matches_best_five_cards():
+    rng = random.Random(0)
+    hands = [rng.sample(range(52), 7) for _ in range(3000)]
+    # Make sure the rarer categories come up
+    hands += [[0, 1, 2, 3, 4, 5, 6], [48, 44, 40, 36, 32, 1, 2], [48, 0, 4, 8, 12, 21, 30], [48, 49, 50, 44, 45, 3, 7]]
+    strengths = batch_strength(np.array(hands, dtype=np.int64))
+    for hand, strength in zip(hands, strengths):
+        best = max(five_card_strength(cards) for cards in combinations(hand, 5))
+        assert index_strength(hand) == best == strength
+
+
+def test_rank_hash_finds_every_rank_key():
+    keys = np.array(list(RANKS), dtype=np.uint64)
+    assert (rank_strengths(keys) == np.array(list(RANKS.values()), dtype=np.int64)).all()
+
+
+def test_canonicalise_is_the_same_for_every_suit_relabelling():
+    rng = random.Random(1)
+    hero, house = combo_index(10, 11), (3, 21, 38)
+    ranges = [rng.sample(range(1326), 40), rng.sample(range(1326), 60)]
+    canonical = canonicalise(hero, house, ranges)[0]
+    for cards, combos in zip(CARD_PERMUTATIONS, COMBO_PERMUTATIONS):
+        relabelled = canonicalise(combos[hero], [cards[index] for index in house],
+                                  [[combos[combo] for combo in villain] for villain in ranges])
+        assert relabelled[0] == canonical
+
+
+def test_restore_combos_maps_canonical_results_back():
+    hero, house = combo_index(10, 11), (3, 21, 38)
+    (canonical_hero, canonical_house), permutation = canonicalise(hero, house)
+    assert permutation
+    restored = restore_combos(build_combo_equities(canonical_hero, canonical_house), permutation)
+    assert np.allclose(restored, build_combo_equities(hero, house), equal_nan=True)
+
+
+@pytest.mark.skipif(PREFLOP_TABLE is None, reason='the preflop table has not been built')
+def test_preflop_table_matches_every_board():
+    hero, villain = combo_index(50, 51), combo_index(44, 46)
+    boards = np.array(list(combinations([index for index in range(52) if index not in (50, 51, 44, 46)], 5)))
+    points = 0
+    for start in range(0, len(boards), 200000):
+        chunk = boards[start:start + 200000]
+        hero_strengths = batch_strength(np.concatenate([np.broadcast_to(COMBO_CARDS[hero], (len(chunk), 2)), chunk],
+                                                       axis=1))
+        villain_strengths = batch_strength(np.concatenate([np.broadcast_to(COMBO_CARDS[villain], (len(chunk), 2)),
+                                                           chunk], axis=1))
+        points += int((hero_strengths > villain_strengths).sum() * 2 + (hero_strengths == villain_strengths).sum())
+    assert PREFLOP_TABLE[hero, villain] == round(points / (2 * len(boards)) * PREFLOP_SCALE)
+
+    # The table is the same under any suit relabelling, and each pair's equities add up to the whole pot
+    for combos in COMBO_PERMUTATIONS[1:4]:
+        assert PREFLOP_TABLE[combos[hero], combos[villain]] == PREFLOP_TABLE[hero, villain]
+    rows = PREFLOP_TABLE[:200].astype(np.int64)
+    columns = PREFLOP_TABLE[:, :200].T.astype(np.int64)
+    met = (COMBO_MASK_ARRAY[:200, None] & COMBO_MASK_ARRAY[None, :]) == 0
+    assert (abs(rows + columns - PREFLOP_SCALE)[met] <= 1).all()
+
+
+def live_combos(villain, dead):
+    return [combo for combo in villain.compile().combos if not COMBO_MASKS[combo] & dead]
+
+
+def fit_together(combos, dealt):
+    # Whether some combos share no card with each other or the cards already dealt
+    for combo in combos:
+        if COMBO_MASKS[combo] & dealt:
+            return False
+        dealt |= COMBO_MASKS[combo]
+    return True
+
+
+def brute_force_tally(hand, deck, villains, house_cards):
+    """
+    Tally every run out against every combination of villain hands that fit together, one hand at a time.
+    """
+    dead = deck.dealt | hand.mask
+    house = [card.index for card in house_cards]
+    ranges = [live_combos(villain, dead) for villain in villains]
+    tally = np.zeros((len(villains) + 1, 3, 11), dtype=np.int64)
+    for run_out in combinations([index for index in range(52) if not dead >> index & 1], 5 - len(house)):
+        board = house + list(run_out)
+        for combos in product(*ranges):
+            if not fit_together(combos, sum(1 << index for index in run_out)):
+                continue
+            strengths = [index_strength(list(hand.indices) + board)] + \
+                        [index_strength(list(COMBO_CARDS[combo]) + board) for combo in combos]
+            best = max(strengths)
+            share = SHARE_SCALE // strengths.count(best)
+            for player, strength in enumerate(strengths):
+                category = strength >> STRENGTH_SHIFT
+                tally[player, 0, category] += 1
+                if strength == best:
+                    tally[player, 1, category] += share
+                    tally[player, 2, category] += share * share
+    return tally
+
+
+@pytest.mark.skipif(PREFLOP_TABLE is None, reason='the preflop table has not been built')
+def test_preflop_equity_from_the_table_is_exact():
+    hand, deck, villains, house_cards = make_spot((50, 51), (), [(0, 20)])
+    snapshots = list(calculate_equity_batch(hand, deck, villains, house_cards, workers=1, max_runs=20000))
+    assert snapshots and all(snapshot.preflop and snapshot.equity_exact for snapshot in snapshots)
+    assert snapshots[-1].errors() == {'hero': 0.0, 0: 0.0}
+    assert not EquitySnapshot(snapshots[-1].tally).equity_exact
+
+def test_exact_equity_tally_matches_brute_force():
+    hand, deck, villains, house_cards = make_spot((8, 9), (0, 21, 38), [(0, 2), (2, 4)])
+    assert not use_counting(hand, deck, villains, house_cards)
+    assert (exact_equity_tally(hand, deck, villains, house_cards) ==
+            brute_force_tally(hand, deck, villains, house_cards)).all()
+
+
+def test_counted_equity_tally_matches_brute_force():
+    for house, ranges in [((0, 21, 38, 13), [(0, 3), (2, 6)]), ((0, 21, 38, 13, 30), [(0, 3), (0, 2), (2, 5)])]:
+        hand, deck, villains, house_cards = make_spot((8, 9), house, ranges)
+        assert (counted_equity_tally(hand, deck, villains, house_cards) ==
+                brute_force_tally(hand, deck, villains, house_cards)).all()
+
+
+def test_equity_tally_matches_exact_equity_multiway():
+    hand, deck, villains, house_cards = make_spot((8, 9), (0, 21, 38), [(0, 3), (0, 3)])
+    exact = EquitySnapshot(exact_equity_tally(hand, deck, villains, house_cards), exact=True).equity()
+
+    tally = equity_tally(hand.indices, tuple(card.index for card in house_cards),
+                         [villain.compile().combos for villain in villains], deck.dealt | hand.mask, 200000,
+                         np.random.SeedSequence(1))
+    snapshot = EquitySnapshot(tally)
+    equity, errors = snapshot.equity(), snapshot.errors()
+    for player in exact:
+        assert abs(equity[player] - exact[player]) < 4 * errors[player]
+
+
+def brute_force_called(hand, deck, calling, initial, house_cards):
+    """
+    Count the call and fold patterns and tally the called pots one combination of villain hands at a time.
+    """
+    dead = deck.dealt | hand.mask
+    house = [card.index for card in house_cards]
+    ranges = [live_combos(villain, dead) for villain in initial]
+    calls = [villain.compile().combo_set for villain in calling]
+    patterns = np.zeros(1 << len(initial))
+    for combos in product(*ranges):
+        if fit_together(combos, 0):
+            patterns[sum(1 << n for n, combo in enumerate(combos) if combo in calls[n])] += 1
+
+    tally = np.zeros((3, 11), dtype=np.int64)
+    for run_out in combinations([index for index in range(52) if not dead >> index & 1], 5 - len(house)):
+        board = house + list(run_out)
+        for combos in product(*ranges):
+            if not fit_together(combos, sum(1 << index for index in run_out)):
+                continue
+            hero = index_strength(list(hand.indices) + board)
+            callers = [index_strength(list(COMBO_CARDS[combo]) + board) for n, combo in enumerate(combos)
+                       if combo in calls[n]]
+            best = max(callers, default=-1)
+            share = SHARE_SCALE if hero > best else SHARE_SCALE // (callers.count(best) + 1) if hero == best else 0
+            tally[:, len(callers) + 1] += 1, share, share * share
+    return patterns / patterns.sum(), tally
+
+
+def turn_called_spot():
+    hand, deck, initial, house_cards = make_spot((8, 9), (0, 21, 38, 13), [(0, 4), (0, 3)])
+    calling = [Range(deck, percentage(0), percentage(low)) for low in (2, 1)]
+    return hand, deck, calling, initial, house_cards
+
+
+def test_counted_called_tally_and_call_patterns_match_brute_force():
+    hand, deck, calling, initial, house_cards = turn_called_spot()
+    probabilities, tally = brute_force_called(hand, deck, calling, initial, house_cards)
+    assert (counted_called_tally(hand, deck, calling, initial, house_cards) == tally).all()
+
+    spot, samples = called_spot(hand, deck, calling, initial, house_cards)
+    assert samples is None
+    assert np.allclose([probability for _, probability in spot[4]], probabilities)
+
+
+def test_sampled_call_patterns_match_brute_force(monkeypatch):
+    monkeypatch.setattr(functions, 'COUNT_LIMIT', 0)
+    hand, deck, calling, initial, house_cards = turn_called_spot()
+    probabilities, _ = brute_force_called(hand, deck, calling, initial, house_cards)
+    spot, samples = called_spot(hand, deck, calling, initial, house_cards)
+    for (_, probability), exact in zip(spot[4], probabilities):
+        assert abs(probability - exact) < 4 * sqrt(exact * (1 - exact) / samples) + 1e-12
+
+
+def test_simulated_run_outs_never_deal_a_dead_card(monkeypatch):
+    hand, deck, villains, house_cards = make_spot((8, 9), (0, 21, 38), [(0, 30), (0, 30)])
+    for index in (12, 13, 40, 51):
+        deck.deal_card(index)
+    house = tuple(card.index for card in house_cards)
+    dead = deck.dealt | hand.mask
+    evaluated = []
+    monkeypatch.setattr(functions, 'batch_strength', lambda cards: evaluated.append(cards) or np.zeros(len(cards)))
+    simulate_run_outs(hand.indices, house, [villain.compile().combos for villain in villains], dead, 20000,
+                      np.random.SeedSequence(7))
+
+    # Every player's hand is evaluated with the same board, and no card is dealt twice or from the dead cards
+    hands = np.stack(evaluated)
+    boards = hands[:, :, 2:]
+    assert (boards == boards[0]).all() and (boards[0, :, :3] == house).all()
+    dealt = np.concatenate([hands[1:, :, :2].transpose(1, 0, 2).reshape(len(hands[0]), -1), boards[0, :, 3:]], axis=1)
+    masks = (np.uint64(1) << dealt.astype(np.uint64)).sum(axis=1, dtype=np.uint64)
+    assert not (masks & np.uint64(dead)).any()
+    assert (np.array([bin(int(mask)).count('1') for mask in masks]) == dealt.shape[1]).all()
+
+    # Every live card turns up on some board
+    assert set(boards[0, :, 3:].ravel()) == {index for index in range(52) if not dead >> index & 1}
+
+def test_combo_tally_reaggregates_range_edits():
+    hand, deck, villains, house_cards = make_spot((8, 9), (0, 21, 38), [(0, 4), (0, 6)])
+    house = tuple(card.index for card in house_cards)
+    spot = hand.index, house, deck.dealt | hand.mask
+    ranges = [villain.compile().combos for villain in villains]
+    combos = ComboTally(spot, ranges, (1,)).added(combo_equity_tally(hand.indices, house, ranges, spot[2], (1,),
+                                                                     200000, np.random.SeedSequence(4)))
+
+    # Taking combos out of one villain's range keeps the run outs of the combos left
+    removed = ranges[1][::3]
+    for combo in removed:
+        villains[1].remove(combo)
+    edited = [villain.compile().combos for villain in villains]
+    reaggregated, top_up = combos.reaggregate(spot, edited)
+    assert top_up is None and reaggregated.anchor == 1
+    assert (reaggregated.total() == combos.extra[combos.rows(1, edited[1])].sum(axis=0)).all()
+
+    snapshot = EquitySnapshot(reaggregated.total())
+    exact = EquitySnapshot(exact_equity_tally(hand, deck, villains, house_cards), exact=True).equity()
+    equity, errors = snapshot.equity(), snapshot.errors()
+    for player in exact:
+        assert abs(equity[player] - exact[player]) < 4 * errors[player]
+
+    # Combos put back need topping up in proportion, and edits of two ranges cannot be re-aggregated
+    _, (villain, added, runs) = reaggregated.reaggregate(spot, ranges)
+    assert villain == 1 and sorted(added) == sorted(removed)
+    assert runs == ceil(reaggregated.runs() * len(removed) / len(edited[1]))
+    assert combos.reaggregate(spot, [edited[1], edited[1]]) is None
+
+    # Villains not broken down by combo cannot be re-aggregated either
+    assert combos.reaggregate(spot, [edited[1], ranges[1]]) is None
+    assert combos.reaggregate((hand.index, house[:2], spot[2]), edited) is None
+
+
+def test_called_tally_matches_counted_called_tally():
+    hand, deck, initial, house_cards = make_spot((8, 9), (0, 21, 38, 13, 30), [(0, 4), (0, 4), (0, 3)])
+    calling = [Range(deck, percentage(0), percentage(low)) for low in (1, 2, 1)]
+    exact = counted_called_tally(hand, deck, calling, initial, house_cards)
+    counts, shares, _ = exact
+
+    spot, _ = called_spot(hand, deck, calling, initial, house_cards)
+    weights = pattern_weights(spot[4])
+    tally = called_tally(*spot, 200000, np.random.SeedSequence(1))
+    for size, _, share, error in size_estimates(tally, weights):
+        assert abs(share - shares[size] / SHARE_SCALE / counts[size]) < 4 * error + 1e-12
+    equity = called_percentages(tally, weights)[0]
+    assert abs(equity - called_percentages(exact)[0]) < 4 * called_error(tally, weights)
+
+
+def test_called_equity_folds_everything_when_no_villain_calls():
+    # On the flop the call patterns are found before simulating, on the river the whole spot is counted
+    for house in ((0, 21, 38), (0, 21, 38, 13, 30)):
+        hand, deck, initial, house_cards = make_spot((8, 9), house, [(0, 20), (0, 30)])
+        calling = [Range(deck, percentage(0), percentage(0)) for _ in initial]
+        results = list(calculate_called_equity(hand, deck, calling, initial, house_cards, workers=1))
+        assert results == [(0.0, 1.0, 0.0, None, None)]
+
+def test_combo_equity_tally_sums_to_equity_tally():
+    hand, deck, villains, house_cards = make_spot((8, 9), (0, 21, 38), [(0, 20), (0, 30)])
+    args = (hand.indices, tuple(card.index for card in house_cards),
+            [villain.compile().combos for villain in villains], deck.dealt | hand.mask)
+    tally = equity_tally(*args, 5000, np.random.SeedSequence(3))
+    combos = ComboTally(None, args[2], (0, 1))
+    combos = combos.added(combo_equity_tally(*args, (0, 1), 5000, np.random.SeedSequence(3)))
+    assert len(combos.extra) == sum(map(len, args[2]))
+    for villain in range(len(villains)):
+        assert (combos.extra[combos.rows(villain)].sum(axis=0) == tally).all()
+
+
+def test_split_pots_convert_back_to_equal_equities():
+    # Every player plays the royal flush on the board, so every pot is split between all of them
+    for villains in (1, 2, 4, 9):
+        hand, deck, _, house_cards = make_spot((0, 5), (51, 47, 43, 39, 35), [])
+        dead = deck.dealt | hand.mask
+        ranges = [tuple(deck.live_combos())] * villains
+        tally = equity_tally(hand.indices, tuple(card.index for card in house_cards), ranges, dead, 2000,
+                             np.random.SeedSequence(6))
+        share = SHARE_SCALE // (villains + 1)
+        assert share * (villains + 1) == SHARE_SCALE
+        runs = tally[:, 0].sum(axis=1)
+        assert (runs == runs[0]).all() and (tally[:, 0, 10] == runs).all()
+        assert (tally[:, 1, 10] == runs * share).all() and (tally[:, 2, 10] == runs * share ** 2).all()
+
+        snapshot = EquitySnapshot(tally)
+        assert snapshot.equity() == pytest.approx({player: 100 / (villains + 1) for player in snapshot.players})
+        assert max(snapshot.errors().values()) == pytest.approx(0)
+
+def test_standard_error_matches_sample_deviation():
+    outcomes = np.random.default_rng(5).integers(0, SHARE_SCALE + 1, size=1000)
+    error = standard_error(len(outcomes), int(outcomes.sum()), int((outcomes ** 2).sum()))
+    assert np.isclose(error, outcomes.std(ddof=1) / sqrt(len(outcomes)))
+    assert standard_error(1, 5, 25) == float('inf')
+
+
+def test_board_index_ranks_and_keeps_the_strongest_combos():
+    board = [0, 21, 38, 13]
+    index = board_index(board)
+    combos = random.Random(2).sample(range(1326), 300)
+    live = [combo for combo in combos if not COMBO_MASKS[combo] & sum(1 << card for card in board)]
+    strengths = {combo: index_strength(list(COMBO_CARDS[combo]) + board) for combo in live}
+    assert all(index.strengths[combo] == strength for combo, strength in strengths.items())
+
+    for fraction in (0, 0.1, 0.35, 1):
+        ordered = sorted(strengths.values(), reverse=True)
+        keep = ceil(fraction * len(live))
+        cutoff = ordered[keep - 1] if keep else float('inf')
+        assert index.top(combos, fraction) == {combo for combo in live if strengths[combo] >= cutoff}
+
+
+def brute_force_equity(hero, villain, house):
+    # The hero's equity percentage against one combo over every run out left
+    dead = COMBO_MASKS[hero] | COMBO_MASKS[villain] | sum(1 << index for index in house)
+    points = 0
+    run_outs = list(combinations([index for index in range(52) if not dead >> index & 1], 5 - len(house)))
+    for run_out in run_outs:
+        board = list(house) + list(run_out)
+        hero_strength = index_strength(list(COMBO_CARDS[hero]) + board)
+        villain_strength = index_strength(list(COMBO_CARDS[villain]) + board)
+        points += 2 * (hero_strength > villain_strength) + (hero_strength == villain_strength)
+    return points * 50 / len(run_outs)
+
+
+def test_combo_equities_match_brute_force():
+    hero, house = combo_index(8, 9), (0, 21, 38)
+    equities = build_combo_equities(hero, house)
+    for villain in random.Random(3).sample(range(1326), 8) + [combo_index(0, 1), combo_index(9, 10)]:
+        if COMBO_MASKS[villain] & (COMBO_MASKS[hero] | sum(1 << index for index in house)):
+            assert np.isnan(equities[villain])
+        else:
+            assert np.isclose(equities[villain], brute_force_equity(hero, villain, house))
+
+
+def test_equity_matrix_matches_combo_equities():
+    house = (0, 21, 38, 13)
+    matrix = build_equity_matrix(house)
+    heroes = [combo_index(8, 9), combo_index(44, 49), combo_index(2, 3)]
+    villains = random.Random(4).sample(range(1326), 200)
+    for hero in heroes:
+        assert np.allclose(matrix.equities[hero], build_combo_equities(hero, house), equal_nan=True)
+    assert np.isclose(matrix.equities[heroes[0], heroes[1]], brute_force_equity(heroes[0], heroes[1], house))
+
+    block = np.array([[build_combo_equities(hero, house)[villain] for villain in villains] for hero in heroes])
+    assert np.isclose(matrix.equity(heroes, villains), np.nanmean(block))
+    assert matrix.combo_equities(heroes, villains) == pytest.approx(
+        {hero: np.nanmean(row) for hero, row in zip(heroes, block)})
+
+
+def test_shove_ev_from_called_pots_matches_every_pot():
+    hand, deck, calling, initial, house_cards = turn_called_spot()
+    tally = counted_called_tally(hand, deck, calling, initial, house_cards)
+    spot, _ = called_spot(hand, deck, calling, initial, house_cards)
+    weights = pattern_weights(spot[4])
+    called = tally.copy()
+    called[:, 1] = 0
+
+    # The pots every villain folds are weighted in exactly rather than tallied
+    pots, bets = np.array([[50], [100]]), np.linspace(0, 300, 7)
+    every_pot = ShoveEstimate(tally, exact=True).ev(pots, bets)
+    assert every_pot.shape == (2, 7)
+    assert np.allclose(ShoveEstimate(called, weights).ev(pots, bets), every_pot)
+
+    # Without a bet the hero wins the pot when every villain folds and their equity of it when called
+    equity, fold, _ = called_percentages(tally)
+    assert np.isclose(tally_ev(tally, 100, 0), 100 * (fold + (1 - fold) * equity))
+
+
+# The most children of a seed sequence the run_tallies tests follow
+CHILDREN = 64
+
+
+def keyed_tally(hero, house, ranges, dead, runs, seed):
+    """
+    Tally run outs with `equity_tally`, followed by a count of which child of the seed sequence each run was given.
+    """
+    children = np.zeros(CHILDREN, dtype=np.int64)
+    children[seed.spawn_key[-1]] = 1
+    return np.concatenate([equity_tally(hero, house, ranges, dead, runs, seed).ravel(), children])
+
+
+def keyed_spot(monkeypatch):
+    """
+    Get the arguments of a three way flop to `keyed_tally`, seeding every call of `run_tallies` the same way.
+    """
+    seed_sequence = np.random.SeedSequence
+    monkeypatch.setattr(np.random, 'SeedSequence', lambda: seed_sequence(12))
+    hand, deck, villains, house_cards = make_spot((8, 9), (0, 21, 38), [(0, 20), (0, 30)])
+    return (hand.indices, tuple(card.index for card in house_cards),
+            [villain.compile().combos for villain in villains], deck.dealt | hand.mask)
+
+
+def test_pooled_run_tallies_match_one_worker(monkeypatch):
+    args = keyed_spot(monkeypatch)
+    tallies = run_tallies(keyed_tally, args, 1000, workers=2)
+    for _, pooled in zip(range(8), tallies):
+        pass
+    tallies.close()
+
+    # Every child of the seed sequence runs once at most, and each run simulates exactly the runs asked for
+    children = pooled[-CHILDREN:]
+    used = np.nonzero(children)[0]
+    assert set(children) <= {0, 1} and len(used) >= 8
+    assert pooled[:-CHILDREN].reshape(3, 3, 11)[0, 0].sum() == 1000 * len(used)
+
+    # The same children give the same run outs with one worker, and no two children give the same run outs
+    tallies = run_tallies(keyed_tally, args, 1000, workers=1)
+    runs = [tally.copy() for _, tally in zip(range(used.max() + 1), tallies)]
+    tallies.close()
+    each = np.diff([np.zeros_like(runs[0])] + runs, axis=0)
+    assert (each[used].sum(axis=0) == pooled).all()
+    assert len({each[child, :-CHILDREN].tobytes() for child in range(len(each))}) == len(each)
+
+
+def test_run_tallies_skip_runs_cancelled_by_a_pause(monkeypatch):
+    args = keyed_spot(monkeypatch)
+
+    # Keep both workers and the pool's queue busy, so that the first runs queued are still waiting when paused
+    pool = get_pool(2)
+    blockers = [pool.submit(time.sleep, 0.3) for _ in range(6)]
+    job = Job('equity', None)
+    tallies = run_tallies(keyed_tally, args, 1000, workers=2, job=job)
+    first = []
+    thread = threading.Thread(target=lambda: first.append(next(tallies)))
+    thread.start()
+    time.sleep(0.1)
+    job.pause()
+    assert not any(future.done() for future in blockers)
+    time.sleep(0.1)
+    job.resume()
+    thread.join()
+    tallies.close()
+
+    # The cancelled runs are replaced by new children rather than counted
+    children = first[0][-CHILDREN:]
+    assert children[:2].sum() == 0 and children.sum() >= 1
+    assert first[0][:-CHILDREN].reshape(3, 3, 11)[0, 0].sum() == 1000 * children.sum()
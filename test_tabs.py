@@ -0,0 +1,29 @@
+from types import SimpleNamespace
+from tabs import *
+
+
+def test_poll_shows_the_last_value_before_it_stops():
+    results = LatestValue()
+    shown, polls = [], []
+
+    # Stands in for the tab, recording the polls it schedules instead of running a Tk main loop
+    tab = SimpleNamespace(results=results, after=lambda delay, *call: polls.append(call))
+    tab.poll = lambda *args: Tab.poll(tab, *args)
+
+    results.put(1)
+    results.put(2)
+    tab.poll(results, shown.append)
+    assert shown == [2] and len(polls) == 1
+
+    # Once the calculation finishes its last value is still shown, and no more polls are scheduled
+    results.put(3)
+    results.finish()
+    function, *args = polls.pop()
+    function(*args)
+    assert shown == [2, 3] and not polls
+
+    # A calculation replaced by a newer one stops polling without showing anything
+    results.put(4)
+    tab.results = LatestValue()
+    tab.poll(results, shown.append)
+    assert shown == [2, 3] and not polls
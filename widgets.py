@@ -24,6 +24,7 @@ class RangeFilter(ttk.Frame):
         self.selected_hands_count.set('0 selected')
         self.range_display = range_display
         self.draws = {}
+        self.top = None
 
         # Create a label based on the mode
         label_text = 'Tick what folds' if self.mode == 'filter' else 'Tick what calls'
@@ -68,17 +69,30 @@ class RangeFilter(ttk.Frame):
                                            command=self.check_button_pressed)
             check_button.grid(column=0, row=count + 1)
 
+        # With a board, hands can also be picked by how strong they are on it: the top of the range is kept when
+        # filtering and calls when showing, so by default no hand is picked
+        if self.filter:
+            self.top = tk.IntVar(value=100 if self.mode == 'filter' else 0)
+            top_frame = ttk.Frame(self)
+            ttk.Label(top_frame, text='Keep top' if self.mode == 'filter' else 'Top').grid(column=0, row=0)
+            top_box = ttk.Spinbox(top_frame, from_=0, to=100, increment=5, width=4, textvariable=self.top,
+                                  command=self.check_button_pressed)
+            top_box.bind('<Return>', lambda _: self.check_button_pressed())
+            top_box.grid(column=1, row=0, padx=self.manager.small_pad)
+            ttk.Label(top_frame, text='%' if self.mode == 'filter' else '% calls').grid(column=2, row=0)
+            top_frame.grid(column=0, row=len(self.filter) + 1, pady=self.manager.small_pad)
+
         # Create the "Filter" button
         self.filter_button = ttk.Button(self, text='Fold', command=self.filter_hands)
-        self.filter_button.grid(column=0, row=len(self.filter) + 3, pady=self.manager.small_pad)
+        self.filter_button.grid(column=0, row=len(self.filter) + 4, pady=self.manager.small_pad)
 
         # Display the number of hands and the count of selected hands
         self.number_of_hands = tk.StringVar()
         number_of_hands = len([hand for hand in self.villain_range.hands if self.villain_range.hands[hand]])
         self.number_of_hands.set(f'{number_of_hands} hands')
-        ttk.Label(self, textvariable=self.number_of_hands).grid(column=0, row=len(self.filter) + 1,
+        ttk.Label(self, textvariable=self.number_of_hands).grid(column=0, row=len(self.filter) + 2,
                                                                 pady=self.manager.small_pad)
-        ttk.Label(self, textvariable=self.selected_hands_count).grid(column=0, row=len(self.filter) + 2,
+        ttk.Label(self, textvariable=self.selected_hands_count).grid(column=0, row=len(self.filter) + 3,
                                                                      pady=self.manager.small_pad)
 
     def house_hit(self, strength, hand):
@@ -115,6 +129,29 @@ class RangeFilter(ttk.Frame):
         else:
             return self.draws[hand]['made'] == strength
 
+    def top_hands(self):
+        """
+        Get the hands in the strongest part of the range on the board, as chosen by the user.
+
+        The strength of every combo on the board is looked up in the board's index, so this is quick enough to run
+        every time the percentage changes.
+
+        Returns:
+            set: The hands in the chosen top percentage of the range, or None if there is no board or the
+            percentage picks no hand.
+        """
+        if self.top is None:
+            return None
+        try:
+            top = self.top.get()
+        except tk.TclError:
+            return None
+        if top == (100 if self.mode == 'filter' else 0):
+            return None
+        index = board_index(card.index for card in self.manager.game_data['house'])
+        combos = index.top(self.villain_range.compile().combos, min(max(top, 0), 100) / 100)
+        return {self.villain_range.deck.get_hand(combo) for combo in combos}
+
     def filter_hands(self):
         """
         Filter the hands based on selected criteria and update the display.
@@ -161,6 +198,7 @@ class RangeFilter(ttk.Frame):
         self.selected_hands = set()
         for hand in self.clicked_hands:
             self.selected_hands.add(hand)
+        top = self.top_hands()
         n = 0
         for button in self.range_display.buttons:
             if self.mode == 'show':
@@ -168,6 +206,11 @@ class RangeFilter(ttk.Frame):
                 for hand in button.hands:
                     if hand in self.clicked_hands:
                         on_the_block = True
+                    if top is not None and hand in top:
+                        on_the_block = True
+                        self.selected_hands.add(hand)
+                        n += 1
+                        continue
                     for strength in self.filter:
                         if self.filter[strength].get() and self.house_hit(strength, hand):
                             on_the_block = True
@@ -182,6 +225,8 @@ class RangeFilter(ttk.Frame):
                     for strength in self.filter:
                         if not self.filter[strength].get() and self.house_hit(strength, hand):
                             hand_fold = False
+                    if top is not None and hand not in top:
+                        hand_fold = True
                     if hand_fold:
                         self.selected_hands.add(hand)
                         n += 1
@@ -202,7 +247,27 @@ class RangeFilter(ttk.Frame):
         self.draws = check_draws(self.villain_range, self.manager.game_data['house'])
 
 
-class RangeDisplay(ttk.Frame):
+class EquityColouring:
+    """
+    Mixin for range displays that colours their hand buttons by the hero's equity against each hand.
+
+    The display needs `manager`, `villain_range` and `buttons` attributes, the buttons being `RangeHandButton`s.
+    """
+    def colour_by_equity(self):
+        """
+        Colour each hand button by the hero's equity against its hands on the current house, once the hero's hand is
+        known.
+        """
+        if not self.manager.game_data['hand']:
+            return
+        equities = range_equities(self.manager.game_data['hand'], self.villain_range, self.manager.game_data['house'])
+        if equities is None:
+            return
+        for button in self.buttons:
+            button.colour(equities)
+
+
+class RangeDisplay(EquityColouring, ttk.Frame):
     """
     Create a RangeDisplay widget for displaying hands within a hand range.
 
@@ -242,6 +307,7 @@ class RangeDisplay(ttk.Frame):
         # Display unsuited hand buttons and all suits
         self.display_unsuited_hand_buttons()
         self.display_all_suits()
+        self.colour_by_equity()
 
     def display_unsuited_hand_buttons(self):
         """
@@ -324,9 +390,10 @@ class RangeDisplay(ttk.Frame):
         # Display the updated buttons for unsuited hands and all suits
         self.display_unsuited_hand_buttons()
         self.display_all_suits()
+        self.colour_by_equity()
 
 
-class CallingRangeDisplay(ttk.Frame):
+class CallingRangeDisplay(EquityColouring, ttk.Frame):
     """
     Create a CallingRangeDisplay widget for displaying the hands that the villain calls with.
 
@@ -385,6 +452,7 @@ class CallingRangeDisplay(ttk.Frame):
         # Display hand buttons
         self.display_unsuited_hand_buttons()
         self.display_all_suits()
+        self.colour_by_equity()
 
     def display_unsuited_hand_buttons(self):
         """
@@ -486,6 +554,7 @@ class CallingRangeDisplay(ttk.Frame):
         # Redraw the buttons for unsuited and suited hands
         self.display_unsuited_hand_buttons()
         self.display_all_suits()
+        self.colour_by_equity()
 
 
 class SummarySidebar(ttk.Frame):
@@ -570,3 +639,65 @@ class SummarySidebar(ttk.Frame):
             # Update the equity label with the player's equity
             self.equity_label.configure(textvariable=self.manager.game_data['equity']['hero'])
         self.update()
+
+
+class EVCurve(tk.Canvas):
+    """
+    Create a widget drawing the EV of shoving relative to checking against the size of the bet.
+
+    The villains' calling ranges do not depend on the bet, so the EV is a straight line in the bet and has no best
+    size in between. The curve shows which way it slopes and highlights the bet size that breaks even with checking,
+    and marks the bet entered by the user.
+
+    Args:
+        manager: The parent GUI manager.
+        *args, **kwargs: Additional arguments for the tk.Canvas constructor.
+    """
+    def __init__(self, manager, *args, **kwargs):
+        super().__init__(*args, width=int(320 * manager.resize_ratio), height=int(220 * manager.resize_ratio),
+                         background='black', highlightthickness=0, **kwargs)
+        self.manager = manager
+        self.font = 'Georgia', int(8 * manager.resize_ratio)
+        self.margin = int(30 * manager.resize_ratio)
+
+    def draw(self, bets, evs, bet):
+        """
+        Draw the EV of each bet size, replacing anything drawn before.
+
+        Args:
+            bets (np.ndarray): The bet sizes, in increasing order.
+            evs (np.ndarray): The EV of shoving each bet size relative to checking.
+            bet (float): The bet size entered by the user.
+        """
+        self.delete('all')
+        width = int(self['width']) - 2 * self.margin
+        height = int(self['height']) - 2 * self.margin
+        low = min(float(evs.min()), 0)
+        high = max(float(evs.max()), 0)
+        span = high - low or 1
+
+        def point(size, ev):
+            # Place a bet size and EV on the canvas, bigger EVs higher up
+            return (self.margin + (size - bets[0]) / (bets[-1] - bets[0] or 1) * width,
+                    self.margin + (high - ev) / span * height)
+
+        # Break even with checking, and the bet entered
+        self.create_line(*point(bets[0], 0), *point(bets[-1], 0), fill='gray', dash=(2, 2))
+        self.create_line(*point(bet, low), *point(bet, high), fill='white', dash=(2, 2))
+        self.create_text(*point(bets[0], 0), text='0', anchor='e', fill='white', font=self.font)
+        self.create_text(*point(bets[0], low), text=f'{int(bets[0])}', anchor='n', fill='white', font=self.font)
+        self.create_text(*point(bets[-1], low), text=f'{int(bets[-1])}', anchor='n', fill='white', font=self.font)
+        self.create_line(*[coordinate for size, ev in zip(bets, evs) for coordinate in point(size, ev)],
+                         fill='deeppink', width=2)
+
+        # The EV changes by the same amount for every unit bet, and crosses checking at most once
+        slope = float(evs[-1] - evs[0]) / float(bets[-1] - bets[0] or 1)
+        trend = 'rises' if slope > 0 else 'falls' if slope < 0 else 'stays level'
+        text = f'EV {trend} by {abs(slope):.2f} per unit bet'
+        if slope and (evs[0] < 0) != (evs[-1] < 0):
+            even = float(bets[0]) - float(evs[0]) / slope
+            x, y = point(even, 0)
+            radius = int(4 * self.manager.resize_ratio)
+            self.create_oval(x - radius, y - radius, x + radius, y + radius, fill='yellow', outline='')
+            text += f', breaking even at {int(even)}'
+        self.create_text(self.margin, self.margin // 2, anchor='w', fill='yellow', font=self.font, text=text)